@@ -0,0 +1,287 @@
+"""
+Benchmarks of the Honda flux tables, run with airspeed velocity (asv).
+
+The bundled 2006 and 2014 tables of Frejus and Gran Sasso are used. The
+results are stored as JSON in ``.asv/results`` and can be compared between
+commits or releases, e.g. ``asv continuous v2.0.0a2 HEAD`` or ``asv compare``.
+"""
+
+import pickle
+import time
+
+import numpy as np
+
+from km3flux.baked import bake
+from km3flux.flux import (
+    HONDA_FLAVORS,
+    CompositeFlux,
+    Honda,
+    HondaFlux,
+    PowerlawFlux,
+    read_honda_table,
+)
+
+YEARS = [2006, 2014]
+EXPERIMENTS = ["Frejus", "Gran Sasso"]
+INTERPOLATIONS = ["spline", "loglog"]
+N_EVENTS = [10**3, 10**4, 10**5, 10**6, 10**7]
+
+# The dimensionality of the tables, the 2006 tables are not available
+# as all-direction averages.
+DIMENSIONS = {1: "all", 2: "azimuth", 3: None}
+
+
+def filepath_for(year, experiment, averaged=None):
+    return Honda()._filepath_for(year, experiment, "min", False, None, averaged)
+
+
+def random_events(n_dim, n_events, seed=42):
+    """Return random (energy, cosz, phi) coordinates for a table dimensionality."""
+    rng = np.random.default_rng(seed)
+    coords = [
+        10 ** rng.uniform(0, 4, n_events),
+        rng.uniform(-1, 1, n_events),
+        rng.uniform(0, 360, n_events),
+    ]
+    return coords[:n_dim]
+
+
+class TimeLoad:
+    """Decompressing and parsing the tables."""
+
+    params = (YEARS, EXPERIMENTS)
+    param_names = ["year", "experiment"]
+
+    def setup(self, year, experiment):
+        self.filepath = filepath_for(year, experiment)
+
+    def time_read_honda_table(self, year, experiment):
+        read_honda_table(self.filepath)
+
+    def peakmem_read_honda_table(self, year, experiment):
+        read_honda_table(self.filepath)
+
+
+class TimeConstruction:
+    """Parsing the tables and fitting the interpolators of all flavors."""
+
+    params = ([1, 2, 3], INTERPOLATIONS)
+    param_names = ["n_dim", "interpolation"]
+
+    def setup(self, n_dim, interpolation):
+        self.filepath = filepath_for(2014, "Frejus", DIMENSIONS[n_dim])
+        self.data = read_honda_table(self.filepath)
+
+    def time_from_hondafile(self, n_dim, interpolation):
+        flux = HondaFlux.from_hondafile(self.filepath, interpolation=interpolation)
+        for flavor in flux._flavors:
+            flux[flavor]
+
+    def time_interpolation_method(self, n_dim, interpolation):
+        flux = HondaFlux(self.data, HONDA_FLAVORS, interpolation=interpolation)
+        flux.interpolation_method(flux._axes, "numu")
+
+    def peakmem_from_hondafile(self, n_dim, interpolation):
+        flux = HondaFlux.from_hondafile(self.filepath, interpolation=interpolation)
+        for flavor in flux._flavors:
+            flux[flavor]
+
+
+class TimeEvaluation:
+    """Evaluating a single flavor and all flavors at once on random events."""
+
+    params = ([1, 2, 3], INTERPOLATIONS, N_EVENTS)
+    param_names = ["n_dim", "interpolation", "n_events"]
+    timeout = 300
+
+    def setup(self, n_dim, interpolation, n_events):
+        self.flux = HondaFlux.from_hondafile(
+            filepath_for(2014, "Frejus", DIMENSIONS[n_dim]),
+            interpolation=interpolation,
+        )
+        self.coords = random_events(n_dim, n_events)
+        for flavor in self.flux._flavors:
+            self.flux[flavor]
+
+    def time_evaluate(self, n_dim, interpolation, n_events):
+        self.flux["numu"](*self.coords)
+
+    def time_evaluate_all(self, n_dim, interpolation, n_events):
+        self.flux.evaluate_all(*self.coords)
+
+    def peakmem_evaluate(self, n_dim, interpolation, n_events):
+        self.flux["numu"](*self.coords)
+
+    def track_events_per_second(self, n_dim, interpolation, n_events):
+        # a single (warm) evaluation, for a throughput which is comparable
+        # across the different numbers of events
+        start = time.perf_counter()
+        self.flux["numu"](*self.coords)
+        return n_events / (time.perf_counter() - start)
+
+    track_events_per_second.unit = "events/s"
+
+
+class TimeKernel3D:
+    """The 3D grid kernel versus SciPy's `RegularGridInterpolator`."""
+
+    params = N_EVENTS
+    param_names = ["n_events"]
+    timeout = 300
+
+    def setup(self, n_events):
+        from scipy.interpolate import RegularGridInterpolator
+
+        self.flux = HondaFlux.from_hondafile(filepath_for(2014, "Frejus"))
+        coefficients = self.flux.coefficients("numu")
+        axes = [coefficients[f"axis{i}"] for i in range(3)]
+        # the previous, non-periodic interpolator on the original grid
+        self.rgi = RegularGridInterpolator(
+            [axes[0], axes[1], axes[2][:-1]],
+            coefficients["grid"][:, :, :-1],
+            bounds_error=False,
+            fill_value=None,
+        )
+        self.coords = random_events(3, n_events)
+
+    def time_regular_grid_interpolator(self, n_events):
+        self.rgi(np.stack(self.coords).T)
+
+    def time_multilinear(self, n_events):
+        self.flux["numu"](*self.coords)
+
+
+class TimeBaked:
+    """Evaluating a flux baked onto a binning versus the interpolation."""
+
+    params = N_EVENTS
+    param_names = ["n_events"]
+    timeout = 300
+
+    def setup(self, n_events):
+        self.flux = HondaFlux.from_hondafile(filepath_for(2014, "Frejus"))
+        self.edges = [np.logspace(0, 4, 81), np.linspace(-1, 1, 41)]
+        self.edges.append(np.linspace(0, 360, 13))
+        self.table = bake(self.flux, *self.edges)
+        self.coords = random_events(3, n_events)
+        self.index = self.table.index(*self.coords)
+
+    def time_interpolate(self, n_events):
+        self.flux["numu"](*self.coords)
+
+    def time_baked_index(self, n_events):
+        self.table.index(*self.coords)
+
+    def time_baked_evaluate(self, n_events):
+        self.table.evaluate("numu", self.index)
+
+
+class TimeComposite:
+    """The Honda flux plus two power laws, fused versus summed by hand."""
+
+    params = N_EVENTS
+    param_names = ["n_events"]
+    timeout = 300
+
+    def setup(self, n_events):
+        self.honda = HondaFlux.from_hondafile(filepath_for(2014, "Frejus"))
+        self.powerlaws = [PowerlawFlux(2.0, 1e-4), PowerlawFlux(2.7, 1e-3)]
+        self.flux = CompositeFlux(
+            [self.honda, (self.powerlaws[0], 1.2), (self.powerlaws[1], 0.8)]
+        )
+        self.coords = random_events(3, n_events)
+
+    def time_composite(self, n_events):
+        self.flux["numu"](*self.coords)
+
+    def time_sum(self, n_events):
+        energy = self.coords[0]
+        (
+            self.honda["numu"](*self.coords)
+            + 1.2 * self.powerlaws[0](energy)
+            + 0.8 * self.powerlaws[1](energy)
+        )
+
+    def peakmem_composite(self, n_events):
+        self.flux["numu"](*self.coords)
+
+
+class TimePickle:
+    """Pickling fluxes (e.g. to send them to process pool workers)."""
+
+    params = ([1, 2, 3], INTERPOLATIONS)
+    param_names = ["n_dim", "interpolation"]
+
+    def setup(self, n_dim, interpolation):
+        self.flux = HondaFlux.from_hondafile(
+            filepath_for(2014, "Frejus", DIMENSIONS[n_dim]),
+            interpolation=interpolation,
+        )
+        for flavor in self.flux._flavors:
+            self.flux[flavor]
+        self.state = pickle.dumps(self.flux)
+
+    def time_dumps(self, n_dim, interpolation):
+        pickle.dumps(self.flux)
+
+    def time_loads(self, n_dim, interpolation):
+        pickle.loads(self.state)
+
+    def track_size(self, n_dim, interpolation):
+        return len(self.state)
+
+    track_size.unit = "bytes"
+
+
+class TimeIntegration:
+    """Energy integrals on random angles and histogram integrals."""
+
+    params = ([1, 2, 3], INTERPOLATIONS)
+    param_names = ["n_dim", "interpolation"]
+
+    def setup(self, n_dim, interpolation):
+        self.flux = HondaFlux.from_hondafile(
+            filepath_for(2014, "Frejus", DIMENSIONS[n_dim]),
+            interpolation=interpolation,
+        )
+        self.coords = random_events(n_dim, 10**4)[1:]
+        self.emin = np.full(10**4, 1.0)
+        self.emax = np.full(10**4, 100.0)
+        self.energy_edges = np.logspace(0, 4, 41)
+        self.cosz_edges = np.linspace(-1, 1, 21)
+        self.phi_edges = np.linspace(0, 360, 13)
+        # fits the interpolator and the antiderivative
+        self.flux.integrate("numu", 1, 100, *[c[:1] for c in self.coords])
+
+    def time_integrate(self, n_dim, interpolation):
+        self.flux.integrate("numu", self.emin, self.emax, *self.coords)
+
+    def time_integrate_binned(self, n_dim, interpolation):
+        self.flux._binned_integrals.clear()
+        self.flux.integrate_binned(
+            "numu", self.energy_edges, self.cosz_edges, self.phi_edges
+        )
+
+    def peakmem_integrate_binned(self, n_dim, interpolation):
+        self.flux._binned_integrals.clear()
+        self.flux.integrate_binned(
+            "numu", self.energy_edges, self.cosz_edges, self.phi_edges
+        )
+
+
+class TimeHonda:
+    """Getting a (memoized) flux from `Honda`."""
+
+    params = (YEARS, EXPERIMENTS)
+    param_names = ["year", "experiment"]
+
+    def setup(self, year, experiment):
+        self.honda = Honda(cache_dir=None)
+        Honda.flux_cache.clear()
+
+    def time_flux_cold(self, year, experiment):
+        Honda.flux_cache.clear()
+        self.honda.flux(year, experiment)
+
+    def time_flux_memoized(self, year, experiment):
+        self.honda.flux(year, experiment)
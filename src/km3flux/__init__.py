@@ -1,9 +1,55 @@
-from pkg_resources import get_distribution, DistributionNotFound
-
-version = get_distribution(__name__).version
-
 # Convenient access to the version number
 # from .version import version as __version__
 
-import km3flux.flux
-import km3flux.logger
+import sys
+
+# The version and the submodules (with their dependencies, like SciPy) are
+# looked up on first access, e.g. `km3flux.flux`, which keeps `import km3flux`
+# fast.
+_submodules = (
+    "baked",
+    "cache",
+    "data",
+    "flux",
+    "logger",
+    "pack",
+    "profiling",
+    "shared",
+    "storage",
+    "utils",
+)
+
+
+def _get_version():
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python < 3.8
+        from importlib_metadata import PackageNotFoundError, version
+
+    try:
+        return version(__name__)
+    except PackageNotFoundError:  # not installed
+        return "unknown"
+
+
+def __getattr__(name):
+    if name == "version":
+        globals()["version"] = _get_version()
+        return globals()["version"]
+    if name in _submodules:
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + ["version"] + list(_submodules))
+
+
+if sys.version_info < (3, 7):  # no module __getattr__ (PEP 562)
+    import importlib
+
+    version = _get_version()
+    for _name in _submodules:
+        importlib.import_module(f"{__name__}.{_name}")
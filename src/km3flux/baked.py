@@ -0,0 +1,362 @@
+"""
+Flux tables baked onto an analysis binning or a fixed set of events.
+
+Fits evaluating the same flux on the same (MC) events in every iteration can
+bake the flux once: `bake` evaluates it on an energy x cos(zenith)
+(x azimuth) binning, `bake_events` on a set of events. The resulting
+`BakedFlux` is a plain array (one row per flavor), so the evaluation is merely
+integer indexing. The bin indices of the events are calculated once with
+`BakedFlux.index`.
+
+Example
+=======
+>>> from km3flux.flux import Honda
+>>> from km3flux import baked
+
+>>> flux = Honda().flux(2014, "Frejus")
+>>> edges = [np.logspace(0, 4, 81), np.linspace(-1, 1, 41), np.linspace(0, 360, 13)]
+>>> table = baked.bake(flux, *edges)
+>>> table.accuracy(flux)
+{'numu': {'max': 0.39, 'rms': 0.11}, ...}
+>>> index = table.index(energies, cos_zeniths, azimuths)
+>>> table.evaluate("numu", index)  # in the fit loop
+>>> table.save("flux.npz")
+>>> table = baked.BakedFlux.load("flux.npz")
+"""
+
+import numpy as np
+
+from km3flux import profiling
+
+AXES = ("energy", "cosz", "phi")
+# The full ranges of the angles, for the averages over omitted angles
+_FULL_RANGES = {"cosz": 2.0, "phi": 2 * np.pi}
+
+
+class BakedFlux:
+    """
+    A flux baked onto a binning or onto a set of events.
+
+    Parameters
+    ----------
+    values : np.array
+        The flux with shape ``(n_flavors,) + shape``, where `shape` are the
+        numbers of bins along the edges (or the number of events).
+    flavors : list of str
+        The flavors.
+    edges : list of np.array or None (optional)
+        The bin edges of the energy [, cos(zenith)] [, azimuth (in degrees)],
+        `None` for a set of events.
+    fill_value : float (optional)
+        The value outside of the binning, NaN by default.
+    """
+
+    def __init__(self, values, flavors, edges=None, fill_value=np.nan):
+        values = np.asarray(values)
+        self.flavors = list(flavors)
+        if len(self.flavors) != len(values):
+            raise ValueError(
+                f"Expected the values of {len(self.flavors)} flavors, "
+                f"got {len(values)}."
+            )
+        self.edges = None if edges is None else [np.asarray(e, float) for e in edges]
+        self.shape = values.shape[1:]
+        if self.edges is not None:
+            if len(self.edges) != len(self.shape) or len(self.edges) > len(AXES):
+                raise ValueError("Expected one edges array per binned dimension.")
+            if self.shape != tuple(len(e) - 1 for e in self.edges):
+                raise ValueError("The values do not match the binning.")
+            for e in self.edges:
+                if len(e) < 2 or np.any(np.diff(e) <= 0):
+                    raise ValueError("The bin edges need to be increasing.")
+        self.fill_value = fill_value
+
+        # one flat row per flavor, with a trailing slot for the fill value
+        # (which is addressed by the index -1 of events outside of the binning)
+        n_values = int(np.prod(self.shape))
+        self._table = np.empty((len(self.flavors), n_values + 1), dtype=values.dtype)
+        self._table[:, :-1] = values.reshape(len(self.flavors), n_values)
+        self._table[:, -1] = fill_value
+        self._strides = np.cumprod((1,) + self.shape[:0:-1])[::-1]
+
+    @property
+    def binned(self):
+        """`True` for a binning, `False` for a set of events."""
+        return self.edges is not None
+
+    @property
+    def nbytes(self):
+        return self._table.nbytes
+
+    def values(self, flavor):
+        """The baked values of a flavor (a view with the shape of the bins)."""
+        return self._table[self._row(flavor), :-1].reshape(self.shape)
+
+    def _row(self, flavor):
+        try:
+            return self.flavors.index(flavor)
+        except ValueError:
+            raise KeyError(
+                f"Flavor '{flavor}' not present in data. "
+                f"Available flavors: {', '.join(self.flavors)}"
+            ) from None
+
+    def index(self, *coords):
+        """
+        Return the flat bin indices of events, -1 outside of the binning.
+
+        The energy and cos(zenith) bins include their upper edge, the azimuth
+        is wrapped around if the edges cover 360 degrees.
+
+        Parameters
+        ----------
+        coords : array-like
+            The energy [, cos(zenith)] [, azimuth] of the events, one array per
+            binned dimension.
+
+        Returns
+        -------
+        np.array(int)
+        """
+        if not self.binned:
+            raise ValueError("A set of events is not binned, use the event indices.")
+        if len(coords) != len(self.edges):
+            raise ValueError(
+                f"Expected {len(self.edges)} coordinates, got {len(coords)}."
+            )
+        coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coords])
+        index = np.zeros(coords[0].shape, dtype=np.intp)
+        outside = np.zeros(coords[0].shape, dtype=bool)
+        for axis, x, edges, stride in zip(AXES, coords, self.edges, self._strides):
+            if axis == "phi" and np.isclose(edges[-1] - edges[0], 360.0):
+                x = edges[0] + np.mod(x - edges[0], 360.0)
+            bins = np.searchsorted(edges, x, side="right") - 1
+            # the upper edge belongs to the last bin
+            bins = np.where(x == edges[-1], len(edges) - 2, bins)
+            outside |= (bins < 0) | (bins >= len(edges) - 1) | np.isnan(x)
+            index += bins * stride
+        index[outside] = -1
+        return index
+
+    def evaluate(self, flavor, index=None):
+        """
+        Return the baked flux of a flavor at integer (bin or event) indices.
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        index : array-like(int) (optional)
+            The flat indices, see `index` (or the event indices of a set of
+            events). All values (flat) by default. The index -1 returns
+            `fill_value`.
+
+        Returns
+        -------
+        np.array
+        """
+        row = self._table[self._row(flavor)]
+        if index is None:
+            return row[:-1]
+        return row[index]
+
+    def __getitem__(self, flavor):
+        """The flux of a flavor as a function of the coordinates (binned only)."""
+        row = self._row(flavor)
+
+        def flux(*coords):
+            return self._table[row][self.index(*coords)]
+
+        return flux
+
+    @profiling.timed("BakedFlux.accuracy")
+    def accuracy(self, flux, *coords, n_samples=10**5, seed=42):
+        """
+        Compare the baked values with the original flux.
+
+        Parameters
+        ----------
+        flux : HondaFlux
+            The original flux.
+        coords : array-like (optional)
+            The coordinates to compare at, for all dimensions of `flux` and
+            of the binning (whichever are more). Random points within the
+            binning by default, required for a set of events (the baked
+            events).
+        n_samples : int (optional)
+            The number of random points.
+        seed : int (optional)
+            The seed of the random points.
+
+        Returns
+        -------
+        dict(str -> dict)
+            The maximum and the root mean square of the relative deviation for
+            each flavor (points outside of the binning are skipped).
+        """
+        if not coords:
+            if not self.binned:
+                raise ValueError("The coordinates of the baked events are required.")
+            coords = self._random_coords(flux._n_dim, n_samples, seed)
+        if self.binned:
+            index = self.index(*coords[: len(self.edges)])
+        else:
+            index = np.arange(self.shape[0])
+            if len(np.atleast_1d(coords[0])) != self.shape[0]:
+                raise ValueError(f"Expected the coordinates of {self.shape[0]} events.")
+        inside = np.ravel(index) >= 0
+        expected = flux.evaluate_all(*coords[: flux._n_dim], flavors=self.flavors)
+        expected = expected.reshape(-1, len(self.flavors))[inside]
+        result = {}
+        for i, flavor in enumerate(self.flavors):
+            deviation = self.evaluate(flavor, np.ravel(index)[inside]) / expected[:, i]
+            deviation = np.abs(deviation - 1)
+            result[flavor] = {
+                "max": float(np.max(deviation, initial=0)),
+                "rms": float(np.sqrt(np.mean(deviation**2))) if len(deviation) else 0.0,
+            }
+        return result
+
+    def _random_coords(self, n_dim, n_samples, seed):
+        """Random points within the binning (and the full angular ranges)."""
+        rng = np.random.default_rng(seed)
+        ranges = [(self.edges[0][0], self.edges[0][-1]), (-1.0, 1.0), (0.0, 360.0)]
+        for dim, edges in enumerate(self.edges[1:], start=1):
+            ranges[dim] = (edges[0], edges[-1])
+        lower, upper = ranges[0]
+        if lower > 0:
+            coords = [10 ** rng.uniform(np.log10(lower), np.log10(upper), n_samples)]
+        else:
+            coords = [rng.uniform(lower, upper, n_samples)]
+        for lower, upper in ranges[1 : max(n_dim, len(self.edges))]:
+            coords.append(rng.uniform(lower, upper, n_samples))
+        return coords
+
+    def save(self, filepath):
+        """Save the table as ``.npz`` file (plain arrays, see `load`)."""
+        arrays = {
+            "values": self._table[:, :-1].reshape((len(self.flavors),) + self.shape),
+            "flavors": np.array(self.flavors),
+            "fill_value": np.array(self.fill_value),
+        }
+        for i, edges in enumerate(self.edges or []):
+            arrays[f"edges{i}"] = edges
+        np.savez(filepath, **arrays)
+
+    @classmethod
+    def load(cls, filepath):
+        """Load a table saved with `save`."""
+        with np.load(filepath, allow_pickle=False) as arrays:
+            edges = [
+                arrays[f"edges{i}"] for i in range(len(AXES)) if f"edges{i}" in arrays
+            ]
+            return cls(
+                arrays["values"],
+                arrays["flavors"].tolist(),
+                edges=edges or None,
+                fill_value=arrays["fill_value"].item(),
+            )
+
+
+@profiling.timed("baked.bake")
+def bake(
+    flux,
+    energy_edges,
+    cosz_edges=None,
+    phi_edges=None,
+    flavors=None,
+    average=False,
+    dtype=float,
+    fill_value=np.nan,
+):
+    """
+    Bake a flux onto a binning.
+
+    Parameters
+    ----------
+    flux : HondaFlux
+        The flux.
+    energy_edges : array-like
+        The energy bin edges in GeV.
+    cosz_edges : array-like (optional)
+        The cos(zenith) bin edges.
+    phi_edges : array-like (optional)
+        The azimuth bin edges in degrees.
+    flavors : list of str (optional)
+        The flavors, all flavors of the flux by default.
+    average : bool (optional)
+        Bake the averages over the bins (see `HondaFlux.integrate_binned`)
+        instead of the flux at the bin centers (the logarithmic center in
+        energy). Angles without edges are averaged over.
+    dtype : np.dtype (optional)
+        The data type of the table, e.g. `np.float32` for a compact one.
+    fill_value : float (optional)
+        The value outside of the binning.
+
+    Returns
+    -------
+    BakedFlux
+    """
+    flavors = flux._flavors if flavors is None else list(flavors)
+    given = [e for e in (cosz_edges, phi_edges) if e is not None]
+    if phi_edges is not None and cosz_edges is None:
+        raise ValueError("The azimuth can only be binned along with cos(zenith).")
+    edges = [np.asarray(e, dtype=float) for e in [energy_edges] + given]
+
+    if average:
+        volumes = [np.diff(edges[0])]
+        if cosz_edges is not None:
+            volumes.append(np.diff(edges[1]))
+        if phi_edges is not None:
+            volumes.append(np.radians(np.diff(edges[2])))
+        volume = np.prod(np.meshgrid(*volumes, indexing="ij"), axis=0)
+        for axis in AXES[len(edges) :]:
+            volume = volume * _FULL_RANGES[axis]
+        values = [
+            flux.integrate_binned(flavor, energy_edges, cosz_edges, phi_edges) / volume
+            for flavor in flavors
+        ]
+    else:
+        if flux._n_dim > len(edges):
+            raise ValueError(
+                f"The flux depends on {flux._n_dim} coordinates, but only "
+                f"{len(edges)} are binned, use `average=True` to average over "
+                "the others."
+            )
+        centers = [np.sqrt(edges[0][:-1] * edges[0][1:])]
+        if edges[0][0] <= 0:
+            centers = [(edges[0][:-1] + edges[0][1:]) / 2]
+        centers += [(e[:-1] + e[1:]) / 2 for e in edges[1:]]
+        # a flux with less dimensions is constant along the others
+        coords = np.meshgrid(*centers, indexing="ij")[: flux._n_dim]
+        values = np.moveaxis(flux.evaluate_all(*coords, flavors=flavors), -1, 0)
+    return BakedFlux(
+        np.asarray(values, dtype=dtype), flavors, edges=edges, fill_value=fill_value
+    )
+
+
+@profiling.timed("baked.bake_events")
+def bake_events(flux, *coords, flavors=None, dtype=float):
+    """
+    Bake a flux onto a set of events.
+
+    Parameters
+    ----------
+    flux : HondaFlux
+        The flux.
+    coords : array-like
+        The energy and, depending on the dimension of the flux, the
+        cos(zenith) and the azimuth of the events.
+    flavors : list of str (optional)
+        The flavors, all flavors of the flux by default.
+    dtype : np.dtype (optional)
+        The data type of the table, e.g. `np.float32` for a compact one.
+
+    Returns
+    -------
+    BakedFlux
+        Evaluated with the event indices, see `BakedFlux.evaluate`.
+    """
+    flavors = flux._flavors if flavors is None else list(flavors)
+    values = flux.evaluate_all(*coords, flavors=flavors).reshape(-1, len(flavors))
+    return BakedFlux(np.asarray(values.T, dtype=dtype), flavors)
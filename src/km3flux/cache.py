@@ -0,0 +1,287 @@
+"""
+Caches for parsed Honda tables and their fitted interpolators.
+
+`LRUCache` is a bounded in-process cache, used to memoize `Honda.flux`.
+
+The on-disk cache (`load` and `store`) is opt-in.
+
+Each on-disk cache entry is a directory named after the `cache_key` of the source
+file and holds plain ``.npy`` files (the parsed recarray and the interpolation
+coefficients of each flavor) which are memory-mapped when loaded, plus a
+``meta.json`` describing the content. Entries are written to a temporary
+directory first and renamed atomically, corrupt entries are discarded and
+rebuilt. Storing an entry removes the outdated entries of the same source file
+(and options), e.g. those of a previous km3flux version.
+"""
+
+from collections import OrderedDict
+import functools
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import threading
+
+import numpy as np
+
+from km3flux import profiling, storage
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "KM3FLUX_CACHE_DIR"
+
+
+class LRUCache:
+    """
+    A bounded least-recently-used cache with hit/miss statistics.
+
+    Parameters
+    ----------
+    maxsize : int or None (optional)
+        The maximum number of entries, `None` means no limit. Zero disables
+        caching.
+    maxbytes : int or None (optional)
+        The maximum memory budget in bytes, `None` means no limit.
+    sizeof : callable (optional)
+        Returns the size of a value in bytes (default: its ``nbytes`` attribute).
+        Only used if ``maxbytes`` is set. Values may grow after being added
+        (e.g. fluxes fitting their interpolators lazily), so they are measured
+        again when accessed and whenever an entry is added.
+    """
+
+    def __init__(self, maxsize=None, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof or (lambda value: getattr(value, "nbytes", 0))
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def nbytes(self):
+        """The total size of the cached values in bytes."""
+        return self._nbytes
+
+    def get(self, key, default=None):
+        """Return the value for `key` (marking it as recently used) or `default`."""
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if self.maxbytes is not None:
+                nbytes = self._sizeof(value)
+                self._nbytes += nbytes - self._entries[key][1]
+                self._entries[key] = (value, nbytes)
+                self._evict(keep=key)
+            return value
+
+    def put(self, key, value):
+        """Add a value, evicting the least recently used entries if needed."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, 0)
+            self._measure()
+            self._evict()
+
+    def resize(self, maxsize=None, maxbytes=None):
+        """Set new limits, evicting entries immediately if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            self.maxbytes = maxbytes
+            self._measure()
+            self._evict()
+
+    def values(self):
+        """Return the cached values (without marking them as recently used)."""
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the cache statistics as a dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "nbytes": self._nbytes,
+            "maxsize": self.maxsize,
+            "maxbytes": self.maxbytes,
+        }
+
+    def _measure(self):
+        """Measure the sizes of all values again (if there is a byte budget)."""
+        if self.maxbytes is None:
+            return
+        for key, (value, _) in list(self._entries.items()):
+            self._entries[key] = (value, self._sizeof(value))
+        self._nbytes = sum(n for _, n in self._entries.values())
+
+    def _evict(self, keep=None):
+        """Evict the least recently used entries (but `keep`) to meet the limits."""
+        while self._entries and (
+            (self.maxsize is not None and len(self._entries) > self.maxsize)
+            or (self.maxbytes is not None and self._nbytes > self.maxbytes)
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            _, nbytes = self._entries.pop(key)
+            self._nbytes -= nbytes
+            self.evictions += 1
+
+
+def default_cache_dir():
+    """Return the cache directory set via ``KM3FLUX_CACHE_DIR`` (or `None`)."""
+    return os.environ.get(CACHE_DIR_ENV) or None
+
+
+@functools.lru_cache(maxsize=None)
+def _source_hash():
+    """Return a hash of the km3flux source files."""
+    sha = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.rglob("*.py")):
+        sha.update(path.read_bytes())
+    return sha.hexdigest()
+
+
+def _code_version():
+    """
+    Return the km3flux version, or a hash of its source files if km3flux is
+    not installed (and the version is unknown).
+    """
+    import km3flux
+
+    if km3flux.version == "unknown":
+        return "source-" + _source_hash()
+    return km3flux.version
+
+
+def cache_key(filepath, *options):
+    """
+    Return the cache key for a file.
+
+    The key consists of a hash of the (absolute) path of the file and the given
+    options (e.g. the interpolation engine), which is shared by all entries of
+    the same source, and a hash of the file content, the km3flux version (or
+    its source code, if not installed) and the options.
+    """
+    source = hashlib.sha256(os.path.abspath(filepath).encode())
+    sha = hashlib.sha256(_code_version().encode())
+    for option in options:
+        source.update(str(option).encode())
+        sha.update(str(option).encode())
+    with open(filepath, "rb") as fobj:
+        sha.update(fobj.read())
+    return f"{source.hexdigest()[:16]}-{sha.hexdigest()}"
+
+
+@profiling.timed("cache.load")
+def load(cache_dir, key):
+    """
+    Load a cache entry.
+
+    Parameters
+    ----------
+    cache_dir : str or pathlib.Path
+        The cache directory.
+    key : str
+        The cache key, see `cache_key`.
+
+    Returns
+    -------
+    (np.recarray, list(str), dict) or None
+        The data, flavors and interpolation coefficients per flavor, all arrays
+        are memory-mapped (copy-on-write). `None` if the entry does not exist
+        or is corrupt.
+    """
+    entry = Path(cache_dir) / key
+    if not entry.exists():
+        return None
+    try:
+        with open(entry / "meta.json") as fobj:
+            meta = json.load(fobj)
+        data = np.load(entry / "data.npy", mmap_mode="c")
+        if len(data) != meta["n_rows"]:
+            raise ValueError("unexpected number of rows")
+        coefficients = {}
+        for flavor, names in meta["coefficients"].items():
+            coefficients[flavor] = {
+                name: np.load(entry / f"{flavor}.{name}.npy", mmap_mode="c")
+                for name in names
+            }
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("Discarding corrupt cache entry '%s': %s", entry, e)
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    logger.debug("Loaded cache entry '%s'", entry)
+    return data.view(np.recarray), meta["flavors"], coefficients
+
+
+@profiling.timed("cache.store")
+def store(cache_dir, key, data, flavors, coefficients):
+    """
+    Store a cache entry.
+
+    Failing to write the entry is not an error, it is only logged.
+
+    Parameters
+    ----------
+    cache_dir : str or pathlib.Path
+        The cache directory.
+    key : str
+        The cache key, see `cache_key`.
+    data : np.recarray
+        The parsed table.
+    flavors : list(str)
+        The flavors.
+    coefficients : dict(str -> dict(str -> np.array))
+        The interpolation coefficients per flavor.
+    """
+    entry = Path(cache_dir) / key
+    try:
+        with storage.atomic_path(entry, directory=True) as tmpdir:
+            np.save(tmpdir / "data.npy", np.asarray(data))
+            for flavor in flavors:
+                for name, values in coefficients[flavor].items():
+                    np.save(tmpdir / f"{flavor}.{name}.npy", np.asarray(values))
+            meta = {
+                "version": _code_version(),
+                "n_rows": len(data),
+                "flavors": list(flavors),
+                "coefficients": {
+                    flavor: list(coefficients[flavor]) for flavor in flavors
+                },
+            }
+            with open(tmpdir / "meta.json", "w") as fobj:
+                json.dump(meta, fobj)
+    except OSError as e:
+        logger.warning("Unable to write cache entry '%s': %s", entry, e)
+        return
+    logger.debug("Stored cache entry '%s'", entry)
+    source = key.partition("-")[0]
+    for outdated in entry.parent.glob(f"{source}-*"):
+        if outdated != entry:
+            logger.debug("Removing outdated cache entry '%s'", outdated)
+            shutil.rmtree(outdated, ignore_errors=True)
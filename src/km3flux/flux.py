@@ -1,22 +1,169 @@
 """Assorted Fluxes, in  (m^2 sec sr GeV)^-1"""
 
+import collections
+import functools
 import gzip
+import itertools
 import logging
-import io
+import os
 import re
+import warnings
 
 import numpy as np
 import numpy.lib.recfunctions as rfn
 
-import scipy.interpolate
-from scipy.integrate import romberg, simps
-from scipy.interpolate import splrep, splev, RectBivariateSpline
-
-from km3flux.data import basepath
+# SciPy is slow to import, so it is only imported (in the functions using it)
+# when the first interpolator is fitted or integral computed.
 
+from km3flux import cache, profiling
+from km3flux.data import basepath, PDG2NAME
 
 logger = logging.getLogger(__name__)
 
+# Number of events evaluated at once by the chunked evaluation
+DEFAULT_CHUNKSIZE = 2**16
+# Minimum number of events to evaluate in parallel
+DEFAULT_PARALLEL_THRESHOLD = 2**20
+
+
+def evaluate_chunked(
+    func,
+    *coords,
+    out=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    workers=1,
+    executor=None,
+    parallel_threshold=DEFAULT_PARALLEL_THRESHOLD,
+    inplace=False,
+):
+    """
+    Evaluate `func` on the coordinates in chunks of fixed size.
+
+    The temporary arrays created by `func` are limited to the chunk size, the
+    result is written to `out`, so the peak memory stays bounded, no matter
+    how many events are evaluated.
+
+    Optionally, the chunks are evaluated in parallel by a thread pool (most of
+    the work is done by NumPy/SciPy without holding the GIL) or by a given
+    executor, e.g. a `concurrent.futures.ProcessPoolExecutor` (in which case
+    `func` needs to be picklable). The chunks are submitted as the results
+    come in, at most twice the number of workers (or CPUs for a given
+    executor) at a time, and the results are written in order.
+
+    Parameters
+    ----------
+    func : callable
+        The function to evaluate, e.g. an interpolator of a `HondaFlux`.
+    coords : array-like
+        The coordinates, broadcast against each other.
+    out : np.array (optional)
+        A C-contiguous array to write the result to, with the (broadcast)
+        shape of the coordinates.
+    chunksize : int (optional)
+        The number of events per chunk.
+    workers : int or None (optional)
+        The number of threads, `None` to use all CPUs. Default is 1 (serial).
+    executor : concurrent.futures.Executor (optional)
+        Evaluate the chunks with this executor instead (`workers` is ignored).
+    parallel_threshold : int (optional)
+        Below this number of events, the evaluation is always serial.
+    inplace : bool (optional)
+        Whether `func` accepts an `out` argument to write its result to, which
+        the serial evaluation passes the chunk of the output as.
+
+    Returns
+    -------
+    np.array
+        `out` (a new array if `out` is not provided).
+    """
+    coords = np.broadcast_arrays(*[np.asarray(c) for c in coords])
+    shape = coords[0].shape
+    # flat views of the contiguous coordinates, the others (e.g. broadcast
+    # along an axis) are gathered chunk by chunk instead of copied in full
+    coords = [c.reshape(-1) if c.flags.c_contiguous else c for c in coords]
+    if out is None:
+        out = np.empty(shape, dtype=float)
+    elif out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError(
+            f"The output array needs to be C-contiguous with shape {shape}."
+        )
+    flat = out.reshape(-1)
+    n_events = flat.size
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if (executor is None and workers <= 1) or n_events < parallel_threshold:
+        for start in range(0, n_events, chunksize):
+            stop = min(start + chunksize, n_events)
+            chunk = _chunk_of(coords, shape, start, stop)
+            if inplace:
+                func(*chunk, out=flat[start:stop])
+            else:
+                flat[start:stop] = func(*chunk)
+        return out
+
+    if executor is not None:
+        max_pending = 2 * (os.cpu_count() or 1)
+        _evaluate_parallel(func, coords, shape, flat, chunksize, executor, max_pending)
+        return out
+
+    import concurrent.futures
+
+    chunksize = min(chunksize, -(-n_events // workers))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        _evaluate_parallel(func, coords, shape, flat, chunksize, pool, 2 * workers)
+    return out
+
+
+def _evaluate_parallel(func, coords, shape, flat, chunksize, executor, max_pending):
+    """
+    Evaluate the chunks with an executor, submitting a chunk whenever one of
+    the (at most `max_pending`) chunks in flight is done, see `evaluate_chunked`.
+    """
+    pending = collections.deque()
+    n_events = flat.size
+    for start in range(0, n_events, chunksize):
+        stop = min(start + chunksize, n_events)
+        chunk = _chunk_of(coords, shape, start, stop)
+        pending.append((start, stop, executor.submit(func, *chunk)))
+        if len(pending) >= max_pending:
+            start, stop, future = pending.popleft()
+            flat[start:stop] = future.result()
+    while pending:
+        start, stop, future = pending.popleft()
+        flat[start:stop] = future.result()
+
+
+def _chunk_of(coords, shape, start, stop):
+    """Return the events `start` to `stop` (in C order) of the coordinates."""
+    index = None
+    chunk = []
+    for c in coords:
+        if c.ndim == 1:
+            chunk.append(c[start:stop])
+        else:
+            if index is None:
+                index = np.unravel_index(np.arange(start, stop), shape)
+            chunk.append(c[index])
+    return chunk
+
+
+def evaluate_stream(func, chunks):
+    """
+    Evaluate `func` on chunks of coordinates, yielding the results one by one.
+
+    Parameters
+    ----------
+    func : callable
+        The function to evaluate, e.g. an interpolator of a `HondaFlux`.
+    chunks : iterable
+        The chunks, either coordinate arrays or tuples of coordinate arrays.
+    """
+    for chunk in chunks:
+        if not isinstance(chunk, tuple):
+            chunk = (chunk,)
+        yield func(*chunk)
+
 
 class BaseFlux(object):
     """Base class for fluxes.
@@ -25,10 +172,14 @@ class BaseFlux(object):
     =======
     __call__(energy, zenith=None)
         Return the flux on energy, optionally on zenith.
-    integrate(zenith=None, emin=1, emax=100, **integargs)
-        Integrate the flux via romberg integration.
+    integrate(zenith=None, emin=1, emax=100, order=64)
+        Integrate the flux via Gauss-Legendre quadrature in log(E).
     integrate_samples(energy, zenith=None, emin=1, emax=100)
         Integrate the flux from given samples, via simpson integration.
+    evaluate(energy, zenith=None, out=None, chunksize=DEFAULT_CHUNKSIZE)
+        Return the flux, evaluated in chunks of fixed size.
+    stream(chunks)
+        Return a generator of the flux on the given chunks.
 
     Example
     =======
@@ -49,8 +200,9 @@ class BaseFlux(object):
     def __init__(self, **kwargs):
         pass
 
+    @profiling.timed("BaseFlux.__call__")
     def __call__(self, energy, zenith=None, interpolate=True):
-        logger.debug("Interpolate? {}".format(interpolate))
+        logger.debug("Interpolate? %s", interpolate)
         energy = np.atleast_1d(energy)
         logger.debug("Entering __call__...")
         if zenith is None:
@@ -62,31 +214,150 @@ class BaseFlux(object):
         logger.debug("Zenith available, using angle-dependent table...")
         return self._with_zenith(energy=energy, zenith=zenith, interpolate=interpolate)
 
+    def evaluate(
+        self,
+        energy,
+        zenith=None,
+        out=None,
+        chunksize=DEFAULT_CHUNKSIZE,
+        interpolate=True,
+        **parallel,
+    ):
+        """
+        Return the flux, evaluated in chunks of fixed size.
+
+        The chunks can be evaluated in parallel with the `workers`, `executor`
+        and `parallel_threshold` options, see `evaluate_chunked`.
+        """
+        if zenith is None:
+            return evaluate_chunked(
+                functools.partial(self, interpolate=interpolate),
+                energy,
+                out=out,
+                chunksize=chunksize,
+                **parallel,
+            )
+        if len(np.atleast_1d(zenith)) != len(np.atleast_1d(energy)):
+            raise ValueError("Zenith and energy need to have the same length.")
+        return evaluate_chunked(
+            functools.partial(self, interpolate=interpolate),
+            energy,
+            zenith,
+            out=out,
+            chunksize=chunksize,
+            **parallel,
+        )
+
+    def stream(self, chunks, interpolate=True):
+        """
+        Return a generator of the flux on the given chunks.
+
+        Parameters
+        ----------
+        chunks : iterable
+            The chunks, either energy arrays or (energy, zenith) tuples.
+        """
+        return evaluate_stream(functools.partial(self, interpolate=interpolate), chunks)
+
     def _averaged(self, energy, interpolate=True):
-        logger.debug("Interpolate? {}".format(interpolate))
+        logger.debug("Interpolate? %s", interpolate)
         raise NotImplementedError
 
     def _with_zenith(self, energy, zenith, interpolate=True):
-        logger.debug("Interpolate? {}".format(interpolate))
+        logger.debug("Interpolate? %s", interpolate)
         raise NotImplementedError
 
-    def integrate(self, zenith=None, emin=1, emax=100, interpolate=True, **integargs):
-        logger.debug("Interpolate? {}".format(interpolate))
-        return romberg(self, emin, emax, vec_func=True, **integargs)
+    def integrate(
+        self, zenith=None, emin=1, emax=100, interpolate=True, order=64, **integargs
+    ):
+        """
+        Integrate the flux over energy.
+
+        Uses a Gauss-Legendre quadrature in log(E), vectorised over arrays of
+        integration bounds (and zeniths), so all integrals are computed with a
+        single evaluation of the flux.
+
+        Parameters
+        ----------
+        zenith : float or array-like (optional)
+            The zenith angle, if the flux depends on it.
+        emin, emax : float or array-like
+            The integration bounds, broadcast against the zenith.
+        order : int (optional)
+            The number of quadrature nodes per integral.
+        integargs : dict (optional)
+            Deprecated, the options of the former Romberg integration (e.g.
+            ``tol`` or ``divmax``) are ignored.
+        """
+        logger.debug("Interpolate? %s", interpolate)
+        if integargs:
+            warnings.warn(
+                "The Romberg integration options "
+                f"({', '.join(sorted(integargs))}) are deprecated and ignored, "
+                "use `order` to set the number of quadrature nodes.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        bounds = [np.asarray(emin, dtype=float), np.asarray(emax, dtype=float)]
+        if zenith is not None:
+            bounds.append(np.asarray(zenith, dtype=float))
+        emin, emax, *zenith_ = np.broadcast_arrays(*bounds)
+        nodes, weights = np.polynomial.legendre.leggauss(order)
+        log_emin = np.log(emin)[..., np.newaxis]
+        half_width = (np.log(emax)[..., np.newaxis] - log_emin) / 2
+        energy = np.exp(log_emin + half_width * (nodes + 1))
+        if zenith is None:
+            flux = self(energy.ravel(), interpolate=interpolate)
+        else:
+            zenith = np.broadcast_to(zenith_[0][..., np.newaxis], energy.shape)
+            flux = self(energy.ravel(), zenith.ravel(), interpolate=interpolate)
+        integrand = np.reshape(flux, energy.shape) * energy * weights
+        return np.sum(integrand, axis=-1) * half_width[..., 0]
 
     def integrate_samples(
         self, energy, zenith=None, emin=1, emax=100, interpolate=True, **integargs
     ):
-        logger.debug("Interpolate? {}".format(interpolate))
+        """
+        Integrate the flux over energy samples, using Simpson's rule.
+
+        The samples can be batched: `energy` and `zenith` are broadcast against
+        each other and the last axis is the energy axis, e.g. an energy array of
+        shape (n,) and a zenith array of shape (m, 1) or (m, n) give m integrals.
+        The flux is evaluated once on the whole sample grid.
+
+        Parameters
+        ----------
+        energy : array-like
+            The energy samples, of shape (n,) or (m, n).
+        zenith : float or array-like (optional)
+            The zenith angle(s), if the flux depends on it.
+        emin, emax : float
+            Only the energy samples within these bounds are used, they have to
+            be the same in each slice.
+        """
+        logger.debug("Interpolate? %s", interpolate)
         energy = np.atleast_1d(energy)
         mask = (emin <= energy) & (energy <= emax)
-        energy = energy[mask]
-        if zenith:
+        if mask.ndim > 1:
+            selected = mask.reshape(-1, mask.shape[-1])
+            if np.any(selected != selected[0]):
+                raise ValueError(
+                    "The energy bounds need to select the same samples in each slice."
+                )
+            mask = selected[0]
+        energy = energy[..., mask]
+        if zenith is None:
+            flux = self(energy.ravel(), interpolate=interpolate)
+            flux = np.reshape(flux, energy.shape)
+        else:
             logger.debug("Zenith available, using angle-dependent table...")
             zenith = np.atleast_1d(zenith)
-            zenith = zenith[mask]
-        flux = self(energy, zenith=zenith, interpolate=interpolate)
-        return simps(flux, energy, **integargs)
+            if zenith.shape[-1] != 1:
+                zenith = zenith[..., mask]
+            energy, zenith = np.broadcast_arrays(energy, zenith)
+            flux = self(energy.ravel(), zenith.ravel(), interpolate=interpolate)
+            flux = np.reshape(flux, energy.shape)
+        return _simpson(flux, x=energy, axis=-1, **integargs)
 
 
 class PowerlawFlux(BaseFlux):
@@ -99,10 +370,13 @@ class PowerlawFlux(BaseFlux):
     def _averaged(self, energy, interpolate=True):
         return self.scale * np.power(energy, -1 * self.gamma)
 
-    def integrate(self, zenith=None, emin=1, emax=100, **integargs):
+    def integrate(self, zenith=None, emin=1, emax=100, **kwargs):
         """Compute analytic integral instead of numeric one."""
+        # integer bounds can not be raised to negative (integer) powers
+        emin = np.asarray(emin, dtype=float)
+        emax = np.asarray(emax, dtype=float)
         if np.around(self.gamma, decimals=1) == 1.0:
-            return np.log(emax) - np.log(emin)
+            return self.scale * (np.log(emax) - np.log(emin))
         num = np.power(emax, 1 - self.gamma) - np.power(emin, 1 - self.gamma)
         den = 1.0 - self.gamma
         return self.scale * (num / den)
@@ -110,6 +384,8 @@ class PowerlawFlux(BaseFlux):
 
 class IsotropicFlux:
     def __init__(self, data, flavors):
+        import scipy.interpolate
+
         self._data = data
         self._flavors = flavors
         for flavor in flavors:
@@ -117,6 +393,7 @@ class IsotropicFlux:
                 data.energy, data[flavor]
             )
             setattr(self, flavor, flux)
+        self._antiderivatives = {}
 
     def __getitem__(self, flavor):
         if flavor in self._flavors:
@@ -126,32 +403,629 @@ class IsotropicFlux:
             "Available flavors: {', '.join(self._flavors)}"
         )
 
+    def integrate(self, flavor, emin, emax):
+        """
+        Integrate the flux of a flavor over energy, vectorised over the bounds.
+
+        Uses the (cached) antiderivative of the spline, the bounds are limited
+        to the energy range of the table.
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        emin, emax : float or array-like
+            The integration bounds.
+        """
+        if flavor not in self._antiderivatives:
+            self._antiderivatives[flavor] = self[flavor].antiderivative()
+        antiderivative = self._antiderivatives[flavor]
+        lower, upper = self._data.energy.min(), self._data.energy.max()
+        emin = np.clip(emin, lower, upper)
+        emax = np.clip(emax, lower, upper)
+        return antiderivative(emax) - antiderivative(emin)
+
+
+HONDA_FLAVORS = ["numu", "anumu", "nue", "anue"]
+
+# The Honda flavors for the PDG IDs (see `km3flux.data.PDG2NAME`)
+PDG2HONDA = {14: "numu", -14: "anumu", 12: "nue", -12: "anue"}
+
+# Matches a block header ("average flux in [cosZ = ..., phi_Az = ...]") including
+# the optional column title line ("Enu(GeV)   NuMu ...") which follows it.
+_HONDA_BLOCK_HEADER = re.compile(
+    rb"average flux in \[([^\]]*)\][^\n]*\n(?:[ \t]*Enu[^\n]*(?:\n|$))?"
+)
+_HONDA_NUMBER = re.compile(rb"[-+]?(?:\d*\.\d+|\d+)")
+
+
+@profiling.timed("read_honda_table")
+def read_honda_table(filepath):
+    """
+    Read a gzipped Honda flux table into a single recarray.
+
+    The file is decompressed once, the block headers are located in a single
+    scan over the raw bytes and all numeric rows are converted in one go.
+    The cosZ and phi_Az ranges of each block are broadcast onto its rows.
+    Works for all table layouts (2006, 2011 and 2014, including seasonal and
+    averaged tables).
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+        Path to the ``.d.gz`` file.
+
+    Returns
+    -------
+    np.recarray
+        with the fields ``cosz_min``, ``cosz_max``, ``phi_az_min``,
+        ``phi_az_max``, ``energy``, the flavors (see ``HONDA_FLAVORS``)
+        and the bin centres ``cosz_mean`` and ``phi_az_mean``.
+    """
+    with profiling.stage("read_honda_table.decompress"):
+        with gzip.open(filepath, "rb") as fobj:
+            raw = fobj.read()
+
+    headers = list(_HONDA_BLOCK_HEADER.finditer(raw))
+    if not headers:
+        raise ValueError(f"No flux blocks found in '{filepath}'.")
+
+    block_ends = [h.start() for h in headers[1:]] + [len(raw)]
+    bodies = [raw[h.end() : end] for h, end in zip(headers, block_ends)]
+    n_rows = np.array(
+        [body.strip().count(b"\n") + 1 if body.strip() else 0 for body in bodies]
+    )
+
+    n_cols = 1 + len(HONDA_FLAVORS)
+    values = np.fromstring(b" ".join(bodies), sep=" ")
+    if values.size != n_rows.sum() * n_cols:
+        raise ValueError(f"Malformed flux table in '{filepath}'.")
+    values = values.reshape(-1, n_cols)
+
+    ranges = np.array(
+        [[float(n) for n in _HONDA_NUMBER.findall(h.group(1))] for h in headers]
+    )
+    if ranges.shape != (len(headers), 4):
+        raise ValueError(f"Unable to parse the block headers in '{filepath}'.")
+
+    fields = ["cosz_min", "cosz_max", "phi_az_min", "phi_az_max", "energy"]
+    fields += HONDA_FLAVORS + ["cosz_mean", "phi_az_mean"]
+    data = np.empty(len(values), dtype=[(field, float) for field in fields])
+
+    ranges = np.repeat(ranges, n_rows, axis=0)
+    for idx, field in enumerate(fields[:4]):
+        data[field] = ranges[:, idx]
+    data["energy"] = values[:, 0]
+    for idx, flavor in enumerate(HONDA_FLAVORS):
+        data[flavor] = values[:, idx + 1]
+    data["cosz_mean"] = (data["cosz_min"] + data["cosz_max"]) / 2.0
+    data["phi_az_mean"] = (data["phi_az_min"] + data["phi_az_max"]) / 2.0
+
+    return data.view(np.recarray)
+
+
+def _simpson(*args, **kwargs):
+    """Simpson's rule of SciPy."""
+    try:
+        from scipy.integrate import simpson
+    except ImportError:  # SciPy < 1.6
+        from scipy.integrate import simps as simpson
+    return simpson(*args, **kwargs)
+
+
+def _regular_step(axis, tolerance=0.5):
+    """The step of an (almost) equidistant axis, `None` if it is irregular.
+
+    The nodes may deviate from the equidistant ones by `tolerance` steps.
+    """
+    step = (axis[-1] - axis[0]) / (len(axis) - 1)
+    nodes = axis[0] + step * np.arange(len(axis))
+    return step if np.all(np.abs(axis - nodes) < tolerance * step) else None
+
+
+def _identity(values):
+    return values
+
+
+def _evaluate_lookup(lookup, flat, rows=None):
+    """Sum the weighted values of `flat` at the cell corners of a lookup.
+
+    If `rows` is given, `flat` is a stack of flat arrays (one per row, e.g. per
+    month) and each event is interpolated on its row.
+    """
+    base, offsets, weights, _ = lookup
+    result = np.zeros(len(base))
+    for offset, weight in zip(offsets, weights):
+        if rows is None:
+            result += weight * flat[base + offset]
+        else:
+            result += weight * flat[rows, base + offset]
+    return result
+
+
+def _binned_quadrature(edges, nodes, order=2):
+    """
+    Gauss-Legendre quadrature nodes and weights for each bin.
+
+    The bins are split at the given (grid) nodes, so that piecewise polynomials
+    with these breakpoints are integrated exactly (up to degree 2*order-1).
+
+    Returns
+    -------
+    (np.array, np.array, np.array)
+        The quadrature points, their weights and the index of their bin.
+    """
+    edges = np.asarray(edges, dtype=float)
+    if np.any(np.diff(edges) <= 0):
+        raise ValueError("The bin edges need to be strictly increasing.")
+    nodes = np.asarray(nodes, dtype=float)
+    inner = nodes[(nodes > edges[0]) & (nodes < edges[-1])]
+    breakpoints = np.union1d(edges, inner)
+    x, w = np.polynomial.legendre.leggauss(order)
+    centres = (breakpoints[1:] + breakpoints[:-1]) / 2
+    half_widths = np.diff(breakpoints) / 2
+    points = (centres[:, np.newaxis] + half_widths[:, np.newaxis] * x).ravel()
+    weights = (half_widths[:, np.newaxis] * w).ravel()
+    bins = np.repeat(np.searchsorted(edges, centres, side="right") - 1, order)
+    return points, weights, bins
+
+
+def _bspline_basis(t, k, x):
+    """
+    Evaluate the k+1 non-zero B-spline basis functions at `x` (de Boor).
+
+    Outside of the base interval the polynomials of the outermost
+    intervals are used, like FITPACK does.
+
+    Returns
+    -------
+    (np.array, list of np.array)
+        The index of the first non-zero basis function (i.e. coefficient)
+        and the values of the k+1 non-zero basis functions.
+    """
+    n = len(t) - k - 1
+    span = np.clip(np.searchsorted(t, x, side="right") - 1, k, n - 1)
+    left = [None] + [x - t[span + 1 - j] for j in range(1, k + 1)]
+    right = [None] + [t[span + j] - x for j in range(1, k + 1)]
+    basis = [np.ones_like(x)]
+    for j in range(1, k + 1):
+        saved = 0.0
+        for r in range(j):
+            temp = basis[r] / (right[r + 1] + left[j - r])
+            basis[r] = saved + right[r + 1] * temp
+            saved = left[j - r] * temp
+        basis.append(saved)
+    return span - k, basis
+
+
+class MultilinearInterpolator:
+    """
+    Multilinear interpolation on a regular grid.
+
+    For (almost) equidistant axes, the cell indices are calculated
+    arithmetically instead of via a binary search (the latter is used as a
+    fallback for irregular axes). Outside of the grid, the values are
+    extrapolated linearly.
+
+    The cell lookup (`lookup`) is separated from the interpolation
+    (`evaluate`), so that it can be shared by grids with the same axes.
+
+    Periodic axes (e.g. the azimuth) are wrapped instead of extrapolated, their
+    last node has to be the first one shifted by the period (see
+    `periodic_grid`).
+
+    Parameters
+    ----------
+    axes : list of np.array
+        The grid axes.
+    grid : np.array
+        The values on the grid, with shape ``[len(axis) for axis in axes]``.
+    periods : list of float or None (optional)
+        The period of each axis, `None` (or NaN) for non-periodic axes.
+    """
+
+    def __init__(self, axes, grid, periods=None):
+        self.axes = [np.asarray(axis, dtype=float) for axis in axes]
+        self.grid = np.asarray(grid, dtype=float)
+        self.n_dim = len(self.axes)
+        if periods is None:
+            periods = [None] * self.n_dim
+        self.periods = [
+            None if period is None or np.isnan(period) else float(period)
+            for period in periods
+        ]
+
+        # The (approximate) steps of the axes which are regular in linear or
+        # logarithmic (e.g. the energy) scale, for the arithmetic cell lookup
+        self._steps = [_regular_step(axis) for axis in self.axes]
+        self._log_steps = [
+            _regular_step(np.log10(axis)) if step is None and axis[0] > 0 else None
+            for step, axis in zip(self._steps, self.axes)
+        ]
+        # exactly equidistant axes (e.g. cos(zenith) and azimuth) need no
+        # correction of the arithmetic cell indices
+        self._exact = [
+            step is not None and _regular_step(axis, 1e-9) is not None
+            for step, axis in zip(self._steps, self.axes)
+        ]
+
+        strides = np.cumprod([1] + [len(axis) for axis in self.axes[:0:-1]])[::-1]
+        self._strides = strides
+        self._corners = list(itertools.product((0, 1), repeat=self.n_dim))
+        self._offsets = [int(np.dot(corner, strides)) for corner in self._corners]
+
+    @staticmethod
+    def periodic_grid(axes, grid, dim, period):
+        """
+        Append the first node of a periodic axis (shifted by the period) to
+        the axes and the grid.
+
+        Returns
+        -------
+        (list of np.array, np.array)
+            The axes and the grid.
+        """
+        axes = list(axes)
+        axes[dim] = np.append(axes[dim], axes[dim][0] + period)
+        grid = np.concatenate([grid, np.take(grid, [0], axis=dim)], axis=dim)
+        return axes, grid
+
+    def _transform_coords(self, coords):
+        return coords
+
+    _transform_values = staticmethod(_identity)
+
+    def _locate(self, dim, x):
+        """Return the cell indices and the relative positions in the cell."""
+        axis = self.axes[dim]
+        step = self._steps[dim]
+        last = len(axis) - 2
+        log_step = self._log_steps[dim]
+        period = self.periods[dim]
+        if self._exact[dim]:
+            u = x - axis[0]
+            if period is not None:
+                u = np.mod(u, period, out=u)
+            u /= step
+            with np.errstate(invalid="ignore"):
+                idx = np.floor(u).astype(np.intp)
+            np.clip(idx, 0, last, out=idx)
+            u -= idx
+            return idx, u
+        if period is not None:
+            x = axis[0] + np.mod(x - axis[0], period)
+        if step is None and log_step is None:
+            idx = np.searchsorted(axis, x, side="right") - 1
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if step is not None:
+                    idx = np.floor((x - axis[0]) / step).astype(np.intp)
+                else:
+                    idx = np.log10(x) - np.log10(axis[0])
+                    idx = np.floor(idx / log_step).astype(np.intp)
+            # correct the off-by-one cases due to the (slightly) irregular nodes
+            np.clip(idx, 0, last, out=idx)
+            idx -= x < axis[idx]
+            np.clip(idx, 0, last, out=idx)
+            idx += x >= axis[idx + 1]
+        np.clip(idx, 0, last, out=idx)
+        lower = axis[idx]
+        return idx, (x - lower) / (axis[idx + 1] - lower)
+
+    def lookup(self, *coords):
+        """
+        Calculate the grid cells and the interpolation weights.
+
+        The result can be reused for grids with the same axes, see `evaluate`.
+
+        Parameters
+        ----------
+        coords : np.array
+            One coordinate array per axis (e.g. energy, cos(zenith), azimuth).
+
+        Returns
+        -------
+        (np.array, list of int, list of np.array, tuple)
+            The flat index of the lower cell corner, the offsets and the
+            weights of the cell corners and the shape of the (broadcast)
+            coordinates.
+        """
+        if len(coords) != self.n_dim:
+            raise ValueError(f"Expected {self.n_dim} coordinates, got {len(coords)}.")
+        coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coords])
+        shape = coords[0].shape
+        coords = self._transform_coords([c.ravel() for c in coords])
+
+        base = 0
+        positions = []
+        for dim, (x, stride) in enumerate(zip(coords, self._strides)):
+            idx, t = self._locate(dim, x)
+            base = base + idx * stride
+            positions.append(t)
+
+        # the products of the weights along each axis, in the order of the corners
+        weights = [1.0 - positions[0], positions[0]]
+        for t in positions[1:]:
+            complement = 1.0 - t
+            weights = [w * f for w in weights for f in (complement, t)]
+        return np.atleast_1d(base), self._offsets, weights, shape
+
+    def evaluate(self, lookup, grid=None):
+        """
+        Interpolate using the result of `lookup`.
+
+        Parameters
+        ----------
+        lookup : tuple
+            The result of `lookup`.
+        grid : np.array (optional)
+            Another grid with the same axes, defaults to the own one.
+        """
+        grid = self.grid if grid is None else grid
+        values = _evaluate_lookup(lookup, grid.ravel())
+        return self._transform_values(values).reshape(lookup[-1])
+
+    def __call__(self, *coords):
+        return self.evaluate(self.lookup(*coords))
+
+    def _segment_integral(self, x0, x1, g0, g1, t):
+        """
+        Integral along the first axis, from the lower node `x0` of a cell to
+        the relative position `t` in the cell, with the values `g0` and `g1`
+        (of the grid) at the cell nodes.
+        """
+        width = x1 - x0
+        return width * t * (g0 + (g1 - g0) * t / 2)
+
+    def _cumulative_integrals(self):
+        """The integrals along the first axis, from the first node to each node."""
+        if getattr(self, "_cumulative", None) is None:
+            x = self.axes[0].reshape((-1,) + (1,) * (self.n_dim - 1))
+            cells = self._segment_integral(
+                x[:-1], x[1:], self.grid[:-1], self.grid[1:], 1.0
+            )
+            cumulative = np.zeros(self.grid.shape)
+            np.cumsum(cells, axis=0, out=cumulative[1:])
+            self._cumulative = cumulative
+        return self._cumulative
+
+    def _antiderivative(self, x, columns):
+        """The integral along the first axis from its first node to `x`."""
+        idx, t = self._locate(0, x)
+        lower = idx * self._strides[0] + columns
+        flat = self.grid.ravel()
+        g0 = flat[lower]
+        g1 = flat[lower + self._strides[0]]
+        partial = self._segment_integral(
+            self.axes[0][idx], self.axes[0][idx + 1], g0, g1, t
+        )
+        return self._cumulative_integrals().ravel()[lower] + partial
+
+    def integrate(self, lower, upper, *coords):
+        """
+        Integrate along the first axis, vectorised over the bounds and coordinates.
+
+        The integrals along the first axis are precomputed for every grid column,
+        so an integral costs only a couple of lookups. The other coordinates are
+        interpolated multilinearly, the bounds are limited to the grid range.
+        Between the nodes of the other coordinates, `LogLogInterpolator`
+        integrates the interpolated (log) flux along the whole first axis per
+        point instead, which is exact but slower.
+
+        Parameters
+        ----------
+        lower, upper : array-like
+            The integration bounds (e.g. in energy).
+        coords : array-like
+            The other coordinates (e.g. cos(zenith), azimuth).
+        """
+        if len(coords) != self.n_dim - 1:
+            raise ValueError(
+                f"Expected {self.n_dim - 1} coordinates, got {len(coords)}."
+            )
+        args = np.broadcast_arrays(
+            *[np.asarray(c, dtype=float) for c in (lower, upper) + coords]
+        )
+        shape = args[0].shape
+        lower = self._transform_coords([args[0].ravel()])[0]
+        upper = self._transform_coords([args[1].ravel()])[0]
+        coords = [c.ravel() for c in args[2:]]
+        first = self.axes[0]
+        lower = np.clip(lower, first[0], first[-1])
+        upper = np.clip(upper, first[0], first[-1])
+
+        columns = 0
+        positions = []
+        for dim, x in enumerate(coords, start=1):
+            idx, t = self._locate(dim, x)
+            columns = columns + idx * self._strides[dim]
+            positions.append(t)
+
+        corner_columns = []
+        weights = []
+        for corner in itertools.product((0, 1), repeat=self.n_dim - 1):
+            weight = 1.0
+            for t, high in zip(positions, corner):
+                weight = weight * (t if high else 1.0 - t)
+            weights.append(weight)
+            corner_columns.append(columns + int(np.dot(corner, self._strides[1:])))
+        result = self._integrate_columns(lower, upper, corner_columns, weights)
+        return result.reshape(shape)
+
+    def _integrate_columns(self, lower, upper, columns, weights):
+        """
+        Integrate between the (transformed and clipped) bounds, blending the
+        integrals of the grid columns with the interpolation weights.
+        """
+        result = np.zeros(len(lower))
+        for column, weight in zip(columns, weights):
+            result += weight * (
+                self._antiderivative(upper, column)
+                - self._antiderivative(lower, column)
+            )
+        return result
+
+
+class LogLogInterpolator(MultilinearInterpolator):
+    """
+    Multilinear interpolation of log10(flux) on a regular (log10(E), ...) grid.
+
+    The Honda energy nodes are (almost) equidistant in log10(E), so the cell
+    indices are calculated arithmetically instead of via a binary search.
+    Interpolating the logarithm of the flux avoids the overshooting of splines
+    in steeply falling regions and extrapolates power-law like in energy.
+
+    Parameters
+    ----------
+    axes : list of np.array
+        The grid axes, the first one being log10(energy).
+    grid : np.array
+        log10 of the flux on the grid, with shape ``[len(axis) for axis in axes]``.
+
+    Example
+    =======
+    >>> interpolator = LogLogInterpolator.from_grid([energy, cosz], flux)
+    >>> interpolator(energies, cos_zeniths)
+    """
+
+    @classmethod
+    def from_grid(cls, axes, grid, periods=None):
+        """Create the interpolator from the energy (first axis) and flux grid."""
+        axes = [np.log10(axes[0])] + list(axes[1:])
+        log_grid = np.log10(np.maximum(grid, np.finfo(float).tiny))
+        return cls(axes, log_grid, periods)
+
+    def _transform_coords(self, coords):
+        return [np.log10(coords[0])] + coords[1:]
+
+    def _transform_values(self, values):
+        return np.power(10.0, values)
+
+    def _segment_integral(self, x0, x1, g0, g1, t):
+        # In each cell, the flux is a power law: f(E) = f0 * (E / E0)^slope.
+        log10 = np.log(10.0)
+        slope = (g1 - g0) / (x1 - x0)
+        u = log10 * (x1 - x0) * t
+        a = slope + 1
+        small = np.abs(a * u) < 1e-9
+        ratio = np.where(small, u, np.expm1(a * u) / np.where(small, 1.0, a))
+        return np.power(10.0, g0 + x0) * ratio
+
+    def _integrate_columns(self, lower, upper, columns, weights):
+        # The log of the flux (not the flux) is linear in the interpolation
+        # weights, so blending the integrals of the columns would deviate (by
+        # up to several percent between the angular nodes) from the integral of
+        # the interpolated flux. Instead, the log-flux is interpolated at every
+        # energy node and integrated cell by cell, in blocks of points.
+        if len(columns) == 1:
+            return super()._integrate_columns(lower, upper, columns, weights)
+        x = self.axes[0]
+        if getattr(self, "_columns", None) is None:
+            # one row per column, so that the columns are gathered contiguously
+            self._columns = np.ascontiguousarray(self.grid.reshape(len(x), -1).T)
+        log10 = np.log(10.0)
+        widths = np.diff(x) * log10
+        result = np.empty(len(lower))
+        blocksize = max(1, 2**20 // len(x))
+        for start in range(0, len(result), blocksize):
+            block = slice(start, start + blocksize)
+            g = sum(
+                weight[block, np.newaxis] * self._columns[column[block]]
+                for column, weight in zip(columns, weights)
+            )
+            # the integral of the power law in a cell is its logarithmic mean
+            # of flux * energy times the width in ln(E)
+            log_fe = g + x
+            fe = np.power(10.0, log_fe)
+            slopes = np.diff(log_fe, axis=1) * log10
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cells = np.where(
+                    np.abs(slopes) < 1e-9,
+                    fe[:, :-1],
+                    np.diff(fe, axis=1) / slopes,
+                )
+            cells *= widths
+            cumulative = np.zeros(g.shape)
+            np.cumsum(cells, axis=1, out=cumulative[:, 1:])
+            points = np.arange(len(g))
+            antiderivatives = []
+            for bound in (upper[block], lower[block]):
+                idx, t = self._locate(0, bound)
+                partial = self._segment_integral(
+                    x[idx], x[idx + 1], g[points, idx], g[points, idx + 1], t
+                )
+                antiderivatives.append(cumulative[points, idx] + partial)
+            result[block] = antiderivatives[0] - antiderivatives[1]
+        return result
+
 
 class HondaFlux:
     """Base class for Honda fluxes
 
     Methods
     =======
+    from_hondafile(filepath, cache_dir=None, interpolation="spline")
+        Create the flux from a Honda table.
+    evaluate(flavor, *coords, out=None, chunksize=...)
+        Evaluate the flux of a flavor in chunks of fixed size.
+    evaluate_all(*coords, flavors=None)
+        Evaluate the flux of several flavors at once.
+    evaluate_pdg(pdgid, *coords, fill_value=0.0)
+        Evaluate the flux for events of mixed flavors, given by their PDG IDs.
+    stream(flavor, chunks)
+        Evaluate the flux of a flavor on the given chunks.
+    integrate(flavor, emin, emax, *coords)
+        Integrate the flux of a flavor over energy.
+    integrate_binned(flavor, energy_edges, cosz_edges=None, phi_edges=None)
+        Integrate the flux of a flavor over the bins of a histogram.
+    coefficients(flavor)
+        Return the interpolation coefficients, fitting them if needed.
     make_regular_grid(axes_keys, flavor)
         Create a n_dim grid based on data.
     interpolation_method(axes_keys, flavor)
         Select the interpolation method.
     parse_categories(f)
-        Integrate the flux from given samples, via simpson integration.
+        Deprecated, split a Honda file into its blocks.
+
+    Parameters
+    ----------
+    data : np.recarray
+        The flux table, see `read_honda_table`.
+    flavors : list of str
+        The flavors (columns of `data`) to interpolate.
+    coefficients : dict (optional)
+        Precomputed interpolation coefficients per flavor, see `coefficients`.
+    interpolation : str (optional)
+        The interpolation engine: "spline" (default) for splines (1D and 2D) or
+        linear interpolation (3D), "loglog" for multilinear interpolation of
+        log10(flux) over log10(E), see `LogLogInterpolator`.
     """
 
-    def __init__(self, data, flavors):
+    interpolations = ("spline", "loglog")
+
+    def __init__(self, data, flavors, coefficients=None, interpolation="spline"):
+        if interpolation not in self.interpolations:
+            raise ValueError(
+                f"Unsupported interpolation '{interpolation}', "
+                f"please use one of: {', '.join(self.interpolations)}."
+            )
 
-        # Add cosz and phi_az bin center
-        data = rfn.append_fields(
-            data, "cosz_mean", (data.cosz_min + data.cosz_max) / 2.0, dtypes=float
-        ).view(np.recarray)
-        data = rfn.append_fields(
-            data, "phi_az_mean", (data.phi_az_min + data.phi_az_max) / 2.0, dtypes=float
-        ).view(np.recarray)
+        # Add cosz and phi_az bin center (already provided by `read_honda_table`)
+        if "cosz_mean" not in data.dtype.names:
+            data = rfn.append_fields(
+                data, "cosz_mean", (data.cosz_min + data.cosz_max) / 2.0, dtypes=float
+            ).view(np.recarray)
+        if "phi_az_mean" not in data.dtype.names:
+            data = rfn.append_fields(
+                data,
+                "phi_az_mean",
+                (data.phi_az_min + data.phi_az_max) / 2.0,
+                dtypes=float,
+            ).view(np.recarray)
 
         self._flavors = flavors
         self._data = data
+        self._interpolation = interpolation
         self._axes = ["energy"]
 
         # Check number of input dimensions
@@ -162,15 +1036,111 @@ class HondaFlux:
 
         self._n_dim = len(self._axes)
 
-        # Set the interpolation method accordingly
-        for flavor in flavors:
-            flux = self.interpolation_method(self._axes, flavor)
-            setattr(self, flavor, flux)
+        # Sort the data once for the regular grid, which is shared by all flavors
+        self._grid_keys = None
+        if self._n_dim > 1:
+            with profiling.stage("HondaFlux.grid"):
+                self._regular_grid_axes(self._axes)
+
+        # The interpolators are created on first access (see `__getattr__`),
+        # using the provided coefficients (e.g. from the on-disk cache) if any
+        self._coefficients = dict(coefficients or {})
+        self._antiderivatives = {}
+        self._binned_integrals = cache.LRUCache(maxsize=32)
+
+    def __getattr__(self, name):
+        # Only called if the attribute is not found, i.e. the interpolator
+        # of a flavor has not been created yet
+        if name in self.__dict__.get("_flavors", ()):
+            return self._interpolator(name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __getstate__(self):
+        # A compact state of plain arrays: the grid axes, the flux values of
+        # each flavor on the grid and the fitted spline coefficients. The
+        # interpolators, antiderivatives and caches are not pickled, the grid
+        # coefficients (which merely reshape the values) are rebuilt.
+        axes = self._regular_grid_axes(self._axes)
+        constants = {
+            key: float(self._data[key][0])
+            for key in ("cosz_mean", "phi_az_mean")
+            if key not in self._axes
+        }
+        return {
+            "flavors": list(self._flavors),
+            "interpolation": self._interpolation,
+            "axes_keys": list(self._axes),
+            "axes": [np.asarray(axis) for axis in axes],
+            "constants": constants,
+            "values": {
+                flavor: np.asarray(self._data[flavor]) for flavor in self._flavors
+            },
+            "coefficients": {
+                flavor: {key: np.asarray(value) for key, value in c.items()}
+                for flavor, c in self._coefficients.items()
+                if "grid" not in c and "log_grid" not in c
+            },
+        }
+
+    def __setstate__(self, state):
+        axes = state["axes"]
+        n_rows = int(np.prod([len(axis) for axis in axes]))
+        columns = {
+            key: grid.ravel()
+            for key, grid in zip(state["axes_keys"], np.meshgrid(*axes, indexing="ij"))
+        }
+        for key, value in state["constants"].items():
+            columns[key] = np.full(n_rows, value)
+        columns.update(state["values"])
+        names = ["energy", "cosz_mean", "phi_az_mean"] + state["flavors"]
+        data = np.rec.fromarrays([columns[name] for name in names], names=names)
+        self.__init__(
+            data,
+            state["flavors"],
+            coefficients=state["coefficients"],
+            interpolation=state["interpolation"],
+        )
+
+    def _interpolator(self, flavor):
+        """Create the interpolator of a flavor and attach it to the instance."""
+        flux = self.interpolator_from_coefficients(self.coefficients(flavor))
+        setattr(self, flavor, flux)
+        return flux
+
+    def coefficients(self, flavor):
+        """
+        Return the interpolation coefficients of a flavor, fitting them if needed.
+
+        Parameters
+        ----------
+        flavor : str
+            column to use to fill the grid
+        """
+        if flavor not in self._coefficients:
+            self._coefficients[flavor] = self.fit_coefficients(self._axes, flavor)
+        return self._coefficients[flavor]
+
+    def _regular_grid_axes(self, axes_keys):
+        """Sort the data along `axes_keys` (only once) and return the grid axes."""
+        axes_keys = tuple(axes_keys)
+        if self._grid_keys != axes_keys:
+            axes = [np.unique(self._data[key]) for key in axes_keys]
+            order = np.lexsort([self._data[key] for key in reversed(axes_keys)])
+            if np.any(order != np.arange(len(order))):
+                self._data.sort(order=list(axes_keys))
+            self._grid_keys = axes_keys
+            self._grid_axes = axes
+        return self._grid_axes
 
     def make_regular_grid(self, axes_keys, flavor):
         """
         Create a n_dim grid based on data.
 
+        The data is sorted only once, subsequent calls with the same
+        `axes_keys` are merely reshaping the flavor column.
+
         Parameters
         ----------
         axes_keys : list of str
@@ -178,18 +1148,11 @@ class HondaFlux:
         flavor : str
             column to use to fill the grid
         """
-        axes = []
-        dim = []
-
-        for key in axes_keys:
-            r = np.sort(np.unique(self._data[key]))
-            axes.append(r)
-            dim.append(len(r))
-
-        self._data.sort(order=axes_keys)
-        grid = np.reshape(self._data[flavor], np.array(dim))
+        axes = self._regular_grid_axes(axes_keys)
+        grid = np.reshape(self._data[flavor], [len(axis) for axis in axes])
         return grid, axes
 
+    @profiling.timed("HondaFlux.interpolation_method")
     def interpolation_method(self, axes_keys, flavor):
         """
         Select the interpolation method.
@@ -199,7 +1162,26 @@ class HondaFlux:
         For 2D interpolation:
         - RectBivariateSpline
         For >= 3D interpolation:
-        - RegularGridInterpolator
+        - MultilinearInterpolator (with a periodic azimuth)
+
+        Parameters
+        ----------
+        axes_keys : list of str
+            axes to be used, define dimensions order
+        flavor : str
+            column to use to fill the grid
+        """
+        coefficients = self.fit_coefficients(axes_keys, flavor)
+        return self.interpolator_from_coefficients(coefficients)
+
+    @profiling.timed("HondaFlux.fit_coefficients")
+    def fit_coefficients(self, axes_keys, flavor):
+        """
+        Fit the interpolation of a flavor and return its coefficients.
+
+        The coefficients are plain arrays, so they can be stored and used to
+        recreate the interpolator without refitting (see
+        `interpolator_from_coefficients`).
 
         Parameters
         ----------
@@ -207,26 +1189,98 @@ class HondaFlux:
             axes to be used, define dimensions order
         flavor : str
             column to use to fill the grid
+
+        Returns
+        -------
+        dict(str -> np.array)
+            The spline knots, coefficients and degrees for 1D and 2D
+            interpolation, the grid axes, values and periods (the azimuth
+            being wrapped around) for >= 3D. The grid axes (with log10(E)),
+            log10(flux) and periods for the "loglog" interpolation.
         """
+        import scipy.interpolate
+
+        if self._interpolation == "loglog":
+            grid, axes, periods = self._periodic_grid(axes_keys, flavor)
+            interpolator = LogLogInterpolator.from_grid(axes, grid, periods)
+            coefficients = {f"axis{i}": a for i, a in enumerate(interpolator.axes)}
+            coefficients["log_grid"] = interpolator.grid
+            coefficients["periods"] = periods
+            return coefficients
+
         if len(axes_keys) == 1:
-            return scipy.interpolate.InterpolatedUnivariateSpline(
+            spline = scipy.interpolate.InterpolatedUnivariateSpline(
                 self._data.energy, self._data[flavor]
             )
+            t, c, k = spline._eval_args
+            return {"t": t, "c": c, "k": np.array(k)}
 
-        elif len(axes_keys) == 2:
-            grid, axes = self.make_regular_grid(axes_keys, flavor)
-            return scipy.interpolate.RectBivariateSpline(*axes, grid).ev
+        grid, axes = self.make_regular_grid(axes_keys, flavor)
 
-        else:
-            grid, axes = self.make_regular_grid(axes_keys, flavor)
-            flux = scipy.interpolate.RegularGridInterpolator(
-                axes, grid, bounds_error=False, fill_value=None
-            )
+        if len(axes_keys) == 2:
+            spline = scipy.interpolate.RectBivariateSpline(*axes, grid)
+            (tx, ty, c), (kx, ky) = spline.tck, spline.degrees
+            return {"tx": tx, "ty": ty, "c": c, "kx": np.array(kx), "ky": np.array(ky)}
+
+        grid, axes, periods = self._periodic_grid(axes_keys, flavor)
+        coefficients = {f"axis{i}": axis for i, axis in enumerate(axes)}
+        coefficients["grid"] = grid
+        coefficients["periods"] = periods
+        return coefficients
+
+    def _periodic_grid(self, axes_keys, flavor):
+        """
+        Create the regular grid with the azimuth wrapped around, see
+        `MultilinearInterpolator.periodic_grid`.
+
+        Returns
+        -------
+        (np.array, list of np.array, np.array)
+            The grid, the axes and the period of each axis (NaN if none).
+        """
+        grid, axes = self.make_regular_grid(axes_keys, flavor)
+        periods = np.full(len(axes), np.nan)
+        if "phi_az_mean" in axes_keys:
+            dim = list(axes_keys).index("phi_az_mean")
+            periods[dim] = 360.0
+            axes, grid = MultilinearInterpolator.periodic_grid(axes, grid, dim, 360.0)
+        return grid, axes, periods
+
+    @staticmethod
+    @profiling.timed("HondaFlux.interpolator_from_coefficients")
+    def interpolator_from_coefficients(coefficients):
+        """
+        Create the interpolator from coefficients obtained by `fit_coefficients`.
+
+        Parameters
+        ----------
+        coefficients : dict(str -> np.array)
+            The interpolation coefficients.
+        """
+        import scipy.interpolate
+
+        if "log_grid" in coefficients:
+            log_grid = coefficients["log_grid"]
+            axes = [coefficients[f"axis{i}"] for i in range(log_grid.ndim)]
+            return LogLogInterpolator(axes, log_grid, coefficients.get("periods"))
+
+        elif "t" in coefficients:
+            tck = (coefficients["t"], coefficients["c"], int(coefficients["k"]))
+            return scipy.interpolate.InterpolatedUnivariateSpline._from_tck(tck)
 
-            def columnar_interface(*args):
-                return flux(np.stack(args).T)
+        elif "tx" in coefficients:
+            spline = scipy.interpolate.RectBivariateSpline.__new__(
+                scipy.interpolate.RectBivariateSpline
+            )
+            spline.tck = coefficients["tx"], coefficients["ty"], coefficients["c"]
+            spline.degrees = int(coefficients["kx"]), int(coefficients["ky"])
+            spline.fp = 0.0
+            return spline.ev
 
-            return columnar_interface
+        else:
+            grid = coefficients["grid"]
+            axes = [coefficients[f"axis{i}"] for i in range(grid.ndim)]
+            return MultilinearInterpolator(axes, grid, coefficients.get("periods"))
 
     def __getitem__(self, flavor):
         if flavor in self._flavors:
@@ -236,49 +1290,458 @@ class HondaFlux:
             "Available flavors: {', '.join(self._flavors)}"
         )
 
-    @classmethod
-    def from_hondafile(cls, filepath):
+    @profiling.timed("HondaFlux.evaluate")
+    def evaluate(
+        self, flavor, *coords, out=None, chunksize=DEFAULT_CHUNKSIZE, **parallel
+    ):
+        """
+        Evaluate the flux of a flavor in chunks of fixed size.
+
+        The chunks can be evaluated in parallel with the `workers`, `executor`
+        and `parallel_threshold` options, see `evaluate_chunked`.
 
-        with gzip.open(filepath, "r") as fobj:
-            flavors = ["numu", "anumu", "nue", "anue"]
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        coords : array-like
+            The energy and, depending on the dimension of the table, the
+            cos(zenith) and the azimuth.
+        out : np.array (optional)
+            A C-contiguous array to write the result to.
+        chunksize : int (optional)
+            The number of events per chunk.
+        """
+        return evaluate_chunked(
+            self[flavor], *coords, out=out, chunksize=chunksize, **parallel
+        )
 
-            cats = cls.parse_categories(cls, fobj)
+    def stream(self, flavor, chunks):
+        """
+        Return a generator of the flux of a flavor on the given chunks.
 
-            data = []
-            for header, content in cats:
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        chunks : iterable
+            The chunks, tuples of coordinate arrays (or energy arrays for
+            1D tables).
+        """
+        return evaluate_stream(self[flavor], chunks)
 
-                # Split the header to get cosZ and phi_Az ranges (4 numbers)
-                header = " ".join(re.findall(r"[-+]?(?:\d*\.\d+|\d+)", header))
-                header_cols = ["cosz_min", "cosz_max", "phi_az_min", "phi_az_max"]
+    @profiling.timed("HondaFlux.evaluate_all")
+    def evaluate_all(self, *coords, flavors=None):
+        """
+        Evaluate the flux of several flavors at once.
 
-                # Create a dummy file object from sub range content +
-                # additional columns for the cos Zenith and phi
-                # Azimuth
-                f = io.StringIO(header.join([""] + content))
+        The grid cell lookup and the interpolation weights (or spline basis
+        functions) are calculated only once and shared by all flavors.
 
-                # Create a recarray from the file
-                data_tmp = np.recfromcsv(
-                    f,
-                    names=header_cols + ["energy"] + flavors,
-                    skip_header=2,
-                    delimiter=" ",
+        Parameters
+        ----------
+        coords : array-like
+            The energy and, depending on the dimension of the table, the
+            cos(zenith) and the azimuth.
+        flavors : list of str (optional)
+            The flavors to evaluate, defaults to all flavors.
+
+        Returns
+        -------
+        np.array
+            The flux with shape ``(n_events, n_flavors)``.
+        """
+        flavors = self._flavors if flavors is None else list(flavors)
+        for flavor in flavors:
+            if flavor not in self._flavors:
+                raise KeyError(
+                    f"Flavor '{flavor}' not present in data. "
+                    f"Available flavors: {', '.join(self._flavors)}"
                 )
-                data.append(data_tmp)
+        if len(coords) != self._n_dim:
+            raise ValueError(f"Expected {self._n_dim} coordinates, got {len(coords)}.")
+
+        shared = self._shared_lookup(flavors, coords)
+        if shared is None:
+            return np.stack([self[flavor](*coords) for flavor in flavors], axis=-1)
+        lookup, flats, transform = shared
+        shape = lookup[-1]
+        return np.stack(
+            [
+                transform(_evaluate_lookup(lookup, flat)).reshape(shape)
+                for flat in flats
+            ],
+            axis=-1,
+        )
+
+    @profiling.timed("HondaFlux.evaluate_pdg")
+    def evaluate_pdg(self, pdgid, *coords, fill_value=0.0):
+        """
+        Evaluate the flux for events of mixed flavors, given by their PDG IDs.
+
+        The events are grouped by flavor internally, each group is evaluated in
+        one go and the results are returned in the input order.
+
+        Parameters
+        ----------
+        pdgid : array-like(int)
+            The PDG IDs of the neutrinos, see `km3flux.data.PDG2NAME`.
+        coords : array-like
+            The energy and, depending on the dimension of the table, the
+            cos(zenith) and the azimuth.
+        fill_value : float (optional)
+            The flux for flavors without table (i.e. tau neutrinos), default 0.
+
+        Returns
+        -------
+        np.array
+        """
+        if len(coords) != self._n_dim:
+            raise ValueError(f"Expected {self._n_dim} coordinates, got {len(coords)}.")
+        pdgid, *coords = np.broadcast_arrays(
+            np.asarray(pdgid), *[np.asarray(c, dtype=float) for c in coords]
+        )
+        unknown = ~np.isin(pdgid, list(PDG2NAME))
+        if np.any(unknown):
+            raise ValueError(
+                f"Unsupported PDG IDs: {', '.join(map(str, np.unique(pdgid[unknown])))}"
+            )
 
-            # Merge invidual rec arrays to one
-            data = rfn.stack_arrays(data, asrecarray=True, usemask=False)
+        flux = np.full(pdgid.shape, fill_value, dtype=float)
+        for pdg, flavor in PDG2HONDA.items():
+            if flavor not in self._flavors:
+                continue
+            mask = pdgid == pdg
+            if np.any(mask):
+                flux[mask] = self[flavor](*[c[mask] for c in coords])
+        return flux
+
+    @profiling.timed("HondaFlux.integrate")
+    def integrate(self, flavor, emin, emax, *coords):
+        """
+        Integrate the flux of a flavor over energy.
 
-            return cls(data, flavors)
+        The antiderivative of the interpolated table is computed once per
+        flavor, so that each integral costs only a couple of lookups. The
+        calculation is vectorised over arrays of bounds (and coordinates).
+        The bounds are limited to the energy range of the table. For the
+        "loglog" interpolation, the integrals are exact for the interpolated
+        flux, also between the angular nodes (where they are computed per
+        point, about ten times slower).
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        emin, emax : float or array-like
+            The integration bounds in GeV.
+        coords : float or array-like
+            Depending on the dimension of the table, the cos(zenith) and the
+            azimuth.
+
+        Returns
+        -------
+        np.array
+            The integrated flux in (m^2 sec sr)^-1.
+        """
+        if len(coords) != self._n_dim - 1:
+            raise ValueError(
+                f"Expected {self._n_dim - 1} coordinates, got {len(coords)}."
+            )
+        antiderivative = self._antiderivative(flavor)
+        if isinstance(antiderivative, MultilinearInterpolator):
+            return antiderivative.integrate(emin, emax, *coords)
+
+        args = np.broadcast_arrays(
+            *[np.asarray(c, dtype=float) for c in (emin, emax) + coords]
+        )
+        shape = args[0].shape
+        emin, emax, *coords = [a.ravel() for a in args]
+        t = antiderivative.t
+        k = antiderivative.k
+        # limit to the base interval of the spline (i.e. the energy range)
+        emin = np.clip(emin, t[k], t[-k - 1])
+        emax = np.clip(emax, t[k], t[-k - 1])
+
+        if not coords:
+            return (antiderivative(emax) - antiderivative(emin)).reshape(shape)
+
+        # 2D: the antiderivative along the energy has coefficients with shape
+        # (n_energy, n_cosz), combine it with the cos(zenith) B-spline basis
+        coefficients = self.coefficients(flavor)
+        ty, ky = coefficients["ty"], int(coefficients["ky"])
+        y = np.clip(coords[0], ty[ky], ty[-ky - 1])
+        start_y, basis_y = _bspline_basis(ty, ky, y)
+        flat = antiderivative.c.ravel()
+        n_y = antiderivative.c.shape[1]
+        result = np.zeros(len(emin))
+        for bound, sign in ((emax, 1.0), (emin, -1.0)):
+            start_x, basis_x = _bspline_basis(t, k, bound)
+            for a in range(k + 1):
+                for b in range(ky + 1):
+                    values = flat[(start_x + a) * n_y + start_y + b]
+                    result += sign * basis_x[a] * basis_y[b] * values
+        return result.reshape(shape)
+
+    @profiling.timed("HondaFlux.integrate_binned")
+    def integrate_binned(self, flavor, energy_edges, cosz_edges=None, phi_edges=None):
+        """
+        Integrate the flux of a flavor over the bins of a histogram.
+
+        The energy integrals are obtained from the antiderivative (see
+        `integrate`) and the angular integrals from a Gauss-Legendre quadrature
+        between the grid nodes (exact for the piecewise (bi)linear and cubic
+        interpolations), all in one vectorised pass. The results are cached
+        per set of bin edges.
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        energy_edges : array-like
+            The energy bin edges in GeV.
+        cosz_edges : array-like (optional)
+            The cos(zenith) bin edges, the full range [-1, 1] by default.
+        phi_edges : array-like (optional)
+            The azimuth bin edges in degrees, the full range [0, 360] by default.
+
+        Returns
+        -------
+        np.array
+            The number of neutrinos per (m^2 sec) in each bin (the azimuth is
+            integrated in radians), with one dimension for each given edges
+            array (energy [, cos(zenith)] [, azimuth]).
+        """
+        edges = [np.asarray(energy_edges, dtype=float)]
+        edges.append(np.asarray([-1.0, 1.0] if cosz_edges is None else cosz_edges))
+        edges.append(np.asarray([0.0, 360.0] if phi_edges is None else phi_edges))
+        edges = [e.astype(float) for e in edges]
+        if len(edges[0]) < 2 or np.any(np.diff(edges[0]) <= 0):
+            raise ValueError("The bin edges need to be strictly increasing.")
+        key = (flavor,) + tuple(e.tobytes() for e in edges)
+        result = self._binned_integrals.get(key)
+        if result is None:
+            result = self._integrate_binned(flavor, *edges)
+            result.flags.writeable = False
+            self._binned_integrals.put(key, result)
+        shape = [len(edges[0]) - 1]
+        shape += [
+            len(e) - 1
+            for e, given in zip(edges[1:], (cosz_edges, phi_edges))
+            if given is not None
+        ]
+        return result.reshape(shape)
+
+    def _integrate_binned(self, flavor, energy_edges, cosz_edges, phi_edges):
+        """Integrate over the bins, see `integrate_binned`."""
+        # the interpolation is (at most) cubic between the grid nodes, a flux
+        # not depending on an angle only needs a single point per bin
+        axes = self._regular_grid_axes(self._axes)
+        quadratures = []
+        for dim, edges in enumerate([cosz_edges, phi_edges], start=1):
+            if dim < self._n_dim:
+                quadratures.append(_binned_quadrature(edges, axes[dim], order=2))
+            else:
+                quadratures.append(_binned_quadrature(edges, [], order=1))
+        (cosz, cosz_weights, cosz_bins), (phi, phi_weights, phi_bins) = quadratures
+        phi_weights = np.radians(phi_weights)
+
+        coords = np.meshgrid(cosz, phi, indexing="ij")
+        coords = [c.ravel() for c in coords][: self._n_dim - 1]
+        # the integrals from the lowest edge to each edge at each point, in a
+        # single call broadcasting the edges against the points
+        antiderivatives = self.integrate(
+            flavor, energy_edges[0], energy_edges[:, np.newaxis], *coords
+        )
+        antiderivatives = np.broadcast_to(
+            antiderivatives, (len(energy_edges), len(cosz) * len(phi))
+        )
+        energy_integrals = np.diff(antiderivatives, axis=0).reshape(
+            -1, len(cosz), len(phi)
+        )
+
+        weighted = energy_integrals * np.outer(cosz_weights, phi_weights)
+        result = np.zeros(
+            (len(energy_edges) - 1, len(cosz_edges) - 1, len(phi_edges) - 1)
+        )
+        np.add.at(
+            result,
+            (slice(None), cosz_bins[:, np.newaxis], phi_bins[np.newaxis, :]),
+            weighted,
+        )
+        return result
+
+    def _antiderivative(self, flavor):
+        """
+        Return the (cached) antiderivative along the energy of a flavor.
+
+        A `scipy.interpolate.BSpline` for the spline interpolation (with the
+        cos(zenith) as second coefficient dimension for 2D tables), otherwise
+        a `MultilinearInterpolator` with precomputed cumulative integrals.
+        """
+        import scipy.interpolate
+
+        if flavor in self._antiderivatives:
+            return self._antiderivatives[flavor]
+        coefficients = self.coefficients(flavor)
+        if "t" in coefficients:
+            t, k = coefficients["t"], int(coefficients["k"])
+            c = coefficients["c"][: len(t) - k - 1]
+            antiderivative = scipy.interpolate.BSpline(t, c, k).antiderivative()
+        elif "tx" in coefficients:
+            tx, kx = coefficients["tx"], int(coefficients["kx"])
+            ty, ky = coefficients["ty"], int(coefficients["ky"])
+            c = np.reshape(coefficients["c"], (len(tx) - kx - 1, len(ty) - ky - 1))
+            antiderivative = scipy.interpolate.BSpline(tx, c, kx).antiderivative()
+        else:
+            antiderivative = self.interpolator_from_coefficients(coefficients)
+            antiderivative._cumulative_integrals()
+        self._antiderivatives[flavor] = antiderivative
+        return antiderivative
+
+    def _shared_lookup(self, flavors, coords):
+        """
+        Calculate a lookup (see `MultilinearInterpolator.lookup`) shared by flavors.
+
+        Returns
+        -------
+        (tuple, list of np.array, callable) or None
+            The lookup, the flat coefficients of each flavor and the
+            transformation to apply after the interpolation. `None` if the
+            flavors do not share the same grid or knots.
+        """
+        coefficients = [self.coefficients(flavor) for flavor in flavors]
+        return self._coefficients_lookup(coefficients, coords)
+
+    @classmethod
+    def _coefficients_lookup(cls, coefficients, coords):
+        """
+        Calculate a lookup shared by several sets of interpolation coefficients
+        (e.g. of several flavors or tables), see `_shared_lookup`.
+        """
+        first = coefficients[0]
+
+        if "log_grid" in first or "grid" in first:
+            key = "log_grid" if "log_grid" in first else "grid"
+            n_dim = first[key].ndim
+            for c in coefficients[1:]:
+                if c[key].shape != first[key].shape or not all(
+                    np.array_equal(c[f"axis{i}"], first[f"axis{i}"])
+                    for i in range(n_dim)
+                ):
+                    return None
+            interpolator = cls.interpolator_from_coefficients(first)
+            flats = [c[key].ravel() for c in coefficients]
+            return interpolator.lookup(*coords), flats, interpolator._transform_values
+
+        knots = ["t"] if "t" in first else ["tx", "ty"]
+        for c in coefficients[1:]:
+            if not all(np.array_equal(c[key], first[key]) for key in knots):
+                return None
+
+        coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coords])
+        shape = coords[0].shape
+        coords = [c.ravel() for c in coords]
+        flats = [np.asarray(c["c"]).ravel() for c in coefficients]
+
+        if "t" in first:
+            k = int(first["k"])
+            start, basis = _bspline_basis(first["t"], k, coords[0])
+            return (start, list(range(k + 1)), basis, shape), flats, _identity
+
+        # RectBivariateSpline.ev does not extrapolate but clips to the grid
+        tx, ty = first["tx"], first["ty"]
+        kx, ky = int(first["kx"]), int(first["ky"])
+        x = np.clip(coords[0], tx[kx], tx[-kx - 1])
+        y = np.clip(coords[1], ty[ky], ty[-ky - 1])
+        start_x, basis_x = _bspline_basis(tx, kx, x)
+        start_y, basis_y = _bspline_basis(ty, ky, y)
+        n_y = len(ty) - ky - 1
+        offsets, weights = [], []
+        for a in range(kx + 1):
+            for b in range(ky + 1):
+                offsets.append(a * n_y + b)
+                weights.append(basis_x[a] * basis_y[b])
+        lookup = (start_x * n_y + start_y, offsets, weights, shape)
+        return lookup, flats, _identity
+
+    @property
+    def nbytes(self):
+        """
+        The memory used by the table, the fitted interpolation coefficients
+        and the derived integration data (antiderivatives and the memoized
+        binned integrals), which grows as the flux is used.
+        """
+        nbytes = self._data.nbytes
+        for coefficients in self._coefficients.values():
+            nbytes += sum(c.nbytes for c in coefficients.values())
+        for antiderivative in self._antiderivatives.values():
+            if isinstance(antiderivative, MultilinearInterpolator):
+                nbytes += antiderivative._cumulative_integrals().nbytes
+            else:
+                nbytes += antiderivative.t.nbytes + antiderivative.c.nbytes
+        nbytes += sum(result.nbytes for result in self._binned_integrals.values())
+        return nbytes
+
+    @classmethod
+    @profiling.timed("HondaFlux.from_hondafile")
+    def from_hondafile(cls, filepath, cache_dir=None, interpolation="spline"):
+        """
+        Create the flux from a Honda table.
+
+        Parameters
+        ----------
+        filepath : str or pathlib.Path
+            Path to the ``.d.gz`` file.
+        cache_dir : str or pathlib.Path (optional)
+            If provided, the parsed table and the fitted interpolation
+            coefficients are stored in (and loaded from) this directory, see
+            `km3flux.cache`.
+        interpolation : str (optional)
+            The interpolation engine, "spline" (default) or "loglog".
+        """
+        if cache_dir is None:
+            return cls(
+                read_honda_table(filepath), HONDA_FLAVORS, interpolation=interpolation
+            )
+
+        key = cache.cache_key(filepath, interpolation)
+        entry = cache.load(cache_dir, key)
+        if entry is not None:
+            data, flavors, coefficients = entry
+            return cls(
+                data, flavors, coefficients=coefficients, interpolation=interpolation
+            )
+
+        flux = cls(
+            read_honda_table(filepath), HONDA_FLAVORS, interpolation=interpolation
+        )
+        coefficients = {flavor: flux.coefficients(flavor) for flavor in flux._flavors}
+        cache.store(cache_dir, key, flux._data, flux._flavors, coefficients)
+        return flux
 
     def parse_categories(self, f):
         """
-        Select the interpolation method.
+        Split a Honda file into its blocks of a (cos(zenith), azimuth) bin.
+
+        Deprecated, the tables are parsed by `read_honda_table`.
 
         Parameters
         ----------
         f : file object
             Honda file to be parsed
+
+        Returns
+        -------
+        list of (str, list of str)
+            The header and the lines (including the header) of each block.
         """
+        warnings.warn(
+            "HondaFlux.parse_categories is deprecated, "
+            "use `read_honda_table` to parse the Honda tables.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         cats = []
         last_cat_start = -1
         last_cat_header = ""
@@ -296,6 +1759,584 @@ class HondaFlux:
         return cats
 
 
+def _month_positions(time, smooth=False):
+    """
+    Return the months (0 is January) of timestamps and, if `smooth`, the
+    adjacent months and their interpolation weights.
+
+    The monthly tables are taken to be representative at the middle of the
+    month, in between the values are interpolated linearly (wrapping around
+    the turn of the year).
+    """
+    time = _as_datetime64(time)
+    months = time.astype("datetime64[M]")
+    index = months.astype(np.int64) % 12
+    if not smooth:
+        return index
+    start = months.astype(time.dtype)
+    fraction = (time - start) / ((months + 1).astype(time.dtype) - start)
+    position = index + fraction - 0.5
+    lower = np.floor(position)
+    weight = position - lower
+    lower = lower.astype(np.int64) % 12
+    return lower, (lower + 1) % 12, weight
+
+
+def _as_datetime64(time):
+    """Convert timestamps (or UNIX times in seconds) to `np.datetime64`."""
+    time = np.asarray(time)
+    if np.issubdtype(time.dtype, np.datetime64):
+        return time
+    if np.issubdtype(time.dtype, np.number):
+        return np.round(time * 1e6).astype(np.int64).astype("datetime64[us]")
+    return time.astype("datetime64[us]")
+
+
+# The solar minimum at the start of solar cycle 25 and the mean cycle length,
+# for the default mapping of times to the solar activity (see `solar_activity`)
+SOLAR_MINIMUM = np.datetime64("2019-12-15")
+SOLAR_CYCLE = 11.0 * 365.25 * 86400  # seconds
+
+
+def solar_activity(time, minimum=SOLAR_MINIMUM, period=SOLAR_CYCLE):
+    """
+    Return the solar activity of timestamps, 0 at solar minimum and 1 at
+    solar maximum, for a sinusoidal solar cycle.
+
+    Parameters
+    ----------
+    time : array-like
+        The timestamps as `np.datetime64` (or convertible, e.g. ISO strings)
+        or UNIX times in seconds.
+    minimum : np.datetime64 (optional)
+        The time of a solar minimum.
+    period : float (optional)
+        The length of the solar cycle in seconds.
+
+    Returns
+    -------
+    np.array
+    """
+    elapsed = (_as_datetime64(time) - np.datetime64(minimum, "us")) / np.timedelta64(
+        1, "s"
+    )
+    return 0.5 - 0.5 * np.cos(2 * np.pi * elapsed / period)
+
+
+class _HondaFluxStack:
+    """
+    Several Honda tables on the same grid (e.g. of different months), which
+    are evaluated with a single cell lookup (or spline basis) shared by all
+    tables.
+    """
+
+    def __init__(self, fluxes):
+        self.fluxes = list(fluxes)
+        first = self.fluxes[0]
+        self._flavors = first._flavors
+        self._n_dim = first._n_dim
+        if any(flux._n_dim != self._n_dim for flux in self.fluxes):
+            raise ValueError("The tables need to have the same dimensions.")
+        self._stacked = {}
+
+    def __getitem__(self, flavor):
+        if flavor not in self._flavors:
+            raise KeyError(
+                f"Flavor '{flavor}' not present in data. "
+                f"Available flavors: {', '.join(self._flavors)}"
+            )
+        return functools.partial(self.evaluate, flavor)
+
+    def _check(self, flavors, coords):
+        flavors = self._flavors if flavors is None else list(flavors)
+        for flavor in flavors:
+            if flavor not in self._flavors:
+                raise KeyError(
+                    f"Flavor '{flavor}' not present in data. "
+                    f"Available flavors: {', '.join(self._flavors)}"
+                )
+        if len(coords) != self._n_dim:
+            raise ValueError(f"Expected {self._n_dim} coordinates, got {len(coords)}.")
+        return flavors
+
+    def _shared_lookup(self, flavors, coords):
+        """
+        Calculate the lookup shared by all tables and the stacked (one row
+        per table) coefficients of each flavor, `None` if the tables do not
+        share their grid.
+        """
+        n_tables = len(self.fluxes)
+        coefficients = [
+            flux.coefficients(flavor) for flavor in flavors for flux in self.fluxes
+        ]
+        shared = HondaFlux._coefficients_lookup(coefficients, coords)
+        if shared is None:
+            return None
+        lookup, flats, transform = shared
+        stacks = []
+        for i, flavor in enumerate(flavors):
+            if flavor not in self._stacked:
+                self._stacked[flavor] = np.stack(
+                    flats[n_tables * i : n_tables * (i + 1)]
+                )
+            stacks.append(self._stacked[flavor])
+        return lookup, stacks, transform
+
+    def _evaluate_tables(self, shared, flavors, tables, coords):
+        """Evaluate each (flat) event on the table given by its index."""
+        if shared is None:
+            values = np.empty((len(coords[0]), len(flavors)))
+            tables = np.broadcast_to(tables, coords[0].shape)
+            for table in np.unique(tables):
+                mask = tables == table
+                values[mask] = self.fluxes[table].evaluate_all(
+                    *[c[mask] for c in coords], flavors=flavors
+                )
+            return values
+        lookup, stacks, transform = shared
+        return np.stack(
+            [transform(_evaluate_lookup(lookup, stack, tables)) for stack in stacks],
+            axis=-1,
+        )
+
+    @property
+    def nbytes(self):
+        """The memory used by the tables and their coefficients."""
+        return sum(flux.nbytes for flux in self.fluxes) + sum(
+            stack.nbytes for stack in self._stacked.values()
+        )
+
+
+class SeasonalHondaFlux(_HondaFluxStack):
+    """
+    Time-resolved Honda flux from the monthly tables.
+
+    The flux of an event is taken from the table of the month of its
+    timestamp or, with ``smooth=True``, interpolated linearly between the
+    tables of the adjacent months (each table being representative at the
+    middle of its month).
+
+    The monthly tables share their grid, so the cell lookup (or spline basis)
+    of the coordinates is calculated once and the values of all months are
+    gathered from the stacked coefficients, without masking the events by
+    month.
+
+    Parameters
+    ----------
+    fluxes : list of HondaFlux
+        The fluxes of the twelve months, starting with January.
+
+    Example
+    =======
+    >>> from km3flux.flux import Honda
+    >>> seasonal = Honda().seasonal_flux(2014, "Frejus")
+    >>> times = np.array(["2021-01-15", "2021-07-01"], dtype="datetime64")
+    >>> seasonal["numu"](times, energies, cos_zeniths, azimuths, smooth=True)
+    """
+
+    def __init__(self, fluxes):
+        if len(fluxes) != 12:
+            raise ValueError(f"Expected the fluxes of 12 months, got {len(fluxes)}.")
+        super().__init__(fluxes)
+
+    def evaluate(self, flavor, time, *coords, smooth=False):
+        """
+        Evaluate the flux of a flavor at the given times.
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        time : array-like
+            The timestamps as `np.datetime64` (or convertible, e.g. ISO
+            strings) or UNIX times in seconds.
+        coords : array-like
+            The energy and, depending on the dimension of the tables, the
+            cos(zenith) and the azimuth. Broadcast against `time`.
+        smooth : bool (optional)
+            Interpolate linearly between the monthly tables.
+
+        Returns
+        -------
+        np.array
+        """
+        return self.evaluate_all(time, *coords, flavors=[flavor], smooth=smooth)[..., 0]
+
+    @profiling.timed("SeasonalHondaFlux.evaluate_all")
+    def evaluate_all(self, time, *coords, flavors=None, smooth=False):
+        """
+        Evaluate the flux of several flavors at the given times.
+
+        See `evaluate` for the parameters.
+
+        Returns
+        -------
+        np.array
+            The flux with shape ``(n_events, n_flavors)``.
+        """
+        flavors = self._check(flavors, coords)
+        time, *coords = np.broadcast_arrays(
+            _as_datetime64(time), *[np.asarray(c, dtype=float) for c in coords]
+        )
+        shape = time.shape
+        coords = [c.ravel() for c in coords]
+        shared = self._shared_lookup(flavors, coords)
+        if smooth:
+            lower, upper, weight = _month_positions(time.ravel(), smooth=True)
+            values = self._evaluate_tables(shared, flavors, lower, coords)
+            values *= (1.0 - weight)[:, np.newaxis]
+            values += weight[:, np.newaxis] * self._evaluate_tables(
+                shared, flavors, upper, coords
+            )
+        else:
+            months = _month_positions(time.ravel())
+            values = self._evaluate_tables(shared, flavors, months, coords)
+        return values.reshape(shape + (len(flavors),))
+
+
+class SolarModulatedHondaFlux(_HondaFluxStack):
+    """
+    Honda flux modulated by the solar activity, blending the solar minimum
+    and maximum tables.
+
+    The flux is ``(1 - w) * flux_min + w * flux_max`` with the solar activity
+    ``w`` of each event, given directly or via the timestamps (see
+    `solar_activity`). Both tables share their grid, so the cell lookup (or
+    spline basis) of the coordinates is calculated only once.
+
+    Parameters
+    ----------
+    solmin : HondaFlux
+        The flux at solar minimum.
+    solmax : HondaFlux
+        The flux at solar maximum.
+    activity : callable (optional)
+        Maps timestamps to the solar activity (0 at minimum, 1 at maximum),
+        default is `solar_activity`.
+
+    Example
+    =======
+    >>> from km3flux.flux import Honda
+    >>> flux = Honda().solar_modulated_flux(2014, "Frejus")
+    >>> flux["numu"](energies, cos_zeniths, azimuths, time=times)
+    >>> flux["numu"](energies, cos_zeniths, azimuths, weight=0.3)
+    """
+
+    def __init__(self, solmin, solmax, activity=solar_activity):
+        super().__init__([solmin, solmax])
+        self.activity = activity
+
+    def evaluate(self, flavor, *coords, weight=None, time=None):
+        """
+        Evaluate the flux of a flavor for the given solar activity.
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        coords : array-like
+            The energy and, depending on the dimension of the tables, the
+            cos(zenith) and the azimuth.
+        weight : array-like (optional)
+            The solar activity, 0 for the solar minimum and 1 for the maximum
+            table. Broadcast against the coordinates.
+        time : array-like (optional)
+            The timestamps (instead of `weight`), mapped to the solar activity
+            by `activity`.
+
+        Returns
+        -------
+        np.array
+        """
+        return self.evaluate_all(*coords, flavors=[flavor], weight=weight, time=time)[
+            ..., 0
+        ]
+
+    @profiling.timed("SolarModulatedHondaFlux.evaluate_all")
+    def evaluate_all(self, *coords, flavors=None, weight=None, time=None):
+        """
+        Evaluate the flux of several flavors for the given solar activity.
+
+        See `evaluate` for the parameters.
+
+        Returns
+        -------
+        np.array
+            The flux with shape ``(n_events, n_flavors)``.
+        """
+        flavors = self._check(flavors, coords)
+        if (weight is None) == (time is None):
+            raise ValueError("Either the solar activity or the time is required.")
+        if weight is None:
+            weight = self.activity(time)
+        weight, *coords = np.broadcast_arrays(
+            np.asarray(weight, dtype=float),
+            *[np.asarray(c, dtype=float) for c in coords],
+        )
+        shape = weight.shape
+        weight = weight.ravel()[:, np.newaxis]
+        coords = [c.ravel() for c in coords]
+        shared = self._shared_lookup(flavors, coords)
+        values = self._evaluate_tables(shared, flavors, 0, coords)
+        values += weight * (self._evaluate_tables(shared, flavors, 1, coords) - values)
+        return values.reshape(shape + (len(flavors),))
+
+
+def _depends_on_zenith(flux):
+    """`True` if a `BaseFlux` implements the zenith dependent flux."""
+    return type(flux)._with_zenith is not BaseFlux._with_zenith
+
+
+class CompositeFlux:
+    """
+    The sum of several fluxes with scale factors, e.g. the atmospheric
+    (Honda) plus one or more astrophysical (power law) fluxes.
+
+    The components are `HondaFlux`, `IsotropicFlux` or `BaseFlux` instances,
+    all evaluated on the same coordinates (energy and, depending on the
+    components, cos(zenith) and azimuth). A `BaseFlux` gets the zenith angle
+    (in radians) if it depends on it and contributes to all flavors unless
+    restricted to some.
+
+    The components are evaluated in one pass over chunks of the events, their
+    scaled contributions are summed directly into the output. The integrals
+    over energy use the analytic (or antiderivative) integration of each
+    component.
+
+    Parameters
+    ----------
+    components : list of flux or (flux, scale) or (flux, scale, flavors)
+        The components, see `add`.
+
+    Example
+    =======
+    >>> atmospheric = Honda().flux(2014, "Frejus")
+    >>> flux = CompositeFlux([atmospheric, (PowerlawFlux(gamma=2.5), 1.2e-4)])
+    >>> flux["numu"](energies, cos_zeniths, azimuths)
+    >>> flux.integrate("numu", 1, 100, cos_zeniths, azimuths)
+    """
+
+    def __init__(self, components=()):
+        self.components = []
+        for component in components:
+            if isinstance(component, tuple):
+                self.add(*component)
+            else:
+                self.add(component)
+
+    def add(self, flux, scale=1.0, flavors=None):
+        """
+        Add a component.
+
+        Parameters
+        ----------
+        flux : HondaFlux, IsotropicFlux or BaseFlux
+            The flux.
+        scale : float (optional)
+            The scale factor.
+        flavors : list of str (optional)
+            The flavors the component contributes to, by default the flavors
+            of a `HondaFlux` or `IsotropicFlux` and all flavors for a
+            `BaseFlux`.
+
+        Returns
+        -------
+        CompositeFlux
+            The composite itself.
+        """
+        if not isinstance(flux, (HondaFlux, IsotropicFlux, BaseFlux)):
+            raise TypeError(
+                f"Unsupported flux component of type '{type(flux).__name__}'."
+            )
+        if flavors is None and not isinstance(flux, BaseFlux):
+            flavors = flux._flavors
+        self.components.append(
+            (flux, float(scale), None if flavors is None else list(flavors))
+        )
+        return self
+
+    @property
+    def flavors(self):
+        """The flavors of the components, `None` if any contributes to all."""
+        flavors = []
+        for _, _, component_flavors in self.components:
+            if component_flavors is None:
+                return None
+            flavors += [f for f in component_flavors if f not in flavors]
+        return flavors
+
+    def _components_of(self, flavor):
+        components = [
+            (flux, scale)
+            for flux, scale, flavors in self.components
+            if flavors is None or flavor in flavors
+        ]
+        if not components:
+            raise KeyError(
+                f"Flavor '{flavor}' not present in any component. "
+                f"Available flavors: {', '.join(self.flavors or [])}"
+            )
+        return components
+
+    def __getitem__(self, flavor):
+        self._components_of(flavor)
+        return functools.partial(self.__call__, flavor)
+
+    @profiling.timed("CompositeFlux.__call__")
+    def __call__(self, flavor, energy, cosz=None, phi=None):
+        """
+        Evaluate the total flux of a flavor.
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        energy : array-like
+            The energy in GeV.
+        cosz : array-like (optional)
+            The cos(zenith), required by angle-dependent components.
+        phi : array-like (optional)
+            The azimuth in degrees, required by 3D Honda components.
+        """
+        return self.evaluate(flavor, energy, cosz, phi)
+
+    def evaluate(
+        self,
+        flavor,
+        energy,
+        cosz=None,
+        phi=None,
+        out=None,
+        chunksize=DEFAULT_CHUNKSIZE,
+        **parallel,
+    ):
+        """
+        Evaluate the total flux of a flavor in chunks of fixed size.
+
+        The chunks can be evaluated in parallel with the `workers`, `executor`
+        and `parallel_threshold` options, see `evaluate_chunked`. See
+        `__call__` for the coordinates.
+
+        Parameters
+        ----------
+        out : np.array (optional)
+            A C-contiguous array to write the result to.
+        chunksize : int (optional)
+            The number of events per chunk.
+        """
+        components = self._components_of(flavor)
+        coords = [c for c in (energy, cosz, phi) if c is not None]
+        if phi is not None and cosz is None:
+            raise ValueError("The azimuth requires the cos(zenith).")
+        return evaluate_chunked(
+            functools.partial(self._accumulate, flavor, components),
+            *coords,
+            out=out,
+            chunksize=chunksize,
+            inplace=True,
+            **parallel,
+        )
+
+    def _accumulate(self, flavor, components, energy, cosz=None, phi=None, out=None):
+        """Sum the scaled components on a chunk of events (into `out`)."""
+        coords = [energy, cosz, phi]
+        zenith = scratch = None
+        if out is None:
+            out = np.zeros(len(energy))
+        else:
+            out[...] = 0.0
+        for flux, scale in components:
+            if isinstance(flux, HondaFlux):
+                if any(c is None for c in coords[: flux._n_dim]):
+                    raise ValueError(
+                        f"The Honda component requires {flux._n_dim} coordinates."
+                    )
+                values = flux[flavor](*coords[: flux._n_dim])
+            elif isinstance(flux, IsotropicFlux):
+                values = flux[flavor](energy)
+            elif cosz is not None and _depends_on_zenith(flux):
+                if zenith is None:
+                    zenith = np.arccos(cosz)
+                values = flux(energy, zenith)
+            else:
+                values = flux(energy)
+            if scale == 1.0:
+                out += values
+                continue
+            # the components may return arrays they do not own (e.g. their
+            # input), so they are scaled into a buffer reused for this chunk
+            if scratch is None:
+                scratch = np.empty(len(energy))
+            np.multiply(values, scale, out=scratch)
+            out += scratch
+        return out
+
+    @profiling.timed("CompositeFlux.integrate")
+    def integrate(self, flavor, emin, emax, cosz=None, phi=None):
+        """
+        Integrate the total flux of a flavor over energy.
+
+        Each component is integrated with its own (analytic where available)
+        method: the antiderivatives of `HondaFlux` and `IsotropicFlux` and
+        `BaseFlux.integrate` (analytic for `PowerlawFlux`). Vectorised over
+        arrays of bounds (and coordinates).
+
+        Parameters
+        ----------
+        flavor : str
+            The flavor.
+        emin, emax : float or array-like
+            The integration bounds in GeV.
+        cosz : array-like (optional)
+            The cos(zenith), required by angle-dependent components.
+        phi : array-like (optional)
+            The azimuth in degrees, required by 3D Honda components.
+
+        Returns
+        -------
+        np.array
+        """
+        # the bounds and coordinates are broadcast once, so that every
+        # component gets arrays of the same shape
+        coords = [c for c in (cosz, phi) if c is not None]
+        emin, emax, *coords = np.broadcast_arrays(
+            np.asarray(emin, dtype=float), np.asarray(emax, dtype=float), *coords
+        )
+        total = 0.0
+        for flux, scale in self._components_of(flavor):
+            if isinstance(flux, HondaFlux):
+                n_coords = flux._n_dim - 1
+                if len(coords) < n_coords:
+                    raise ValueError(
+                        f"The Honda component requires {flux._n_dim} coordinates."
+                    )
+                integral = flux.integrate(flavor, emin, emax, *coords[:n_coords])
+            elif isinstance(flux, IsotropicFlux):
+                integral = flux.integrate(flavor, emin, emax)
+            elif cosz is not None and _depends_on_zenith(flux):
+                integral = flux.integrate(np.arccos(coords[0]), emin, emax)
+            else:
+                integral = flux.integrate(None, emin, emax)
+            total = total + scale * integral
+        return total
+
+
+def _open_pack(filepath):
+    """Open a packed archive (shared while the file is unchanged) or `None`."""
+    try:
+        mtime = os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load_pack(str(filepath), mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_pack(filepath, mtime):
+    from km3flux.pack import Pack
+
+    return Pack(filepath)
+
+
 class Honda:
     _experiments = {
         "Frejus": "frj",
@@ -310,12 +2351,57 @@ class Honda:
         "Sudbury": "sno",
     }
     _datapath = basepath / "honda"
+    # The packed archive, created with `km3flux pack`
+    _packpath = basepath / "honda.pack"
 
-    #    def __init__(self):
-    #        self._years = [p.name for p in self._datapath.glob("????") if p.is_dir()]
+    # Memoizes the `HondaFlux` instances across all `Honda` instances, use
+    # e.g. `Honda.flux_cache.resize(maxbytes=...)` to set another limit
+    # and `Honda.flux_cache.stats()` to get the hit/miss statistics.
+    flux_cache = cache.LRUCache(maxsize=8)
 
+    def __init__(self, cache_dir=None, pack=None):
+        """
+        Parameters
+        ----------
+        cache_dir : str or pathlib.Path (optional)
+            Directory to cache the parsed tables and fitted interpolators in.
+            Defaults to the ``KM3FLUX_CACHE_DIR`` environment variable, caching
+            is disabled if neither is set.
+        pack : str or pathlib.Path (optional)
+            The packed archive of the tables (see `km3flux.pack`) to read the
+            tables from, tables missing in it (or changed since packing) are
+            read from their files. Defaults to the packed archive of the data
+            folder if it exists and is valid.
+        """
+        if cache_dir is None:
+            cache_dir = cache.default_cache_dir()
+        self.cache_dir = cache_dir
+        if pack is None:
+            try:
+                self.pack = _open_pack(self._packpath)
+            except ValueError as e:
+                logger.warning("Ignoring the packed archive: %s", e)
+                self.pack = None
+        else:
+            self.pack = _open_pack(pack)
+            if self.pack is None:
+                raise FileNotFoundError(f"The packed archive {pack} does not exist.")
+        # distinguishes the memoized fluxes of the different sources
+        self._source = (
+            None if self.pack is None else (str(self.pack.filepath), self.pack.mtime),
+            None if cache_dir is None else str(cache_dir),
+        )
+
+    @profiling.timed("Honda.flux")
     def flux(
-        self, year, experiment, solar="min", mountain=False, season=None, averaged=None
+        self,
+        year,
+        experiment,
+        solar="min",
+        mountain=False,
+        season=None,
+        averaged=None,
+        interpolation="spline",
     ):
         """
         Return the flux for a given year and experiment.
@@ -340,10 +2426,138 @@ class Honda:
         averaged : None or str (optional)
             The type of averaging. Default is `None`. Also available are "all" for all
             direction averaging and "azimuth" for azimuth averaging only.
+        interpolation : str (optional)
+            The interpolation engine, "spline" (default) or "loglog" for the
+            log-log interpolation, see `HondaFlux`.
+
+        The returned `HondaFlux` instances are memoized in `Honda.flux_cache`,
+        separately for each source (packed archive and cache directory).
         """
+        key = (
+            self._source,
+            year,
+            experiment,
+            solar,
+            bool(mountain),
+            None if season is None else tuple(season),
+            averaged,
+            interpolation,
+        )
+        flux = self.flux_cache.get(key)
+        if flux is not None:
+            return flux
+
         filepath = self._filepath_for(
             year, experiment, solar, mountain, season, averaged
         )
+        flux = self._load(filepath, interpolation)
+        self.flux_cache.put(key, flux)
+        return flux
+
+    @profiling.timed("Honda.seasonal_flux")
+    def seasonal_flux(
+        self,
+        year,
+        experiment,
+        solar="min",
+        mountain=False,
+        averaged=None,
+        interpolation="spline",
+    ):
+        """
+        Return the time-resolved flux from the monthly tables.
+
+        The twelve monthly tables (seasons ``(1, 1)`` to ``(12, 12)``) are
+        loaded once, the returned `SeasonalHondaFlux` is memoized in
+        `Honda.flux_cache`. See `flux` for the parameters.
+        """
+        key = (
+            self._source,
+            year,
+            experiment,
+            solar,
+            bool(mountain),
+            "monthly",
+            averaged,
+            interpolation,
+        )
+        flux = self.flux_cache.get(key)
+        if flux is not None:
+            return flux
+
+        flux = SeasonalHondaFlux(
+            [
+                self._load(
+                    self._filepath_for(
+                        year, experiment, solar, mountain, (month, month), averaged
+                    ),
+                    interpolation,
+                )
+                for month in range(1, 13)
+            ]
+        )
+        self.flux_cache.put(key, flux)
+        return flux
+
+    @profiling.timed("Honda.solar_modulated_flux")
+    def solar_modulated_flux(
+        self,
+        year,
+        experiment,
+        mountain=False,
+        season=None,
+        averaged=None,
+        interpolation="spline",
+    ):
+        """
+        Return the flux blending the solar minimum and maximum tables.
+
+        The returned `SolarModulatedHondaFlux` is memoized in
+        `Honda.flux_cache`. See `flux` for the parameters.
+        """
+        key = (
+            self._source,
+            year,
+            experiment,
+            "modulated",
+            bool(mountain),
+            None if season is None else tuple(season),
+            averaged,
+            interpolation,
+        )
+        flux = self.flux_cache.get(key)
+        if flux is not None:
+            return flux
+
+        flux = SolarModulatedHondaFlux(
+            *[
+                self._load(
+                    self._filepath_for(
+                        year, experiment, solar, mountain, season, averaged
+                    ),
+                    interpolation,
+                )
+                for solar in ("min", "max")
+            ]
+        )
+        self.flux_cache.put(key, flux)
+        return flux
+
+    def _load(self, filepath, interpolation):
+        """
+        Create the flux of a table, from the packed archive if it contains
+        the table and the file did not change since packing.
+        """
+        name = filepath.relative_to(self._datapath).as_posix()
+        if (
+            self.pack is not None
+            and name in self.pack
+            and self.pack.is_current(name, filepath)
+        ):
+            return HondaFlux(
+                self.pack.read(name), HONDA_FLAVORS, interpolation=interpolation
+            )
+
         if not filepath.exists():
             raise FileNotFoundError(
                 f"The requested data file {filepath} could not be found in the archive. "
@@ -351,7 +2565,9 @@ class Honda:
                 "also make sure the requested combination of parameters is available."
             )
 
-        return HondaFlux.from_hondafile(filepath)
+        return HondaFlux.from_hondafile(
+            filepath, cache_dir=self.cache_dir, interpolation=interpolation
+        )
 
     def _filepath_for(self, year, experiment, solar, mountain, season, averaged):
         """Generate the filename and path according to the naming conventions of Honda
@@ -0,0 +1,167 @@
+"""
+A single indexed container of the parsed Honda tables.
+
+The flux archive consists of many small gzipped tables, each of which is
+decompressed and parsed when a flux is requested. `pack` consolidates the
+parsed tables into one file (see ``km3flux pack``), which `Honda` memory-maps
+when present, so that a table is accessed without any parsing.
+
+The file consists of a magic number, the length of the JSON index and the
+index itself, followed by the (64-byte aligned) table arrays. The tables are
+stored in the (sorted) order of their regular grid and addressed by their path
+relative to the archive (``<year>/<filename>``), as built by
+`Honda._filepath_for`, along with the size and modification time of their
+source file.
+
+Note that the container has to be rebuilt after updating the archive, until
+then the tables whose file changed are read from the file again.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+import struct
+
+import numpy as np
+
+from km3flux import storage
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KM3FPACK"
+FORMAT_VERSION = 2
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+def pack(datapath, filepath):
+    """
+    Pack all Honda tables of an archive into a single file.
+
+    Parameters
+    ----------
+    datapath : str or pathlib.Path
+        The archive of the Honda tables (containing the year folders).
+    filepath : str or pathlib.Path
+        The output file, which is replaced atomically.
+
+    Returns
+    -------
+    int
+        The number of packed tables.
+    """
+    from km3flux.flux import HONDA_FLAVORS, HondaFlux, read_honda_table
+
+    datapath = Path(datapath)
+    filepath = Path(filepath)
+    tables = {}
+    for table in sorted(datapath.glob("*/*.d.gz")):
+        try:
+            data = read_honda_table(table)
+        except ValueError as e:
+            logger.warning("Skipping '%s': %s", table, e)
+            continue
+        # sorts the table for its regular grid
+        data = HondaFlux(data, HONDA_FLAVORS)._data
+        tables[table.relative_to(datapath).as_posix()] = (
+            np.asarray(data),
+            os.stat(table),
+        )
+
+    infos, size = storage.layout(data for data, _ in tables.values())
+    index = {}
+    for (name, (_, stat)), info in zip(tables.items(), infos):
+        index[name] = dict(info, size=stat.st_size, mtime=stat.st_mtime_ns)
+    header = json.dumps({"tables": index}).encode()
+    start = storage.aligned(_PREAMBLE.size + len(header))
+
+    with storage.atomic_path(filepath) as tmp_path:
+        with open(tmp_path, "wb") as fobj:
+            fobj.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            fobj.write(header)
+            for name, (data, _) in tables.items():
+                fobj.seek(start + index[name]["offset"])
+                fobj.write(data.tobytes())
+            fobj.truncate(start + size)
+    return len(tables)
+
+
+class Pack:
+    """
+    A packed archive of parsed Honda tables, see `pack`.
+
+    The file is memory-mapped, the returned tables are read-only views.
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+        The packed archive.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        with open(self.filepath, "rb") as fobj:
+            preamble = fobj.read(_PREAMBLE.size)
+            if len(preamble) == _PREAMBLE.size:
+                magic, version, header_length = _PREAMBLE.unpack(preamble)
+            else:
+                magic = version = header_length = None
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(
+                    f"'{filepath}' is not a km3flux pack (version {FORMAT_VERSION})."
+                )
+            try:
+                self._index = json.loads(fobj.read(header_length))["tables"]
+            except (KeyError, UnicodeDecodeError, ValueError):
+                raise ValueError(f"'{filepath}' has a corrupt index.")
+            self.mtime = os.fstat(fobj.fileno()).st_mtime_ns
+        self._start = storage.aligned(_PREAMBLE.size + header_length)
+        self._buffer = np.memmap(self.filepath, dtype=np.uint8, mode="r")
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def names(self):
+        """The names (``<year>/<filename>``) of the packed tables."""
+        return list(self._index)
+
+    def is_current(self, name, filepath):
+        """
+        Check whether a packed table matches its source file.
+
+        The size and modification time of the file are compared with the
+        ones recorded when packing, a table without its file is current.
+
+        Parameters
+        ----------
+        name : str
+            The path of the table relative to the archive (``<year>/<filename>``).
+        filepath : str or pathlib.Path
+            The source file of the table.
+        """
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return True
+        info = self._index[name]
+        return stat.st_size == info["size"] and stat.st_mtime_ns == info["mtime"]
+
+    def read(self, name):
+        """
+        Return a packed table.
+
+        Parameters
+        ----------
+        name : str
+            The path of the table relative to the archive (``<year>/<filename>``).
+
+        Returns
+        -------
+        np.recarray
+            The table as returned by `read_honda_table` (sorted).
+        """
+        data = storage.view(self._buffer, self._index[name], self._start)
+        return data.view(np.recarray)
@@ -0,0 +1,210 @@
+"""
+Lightweight timing instrumentation of the flux tables.
+
+The stages of loading, fitting and evaluating the Honda fluxes (decompressing
+and parsing the tables, sorting the grid, fitting the interpolators, the
+evaluations and integrations, ...) record their timings and call counts when
+the instrumentation is enabled. It is disabled by default, which merely costs
+a flag check per instrumented call.
+
+Example
+=======
+>>> from km3flux import profiling
+>>> from km3flux.flux import Honda
+
+>>> with profiling.profile() as stats:
+...     flux = Honda().flux(2014, "Frejus")
+...     flux["numu"](energies, cos_zeniths, azimuths)
+>>> stats["read_honda_table.decompress"]
+{'calls': 1, 'total': 0.0052, 'mean': 0.0052, 'max': 0.0052}
+
+or globally with `enable`, `stats`, `reset` and `disable`. With ``log=True``
+each recorded stage is also emitted (at INFO level) via the
+``km3flux.profiling`` logger, see `km3flux.logger`.
+"""
+
+import contextlib
+import functools
+import threading
+import time
+
+_enabled = False
+_log = False
+_records = {}
+_lock = threading.Lock()
+_logger = None
+
+
+def enable(log=False):
+    """
+    Enable the instrumentation.
+
+    Parameters
+    ----------
+    log : bool (optional)
+        Also emit each recorded stage via the ``km3flux.profiling`` logger.
+    """
+    global _enabled, _log
+    _enabled = True
+    _log = log
+    if log:
+        _get_logger()
+
+
+def disable():
+    """Disable the instrumentation, the recorded statistics are kept."""
+    global _enabled, _log
+    _enabled = _log = False
+
+
+def is_enabled():
+    """Return `True` if the instrumentation is enabled."""
+    return _enabled
+
+
+def reset():
+    """Remove all recorded statistics."""
+    with _lock:
+        _records.clear()
+
+
+def stats():
+    """
+    Return the recorded statistics.
+
+    Returns
+    -------
+    dict(str -> dict)
+        The number of calls and the total, mean and maximum duration (in
+        seconds) for each stage.
+    """
+    with _lock:
+        return {
+            name: {
+                "calls": calls,
+                "total": total,
+                "mean": total / calls,
+                "max": maximum,
+            }
+            for name, (calls, total, maximum) in _records.items()
+        }
+
+
+def record(name, elapsed):
+    """Record a single call of a stage which took `elapsed` seconds."""
+    with _lock:
+        entry = _records.get(name)
+        if entry is None:
+            _records[name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+    if _log:
+        _get_logger().info("%s: %.3f ms", name, elapsed * 1e3)
+
+
+class _NullStage:
+    """A no-op stage (`contextlib.nullcontext` requires Python 3.7)."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record(self.name, time.perf_counter() - self.start)
+
+
+def stage(name):
+    """
+    Return a context manager timing the enclosed code as a stage.
+
+    A shared no-op context manager is returned if the instrumentation is
+    disabled.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def timed(name):
+    """Decorator recording each call of the function as a stage."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def profile(log=False):
+    """
+    Enable the instrumentation within a context.
+
+    Yields a dictionary which is filled with the statistics (see `stats`) of
+    the stages recorded within the context when it exits. These are also
+    added to the global statistics.
+
+    Parameters
+    ----------
+    log : bool (optional)
+        Also emit each recorded stage via the ``km3flux.profiling`` logger.
+    """
+    global _records
+    previous = (_enabled, _log)
+    with _lock:
+        outer, _records = _records, {}
+    enable(log=log)
+    result = {}
+    try:
+        yield result
+    finally:
+        _restore(*previous)
+        result.update(stats())
+        with _lock:
+            inner, _records = _records, outer
+            for name, (calls, total, maximum) in inner.items():
+                entry = _records.setdefault(name, [0, 0.0, 0.0])
+                entry[0] += calls
+                entry[1] += total
+                entry[2] = max(entry[2], maximum)
+
+
+def _restore(enabled, log):
+    global _enabled, _log
+    _enabled, _log = enabled, log
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        from km3flux.logger import get_logger, set_level
+
+        _logger = get_logger(__name__)
+        set_level(_logger, "INFO")
+    return _logger
@@ -0,0 +1,210 @@
+"""
+Shared-memory publishing of Honda fluxes for multiprocessing workers.
+
+The parsed table and the fitted interpolation coefficients of a `HondaFlux`
+are copied once into a `multiprocessing.shared_memory` segment. Workers attach
+to the segment by its name and evaluate directly on the shared arrays, without
+parsing, fitting or copying.
+
+Example
+=======
+>>> from km3flux.flux import Honda
+>>> from km3flux import shared
+
+>>> with shared.publish(Honda().flux(2014, "Frejus")) as published:
+...     # in the workers
+...     flux = shared.attach(published.name)
+...     flux["numu"](energies, cos_zeniths, azimuths)
+
+Note that a memory-mapped alternative (for workers on the same machine) is the
+on-disk cache, see `km3flux.cache`.
+"""
+
+import json
+import struct
+import threading
+
+import numpy as np
+
+from km3flux import storage
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    resource_tracker = shared_memory = None
+
+from km3flux.flux import HondaFlux
+
+_HEADER_LENGTH = struct.Struct("<Q")
+
+# serialises the temporary replacement of `resource_tracker.register`
+_REGISTER_LOCK = threading.Lock()
+
+
+def _check_support():
+    if shared_memory is None:
+        raise RuntimeError("Shared memory requires Python 3.8 or later.")
+
+
+class SharedFlux:
+    """
+    A `HondaFlux` published in shared memory.
+
+    The segment stays available until `close` is called (or the context is
+    exited), so the publishing process should outlive the workers.
+
+    Parameters
+    ----------
+    flux : HondaFlux
+        The flux to publish, all its interpolators are fitted beforehand.
+    name : str (optional)
+        The name of the shared memory segment, a unique one is generated
+        by default.
+    """
+
+    def __init__(self, flux, name=None):
+        _check_support()
+        arrays = [("data", np.asarray(flux._data, order="C"))]
+        for flavor in flux._flavors:
+            for key, values in flux.coefficients(flavor).items():
+                arrays.append((f"{flavor}.{key}", np.asarray(values, order="C")))
+
+        layout, size = storage.layout(values for _, values in arrays)
+        for (key, _), info in zip(arrays, layout):
+            info["key"] = key
+        header = json.dumps(
+            {
+                "flavors": list(flux._flavors),
+                "interpolation": flux._interpolation,
+                "arrays": layout,
+            }
+        )
+        header = header.encode()
+        start = storage.aligned(_HEADER_LENGTH.size + len(header))
+
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=max(start + size, 1)
+        )
+        _HEADER_LENGTH.pack_into(self._shm.buf, 0, len(header))
+        self._shm.buf[_HEADER_LENGTH.size : _HEADER_LENGTH.size + len(header)] = header
+        for (_, values), info in zip(arrays, layout):
+            target = storage.view(self._shm.buf, info, start)
+            target[...] = values
+            del target
+
+    @property
+    def name(self):
+        """The name of the shared memory segment, pass it to `attach`."""
+        return self._shm.name
+
+    @property
+    def size(self):
+        """The size of the shared memory segment in bytes."""
+        return self._shm.size
+
+    def close(self):
+        """Release and remove the shared memory segment."""
+        if self._shm is None:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def publish(flux, name=None):
+    """
+    Publish a `HondaFlux` in shared memory.
+
+    Parameters
+    ----------
+    flux : HondaFlux
+        The flux to publish.
+    name : str (optional)
+        The name of the shared memory segment.
+
+    Returns
+    -------
+    SharedFlux
+    """
+    return SharedFlux(flux, name=name)
+
+
+def _map_segment(name):
+    """Map a shared memory segment and return it as a flat uint8 array.
+
+    The mapping is handed over to the array, so it stays valid as long as any
+    array referencing it is alive and is released afterwards.
+    """
+    _check_support()
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached segments at the resource tracker,
+        # which would then remove them when the worker exits. There is no
+        # public way to opt out, so the module-level `register` is replaced
+        # while attaching; the lock keeps other threads from attaching (or
+        # restoring it) in between.
+        with _REGISTER_LOCK:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+    # `SharedMemory` offers no way to hand over its mapping, so the private
+    # `_mmap` is taken and `_buf` (the only export of it) released, to let
+    # `close` leave the mapping to the returned array. Both attributes exist
+    # in every version since 3.8.
+    mapping = shm._mmap
+    shm._buf.release()
+    shm._buf = shm._mmap = None
+    shm.close()
+    return np.frombuffer(mapping, dtype=np.uint8)
+
+
+def attach(name):
+    """
+    Attach to a `HondaFlux` published in shared memory.
+
+    The returned flux evaluates directly on the (read-only) shared arrays.
+
+    Parameters
+    ----------
+    name : str
+        The name of the shared memory segment, see `SharedFlux.name`.
+
+    Returns
+    -------
+    HondaFlux
+    """
+    buffer = _map_segment(name)
+    (header_length,) = _HEADER_LENGTH.unpack_from(buffer, 0)
+    header = json.loads(
+        buffer[_HEADER_LENGTH.size : _HEADER_LENGTH.size + header_length].tobytes()
+    )
+    start = storage.aligned(_HEADER_LENGTH.size + header_length)
+
+    arrays = {}
+    for info in header["arrays"]:
+        values = storage.view(buffer, info, start)
+        values.flags.writeable = False
+        arrays[info["key"]] = values
+
+    data = arrays.pop("data").view(np.recarray)
+    coefficients = {flavor: {} for flavor in header["flavors"]}
+    for key, values in arrays.items():
+        flavor, name = key.split(".", 1)
+        coefficients[flavor][name] = values
+
+    return HondaFlux(
+        data,
+        header["flavors"],
+        coefficients=coefficients,
+        interpolation=header["interpolation"],
+    )
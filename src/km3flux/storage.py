@@ -0,0 +1,117 @@
+"""
+Helpers for storing arrays, shared by the packed archive (`km3flux.pack`), the
+shared-memory fluxes (`km3flux.shared`), the on-disk cache (`km3flux.cache`)
+and the archive updates.
+
+The containers consist of a JSON header describing the arrays, followed by the
+arrays themselves, each aligned to 64 bytes. `layout` assigns the offsets of
+the arrays (relative to the start of the data, the aligned end of the header)
+and `view` returns an array stored in a buffer.
+
+Files and directories are written to a temporary path next to their target,
+which is renamed once complete, see `atomic_path`.
+"""
+
+import contextlib
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+import numpy as np
+
+ALIGNMENT = 64
+
+
+def aligned(offset):
+    """Round an offset up to the next multiple of `ALIGNMENT`."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def layout(arrays):
+    """
+    Assign the (aligned) offsets of arrays stored one after the other.
+
+    Parameters
+    ----------
+    arrays : iterable(np.array)
+        The arrays.
+
+    Returns
+    -------
+    list(dict), int
+        The description of each array (``descr``, ``shape`` and ``offset``,
+        to be stored in the header) and the total size in bytes.
+    """
+    infos = []
+    offset = 0
+    for values in arrays:
+        infos.append(
+            {
+                "descr": np.lib.format.dtype_to_descr(values.dtype),
+                "shape": values.shape,
+                "offset": offset,
+            }
+        )
+        offset = aligned(offset + values.nbytes)
+    return infos, offset
+
+
+def view(buffer, info, start):
+    """
+    Return an array stored in a buffer, without copying.
+
+    Parameters
+    ----------
+    buffer : buffer
+        The buffer, e.g. a memory map.
+    info : dict
+        The description of the array, see `layout`.
+    start : int
+        The offset of the data in the buffer.
+    """
+    return np.ndarray(
+        tuple(info["shape"]),
+        dtype=np.lib.format.descr_to_dtype(info["descr"]),
+        buffer=buffer,
+        offset=start + info["offset"],
+    )
+
+
+@contextlib.contextmanager
+def atomic_path(path, directory=False):
+    """
+    Yield a temporary path which replaces `path` once the context exits.
+
+    The temporary file (or directory) is created next to `path`, its parent
+    directories are created if needed. It is removed if the context exits with
+    an exception or the rename fails. Note that an existing (non-empty)
+    directory is not replaced, `OSError` is raised instead.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The target path.
+    directory : bool (optional)
+        Whether to create a temporary directory instead of a file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if directory:
+        tmp_path = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    else:
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{path.name}.", suffix=".part", dir=path.parent
+        )
+        os.close(fd)
+        tmp_path = Path(tmp_path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if directory:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+        raise
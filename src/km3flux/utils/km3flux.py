@@ -1,29 +1,47 @@
 #!/usr/bin/env python3
 """
 Updates the files in the data folder by scraping the publications.
-Existing data files are not re-downloaded.
+Only the data files which changed upstream are re-downloaded.
+The tables can be packed into a single file, which is read much faster.
 
 Usage:
-    km3flux [-spx] update
+    km3flux [-spx] [-j N] update
+    km3flux pack
     km3flux (-h | --help)
     km3flux --version
 
 Options:
-    -x    Overwrite existing files when updating.
+    -x    Re-download all files, even if they are unchanged.
     -s    Include seasonal flux data from Honda.
     -p    Include production height tables from Honda.
+    -j N  Number of parallel downloads [default: 4].
     -h    Show this screen.
     -v    Show the version.
 
 Currently only the Honda fluxes are download from
 https://www.icrr.u-tokyo.ac.jp/~mhonda/
+
+The size, checksum and HTTP validators (ETag and Last-Modified) of the
+downloaded files are recorded in a manifest (``manifest.json``), so that the
+next update transfers only the modified files (via conditional requests).
+Files are written to a temporary file and renamed once complete.
+
+`km3flux pack` stores all parsed tables in a single indexed file in the data
+folder (see `km3flux.pack`), which `km3flux.flux.Honda` then reads from. It
+has to be rebuilt after an update.
 """
+import concurrent.futures
+import hashlib
+import json
 import os
+from pathlib import Path
 import re
 from urllib.parse import urljoin
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     from bs4 import BeautifulSoup
     from docopt import docopt
     from tqdm import tqdm
@@ -35,90 +53,301 @@ except ModuleNotFoundError:
     exit(1)
 
 import km3flux
+from km3flux import storage
 from km3flux.data import basepath
+from km3flux.flux import Honda
+from km3flux.pack import pack
 
 URL = "https://www.icrr.u-tokyo.ac.jp/~mhonda/"
 
+DEFAULT_WORKERS = 4
+# Failed requests (connection errors and the status codes below) are retried
+# with an exponential backoff of backoff_factor * 2^(n_retry - 1) seconds
+RETRIES = 5
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+MANIFEST = "manifest.json"
+CHUNK_SIZE = 2**16
+
 log = km3flux.logger.get_logger("km3flux")
 
 
-def get_honda(include_seasonal=False, include_production_height=False, overwrite=False):
-    """Grab all the Honda fluxes"""
-
-    def archive_data(url, year, overwrite=False):
-        """Archives a file from `url` under `year`.
-
-        Currently, only Honda files are downloaded so there is no logic in place
-        to manage multiple download target locations. Therefore "honda/" is
-        hard-coded.
-        """
-        target_path = basepath / "honda" / year / os.path.basename(url)
-        if not overwrite and os.path.exists(target_path):
-            return
-        os.makedirs(target_path.parent, exist_ok=True)
-        r = requests.get(url)
-        if not r.ok:
-            log.error(
-                "Unable to retrieve '%s', reason: '%s' (status code %d)",
-                url,
-                r.reason,
-                r.status_code,
+def make_session(
+    workers=DEFAULT_WORKERS, retries=RETRIES, backoff_factor=BACKOFF_FACTOR
+):
+    """Create a HTTP session with a connection pool for `workers` and retries"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=workers, pool_maxsize=workers, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class IndexPages:
+    """Retrieves the links of HTML index pages, each page is fetched only once"""
+
+    def __init__(self, session):
+        self.session = session
+        self._links = {}
+
+    def links(self, url):
+        """Returns the absolute URLs of all links on the page at `url`"""
+        if url not in self._links:
+            try:
+                r = self.session.get(url)
+            except requests.RequestException as e:
+                log.error("Unable to retrieve '%s', reason: '%s'", url, e)
+                return []
+            if not r.ok:
+                log.error(
+                    "Unable to retrieve '%s', reason: '%s' (status code %d)",
+                    url,
+                    r.reason,
+                    r.status_code,
+                )
+                return []
+            soup = BeautifulSoup(r.content, "html.parser")
+            self._links[url] = [
+                urljoin(r.url, a["href"]) for a in soup.find_all("a", href=True)
+            ]
+        return self._links[url]
+
+
+def find_honda_files(
+    index, url=URL, include_seasonal=False, include_production_height=False
+):
+    """Returns the URLs of all Honda data files and the year they belong to"""
+    files = {}
+    for link in index.links(url):
+        # yearly datasets
+        m = re.search(r"nflx(\d{4})/index.html$", link)
+        if not m:
+            continue
+        year = m.group(1)
+        pages = [link]
+        for sublink in index.links(link):
+            if include_seasonal and re.search(r"index-\d{4}.html$", sublink):
+                pages.append(sublink)
+            if include_production_height and sublink.endswith("index-height.html"):
+                pages.append(sublink)
+        for page in pages:
+            for data_url in index.links(page):
+                if data_url.endswith(".d.gz"):
+                    files.setdefault(data_url, year)
+    return list(files.items())
+
+
+def load_manifest(target):
+    """Loads the manifest of the files in `target` (an empty one if missing)"""
+    try:
+        with open(Path(target) / MANIFEST) as fobj:
+            return json.load(fobj)["files"]
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError) as e:
+        log.warning("Ignoring the corrupt manifest in '%s': %s", target, e)
+        return {}
+
+
+def save_manifest(target, files):
+    """Saves the manifest of the files in `target`"""
+    _write_atomically(
+        Path(target) / MANIFEST,
+        [json.dumps({"files": files}, indent=1, sort_keys=True).encode()],
+    )
+
+
+def file_checksum(path):
+    """Returns the SHA-256 checksum of a file"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as fobj:
+        for chunk in iter(lambda: fobj.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def is_intact(path, entry):
+    """Checks if the file at `path` matches its manifest entry"""
+    try:
+        if os.path.getsize(path) != entry["size"]:
+            return False
+        return file_checksum(path) == entry["sha256"]
+    except (OSError, KeyError):
+        return False
+
+
+def _write_atomically(path, chunks, expected_size=None):
+    """Writes the chunks to a temporary file which is then renamed to `path`
+
+    Returns the size and the SHA-256 checksum of the written file.
+    """
+    sha = hashlib.sha256()
+    size = 0
+    with storage.atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as fobj:
+            for chunk in chunks:
+                fobj.write(chunk)
+                sha.update(chunk)
+                size += len(chunk)
+        if expected_size is not None and size != expected_size:
+            raise OSError(f"incomplete transfer ({size} of {expected_size} bytes)")
+    return size, sha.hexdigest()
+
+
+def archive_data(session, url, target_path, entry=None):
+    """Archives a file from `url` under `target_path`, if it has changed.
+
+    The validators of the manifest `entry` of the local file (if any) are sent
+    with the request, so unchanged files are not transferred.
+
+    Returns the new manifest entry, the given one if the file is unchanged
+    or `None` if the file could not be retrieved.
+    """
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        with session.get(url, headers=headers, stream=True) as r:
+            if r.status_code == 304:
+                return entry
+            if not r.ok:
+                log.error(
+                    "Unable to retrieve '%s', reason: '%s' (status code %d)",
+                    url,
+                    r.reason,
+                    r.status_code,
+                )
+                return None
+            expected_size = r.headers.get("Content-Length")
+            if expected_size is not None and "Content-Encoding" not in r.headers:
+                expected_size = int(expected_size)
+            else:
+                expected_size = None
+            size, sha256 = _write_atomically(
+                target_path, r.iter_content(CHUNK_SIZE), expected_size
             )
-        else:
-            with open(target_path, "wb") as fobj:
-                fobj.write(r.content)
-
-    def get_all_data(url, year, overwrite=False, label=""):
-        """Downloads all the datafiles from a given `url`"""
-        p = requests.get(url)
-        s = BeautifulSoup(p.content, "html.parser")
-        hrefs = [a["href"] for a in s.find_all("a") if a["href"].endswith(".d.gz")]
-        for href in tqdm(hrefs, label):
-            data_url = urljoin(p.url, href)
-            archive_data(data_url, year, overwrite)
+    except (requests.RequestException, OSError) as e:
+        log.error("Unable to retrieve '%s', reason: '%s'", url, e)
+        return None
+    return {
+        "url": url,
+        "size": size,
+        "sha256": sha256,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+    }
+
+
+def download(session, files, target, overwrite=False, workers=DEFAULT_WORKERS):
+    """Downloads the `(url, year)` files to `target/year/` using `workers` threads
+
+    Files which are recorded in the manifest of `target` (and intact) are only
+    transferred if they changed upstream, all of them if `overwrite` is set.
+
+    Returns the number of retrieved, unchanged and failed files.
+    """
+    manifest = load_manifest(target)
+    jobs = []
+    for url, year in files:
+        name = f"{year}/{os.path.basename(url)}"
+        path = target / name
+        entry = manifest.get(name)
+        if (
+            overwrite
+            or entry is None
+            or entry.get("url") != url
+            or not is_intact(path, entry)
+        ):
+            entry = None
+        jobs.append((name, url, path, entry))
+
+    counts = {"retrieved": 0, "unchanged": 0, "failed": 0}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(archive_data, session, url, path, entry): (name, entry)
+            for name, url, path, entry in jobs
+        }
+        completed = concurrent.futures.as_completed(futures)
+        for future in tqdm(completed, "files", total=len(futures)):
+            name, entry = futures[future]
+            new_entry = future.result()
+            if new_entry is None:
+                counts["failed"] += 1
+            elif new_entry is entry:
+                counts["unchanged"] += 1
+            else:
+                counts["retrieved"] += 1
+                manifest[name] = new_entry
+    if counts["retrieved"]:
+        save_manifest(target, manifest)
+    return counts
+
+
+def get_honda(
+    include_seasonal=False,
+    include_production_height=False,
+    overwrite=False,
+    workers=DEFAULT_WORKERS,
+    url=URL,
+    target=None,
+):
+    """Grab all the Honda fluxes
+
+    The index pages are fetched once, the data files are downloaded in
+    parallel by `workers` threads sharing a session with a connection pool.
+    Unless `target` is given, the files are stored in the data folder.
+    """
+    target = basepath / "honda" if target is None else Path(target)
 
     print("Updating Honda fluxes...")
-    page = requests.get(URL)
-    soup = BeautifulSoup(page.content, "html.parser")
+    with make_session(workers=workers) as session:
+        files = find_honda_files(
+            IndexPages(session),
+            url,
+            include_seasonal=include_seasonal,
+            include_production_height=include_production_height,
+        )
+        counts = download(session, files, target, overwrite, workers)
+    print(
+        "{retrieved} files retrieved, {unchanged} unchanged, {failed} failed.".format(
+            **counts
+        )
+    )
+    if counts["retrieved"] and Honda._packpath.exists():
+        print("The packed tables are outdated, run `km3flux pack` to update them.")
 
-    for e in soup.find_all("a"):
-        # yearly datasets
-        m = re.search(r"(nflx(\d{4})/index.html)", e.attrs["href"])
-        if m:
-            suburl, year = m.groups()
-            print(f"-> year {year}")
-            get_all_data(urljoin(page.url, suburl), year, overwrite, "flux tables")
-
-            if include_seasonal:
-                p = requests.get(urljoin(page.url, suburl))
-                s = BeautifulSoup(p.content, "html.parser")
-                links = s.find_all("a")
-                for _e in links:
-                    ms = re.search(r"index-\d{4}.html", _e.attrs["href"])
-                    if ms:
-                        suburl = urljoin(p.url, _e.attrs["href"])
-                        get_all_data(suburl, year, overwrite, "seasonal fluxes")
-
-            if include_production_height:
-                p = requests.get(urljoin(page.url, suburl))
-                s = BeautifulSoup(p.content, "html.parser")
-                links = s.find_all("a")
-                for _e in links:
-                    ms = re.search(r"index-height.html", _e.attrs["href"])
-                    if ms:
-                        suburl = urljoin(p.url, _e.attrs["href"])
-                        get_all_data(
-                            suburl, year, overwrite, "production height tables"
-                        )
+
+def pack_honda():
+    """Pack all the Honda tables into a single file"""
+    print("Packing Honda fluxes...")
+    n_tables = pack(Honda._datapath, Honda._packpath)
+    print(f"{n_tables} tables packed into '{Honda._packpath}'.")
 
 
 def main():
     args = docopt(__doc__, version=km3flux.version)
 
+    if args["pack"]:
+        pack_honda()
+        return
+
     get_honda(
-        include_seasonal=args["-x"],
+        include_seasonal=args["-s"],
         include_production_height=args["-p"],
         overwrite=args["-x"],
+        workers=int(args["-j"]),
     )
 
 
@@ -0,0 +1,110 @@
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from km3flux.baked import BakedFlux, bake, bake_events
+from km3flux.flux import Honda
+
+ENERGY_EDGES = np.logspace(0, 4, 41)
+COSZ_EDGES = np.linspace(-1, 1, 21)
+PHI_EDGES = np.linspace(0, 360, 13)
+
+
+class TestBake(TestCase):
+    def setUp(self):
+        self.flux = Honda().flux(2014, "Frejus")
+
+    def test_bin_centers(self):
+        table = bake(self.flux, ENERGY_EDGES, COSZ_EDGES, PHI_EDGES)
+        assert table.binned
+        assert table.shape == (40, 20, 12)
+        energy = np.sqrt(ENERGY_EDGES[3] * ENERGY_EDGES[4])
+        expected = self.flux.numu(energy, -0.85, 135.0)
+        assert np.isclose(table.values("numu")[3, 1, 4], expected, rtol=1e-12)
+
+        index = table.index([energy, 1e5, 10.0], [-0.85, 0.0, 1.0], [135.0, 0, 370])
+        assert index[0] == (3 * 20 + 1) * 12 + 4
+        assert index[1] == -1
+        # the upper edge belongs to the last bin, the azimuth is wrapped around
+        assert index[2] == (np.searchsorted(ENERGY_EDGES, 10.0) * 20 + 19) * 12
+        values = table.evaluate("numu", index)
+        assert np.isclose(values[0], expected, rtol=1e-12)
+        assert np.isnan(values[1])
+        assert np.allclose(table["numu"](energy, -0.85, 135.0), expected)
+
+    def test_lower_dimensional_flux(self):
+        flux = Honda().flux(2014, "Frejus", averaged="all")
+        table = bake(flux, ENERGY_EDGES, COSZ_EDGES, flavors=["nue"])
+        assert table.flavors == ["nue"]
+        assert np.allclose(table.values("nue")[:, 0], table.values("nue")[:, -1])
+        with self.assertRaises(ValueError):
+            bake(self.flux, ENERGY_EDGES, COSZ_EDGES)
+        with self.assertRaises(ValueError):
+            bake(self.flux, ENERGY_EDGES, phi_edges=PHI_EDGES, average=True)
+
+    def test_average(self):
+        table = bake(self.flux, ENERGY_EDGES, COSZ_EDGES, average=True)
+        assert table.shape == (40, 20)
+        integrals = self.flux.integrate_binned("anue", ENERGY_EDGES, COSZ_EDGES)
+        volume = np.outer(np.diff(ENERGY_EDGES), np.diff(COSZ_EDGES)) * 2 * np.pi
+        assert np.allclose(table.values("anue"), integrals / volume)
+
+    def test_accuracy(self):
+        coarse = bake(self.flux, ENERGY_EDGES, COSZ_EDGES, PHI_EDGES)
+        fine = bake(
+            self.flux, np.logspace(0, 4, 401), np.linspace(-1, 1, 101), PHI_EDGES
+        )
+        accuracy = coarse.accuracy(self.flux, n_samples=1000)
+        assert set(accuracy) == set(self.flux._flavors)
+        assert 0 < fine.accuracy(self.flux)["numu"]["rms"] < accuracy["numu"]["rms"]
+        # exact at the bin centers
+        energy = np.sqrt(ENERGY_EDGES[:-1] * ENERGY_EDGES[1:])
+        accuracy = coarse.accuracy(self.flux, energy, 0.05, 15.0)
+        assert accuracy["nue"]["max"] < 1e-12
+
+    def test_events(self):
+        rng = np.random.default_rng(42)
+        coords = [10 ** rng.uniform(0, 4, 100), rng.uniform(-1, 1, 100)]
+        coords.append(rng.uniform(0, 360, 100))
+        table = bake_events(self.flux, *coords, dtype=np.float32)
+        assert not table.binned
+        assert table.shape == (100,)
+        assert table.evaluate("numu").dtype == np.float32
+        assert np.allclose(table.evaluate("numu"), self.flux.numu(*coords), rtol=1e-6)
+        assert np.allclose(
+            table.evaluate("nue", [3, 5]), self.flux.nue(*coords)[[3, 5]]
+        )
+        assert table.accuracy(self.flux, *coords)["anumu"]["max"] < 1e-6
+        with self.assertRaises(ValueError):
+            table.accuracy(self.flux)
+        with self.assertRaises(ValueError):
+            table.index(*coords)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "table.npz"
+            for table in (
+                bake(self.flux, ENERGY_EDGES, COSZ_EDGES, PHI_EDGES, fill_value=0.0),
+                bake_events(self.flux, [1.0, 10.0], [0.0, 0.5], [0.0, 90.0]),
+            ):
+                table.save(filepath)
+                loaded = BakedFlux.load(filepath)
+                assert loaded.flavors == table.flavors
+                assert loaded.shape == table.shape
+                assert loaded.binned == table.binned
+                for flavor in table.flavors:
+                    assert np.array_equal(loaded.values(flavor), table.values(flavor))
+            assert loaded.fill_value is not None
+
+    def test_invalid(self):
+        values = np.ones((1, 2))
+        with self.assertRaises(ValueError):
+            BakedFlux(values, ["numu", "nue"])
+        with self.assertRaises(ValueError):
+            BakedFlux(values, ["numu"], edges=[[1, 2]])
+        with self.assertRaises(ValueError):
+            BakedFlux(values, ["numu"], edges=[[3, 2, 1]])
+        with self.assertRaises(KeyError):
+            BakedFlux(values, ["numu"]).evaluate("nue")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+import numpy as np
+
+from km3flux import cache
+from km3flux.flux import HondaFlux, Honda
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmpdir.name)
+        Honda.flux_cache.clear()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_cache_key(self):
+        honda = Honda()
+        fmin = honda._filepath_for(2014, "Frejus", "min", False, None, None)
+        fmax = honda._filepath_for(2014, "Frejus", "max", False, None, None)
+        assert cache.cache_key(fmin) == cache.cache_key(fmin)
+        assert cache.cache_key(fmin) != cache.cache_key(fmax)
+
+    def test_cache_key_without_version(self):
+        filepath = Honda()._filepath_for(2014, "Frejus", "min", False, None, None)
+        key = cache.cache_key(filepath)
+        with unittest.mock.patch("km3flux.version", "unknown"):
+            unversioned = cache.cache_key(filepath)
+            assert unversioned != key
+            assert cache.cache_key(filepath) == unversioned
+            # the source files are hashed instead
+            with unittest.mock.patch.object(cache, "_source_hash", lambda: "other"):
+                assert cache.cache_key(filepath) != unversioned
+
+    def test_outdated_entries_are_removed(self):
+        filepath = Honda()._filepath_for(2014, "Frejus", "min", False, None, "all")
+        HondaFlux.from_hondafile(filepath, cache_dir=self.cache_dir)
+        HondaFlux.from_hondafile(
+            filepath, interpolation="loglog", cache_dir=self.cache_dir
+        )
+        spline = cache.cache_key(filepath, "spline")
+        loglog = cache.cache_key(filepath, "loglog")
+        assert {p.name for p in self.cache_dir.iterdir()} == {spline, loglog}
+        with unittest.mock.patch.object(cache, "_code_version", lambda: "new"):
+            HondaFlux.from_hondafile(filepath, cache_dir=self.cache_dir)
+            updated = cache.cache_key(filepath, "spline")
+        # the entry of the other interpolation is kept
+        assert {p.name for p in self.cache_dir.iterdir()} == {updated, loglog}
+
+    def test_roundtrip(self):
+        honda = Honda(cache_dir=self.cache_dir)
+        energy = np.array([1.0, 10.0, 100.0])
+        cosz = np.array([-0.5, 0.1, 0.7])
+        phi = np.array([10.0, 180.0, 300.0])
+        for averaged, args in [
+            ("all", (energy,)),
+            ("azimuth", (energy, cosz)),
+            (None, (energy, cosz, phi)),
+        ]:
+            built = honda.flux(2014, "Frejus", averaged=averaged)
+            Honda.flux_cache.clear()
+            cached = honda.flux(2014, "Frejus", averaged=averaged)
+            assert isinstance(cached._data.base, np.memmap)
+            for flavor in built._flavors:
+                assert np.allclose(built[flavor](*args), cached[flavor](*args))
+            assert np.array_equal(built._data, cached._data)
+        assert len(list(self.cache_dir.iterdir())) == 3
+
+    def test_corrupt_entry_is_rebuilt(self):
+        filepath = Honda()._filepath_for(2014, "Frejus", "min", False, None, "all")
+        reference = HondaFlux.from_hondafile(filepath)
+        HondaFlux.from_hondafile(filepath, cache_dir=self.cache_dir)
+        entry = self.cache_dir / cache.cache_key(filepath, "spline")
+        with open(entry / "data.npy", "r+b") as fobj:
+            fobj.truncate(100)
+        assert cache.load(self.cache_dir, entry.name) is None
+        assert not entry.exists()
+        flux = HondaFlux.from_hondafile(filepath, cache_dir=self.cache_dir)
+        assert np.allclose(flux.numu([1, 10]), reference.numu([1, 10]))
+        assert cache.load(self.cache_dir, entry.name) is not None
+
+    def test_default_cache_dir(self):
+        with unittest.mock.patch.dict("os.environ", {cache.CACHE_DIR_ENV: "/foo"}):
+            assert Honda().cache_dir == "/foo"
+        with unittest.mock.patch.dict("os.environ", {cache.CACHE_DIR_ENV: ""}):
+            assert Honda().cache_dir is None
+
+
+class Growing:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_maxsize(self):
+        lru = cache.LRUCache(maxsize=2)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        assert lru.get("a") == 1
+        lru.put("c", 3)
+        assert "b" not in lru
+        assert "a" in lru
+        assert "c" in lru
+        assert lru.get("b") is None
+        stats = lru.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 2
+
+    def test_maxbytes(self):
+        lru = cache.LRUCache(maxbytes=100)
+        lru.put("a", np.zeros(5))
+        lru.put("b", np.zeros(5))
+        assert lru.nbytes == 80
+        lru.put("c", np.zeros(5))
+        assert len(lru) == 2
+        assert "a" not in lru
+        lru.resize(maxbytes=50)
+        assert len(lru) == 1
+        assert "c" in lru
+
+    def test_growing_values(self):
+        lru = cache.LRUCache(maxbytes=100)
+        a, b = Growing(40), Growing(40)
+        lru.put("a", a)
+        lru.put("b", b)
+        b.nbytes = 50
+        # measured again on access
+        assert lru.get("b") is b
+        assert lru.nbytes == 90
+        a.nbytes = 60
+        # measured again when adding, evicting the least recently used
+        lru.put("c", Growing(0))
+        assert "a" not in lru
+        assert lru.nbytes == 50
+        # the accessed entry is kept, even if it exceeds the budget alone
+        b.nbytes = 200
+        assert lru.get("b") is b
+        assert list(lru.values()) == [b]
+        assert lru.nbytes == 200
+
+    def test_disabled(self):
+        lru = cache.LRUCache(maxsize=0)
+        lru.put("a", 1)
+        assert len(lru) == 0
+
+    def test_clear(self):
+        lru = cache.LRUCache()
+        lru.put("a", 1)
+        lru.get("a")
+        lru.clear()
+        assert len(lru) == 0
+        assert lru.stats()["hits"] == 0
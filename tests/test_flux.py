@@ -1,8 +1,9 @@
+from concurrent.futures import ProcessPoolExecutor
 from unittest import TestCase
 
 import numpy as np
 
-from km3flux.flux import BaseFlux
+from km3flux.flux import BaseFlux, CompositeFlux, Honda, IsotropicFlux, PowerlawFlux
 
 
 class TestBaseFlux(TestCase):
@@ -28,3 +29,219 @@ class TestBaseFlux(TestCase):
             self.flux.integrate_samples([1, 2, 3])
         with self.assertRaises(IndexError):
             self.flux.integrate_samples([1, 2, 3], [1, 2])
+
+
+class TestPowerlawFlux(TestCase):
+    def setUp(self):
+        self.flux = PowerlawFlux(gamma=2, scale=1e-4)
+
+    def test_evaluate_chunked(self):
+        energy = np.logspace(0, 3, 1001)
+        out = np.empty_like(energy)
+        result = self.flux.evaluate(energy, out=out, chunksize=100)
+        assert result is out
+        assert np.allclose(out, 1e-4 * energy**-2)
+
+    def test_evaluate_chunked_wrong_out(self):
+        with self.assertRaises(ValueError):
+            self.flux.evaluate(np.ones(10), out=np.empty(9))
+        with self.assertRaises(ValueError):
+            self.flux.evaluate(np.ones(10), out=np.empty(20)[::2])
+
+    def test_evaluate_parallel(self):
+        energy = np.logspace(0, 3, 1001)
+        expected = 1e-4 * energy**-2
+        result = self.flux.evaluate(
+            energy, chunksize=100, workers=4, parallel_threshold=0
+        )
+        assert np.allclose(result, expected)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            result = self.flux.evaluate(
+                energy, chunksize=300, executor=executor, parallel_threshold=0
+            )
+        assert np.allclose(result, expected)
+
+    def test_stream(self):
+        chunks = (np.full(10, e) for e in [1.0, 10.0, 100.0])
+        results = list(self.flux.stream(chunks))
+        assert len(results) == 3
+        assert np.allclose(results[2], 1e-8)
+
+
+class NumericPowerlawFlux(PowerlawFlux):
+    integrate = BaseFlux.integrate
+
+
+class ZenithPowerlawFlux(PowerlawFlux):
+    def _with_zenith(self, energy, zenith, interpolate=True):
+        return self._averaged(energy) * (1 + zenith)
+
+
+class NumericZenithPowerlawFlux(ZenithPowerlawFlux):
+    integrate = BaseFlux.integrate
+
+
+class TestIntegrate(TestCase):
+    def test_gauss_legendre(self):
+        flux = NumericPowerlawFlux(gamma=2.7, scale=1e-4)
+        expected = PowerlawFlux(gamma=2.7, scale=1e-4).integrate(emin=1, emax=100)
+        assert np.isclose(flux.integrate(emin=1, emax=100), expected, rtol=1e-12)
+
+    def test_vectorised_bounds(self):
+        flux = NumericPowerlawFlux(gamma=2, scale=1e-4)
+        emin = np.array([1.0, 10.0, 100.0])
+        emax = np.array([10.0, 100.0, 1000.0])
+        result = flux.integrate(emin=emin, emax=emax)
+        assert result.shape == (3,)
+        assert np.allclose(result, 1e-4 * (1 / emin - 1 / emax))
+
+    def test_vectorised_zeniths(self):
+        flux = NumericZenithPowerlawFlux(gamma=2, scale=1e-4)
+        zenith = np.array([0.0, 1.0, 2.0])
+        result = flux.integrate(zenith, emin=1, emax=100)
+        assert result.shape == (3,)
+        assert np.allclose(result, 1e-4 * 0.99 * (1 + zenith))
+        result = flux.integrate(zenith[:, np.newaxis], emin=[1.0, 10.0], emax=100)
+        assert result.shape == (3, 2)
+        assert np.allclose(result[:, 1], 1e-4 * 0.09 * (1 + zenith))
+
+    def test_romberg_options_are_deprecated(self):
+        flux = NumericPowerlawFlux(gamma=2, scale=1e-4)
+        with self.assertWarns(DeprecationWarning):
+            result = flux.integrate(emin=1, emax=100, tol=1e-8, divmax=20)
+        assert np.isclose(result, 1e-4 * 0.99)
+
+    def test_integrate_samples_batched(self):
+        flux = ZenithPowerlawFlux(gamma=2, scale=1e-4)
+        energy = np.logspace(0, 3, 301)
+        zenith = np.linspace(0, 3, 7)
+        result = flux.integrate_samples(energy, zenith[:, np.newaxis], emax=1000)
+        assert result.shape == (7,)
+        for z, value in zip(zenith, result):
+            single = flux.integrate_samples(energy, np.full(len(energy), z), emax=1000)
+            assert np.isclose(value, single)
+        expected = 1e-4 * (1 - 1e-3) * (1 + zenith)
+        assert np.allclose(result, expected, rtol=1e-3)
+
+        grid = np.broadcast_to(zenith[:, np.newaxis], (7, len(energy)))
+        assert np.allclose(flux.integrate_samples(energy, grid, emax=1000), result)
+        energy_grid = np.broadcast_to(energy, (7, len(energy)))
+        assert np.allclose(
+            flux.integrate_samples(energy_grid, grid, emin=10, emax=100),
+            flux.integrate_samples(energy, grid, emin=10, emax=100),
+        )
+        with self.assertRaises(ValueError):
+            flux.integrate_samples(energy_grid * zenith[:, np.newaxis], grid, emax=100)
+
+    def test_isotropic_flux(self):
+        energy = np.logspace(0, 2, 21)
+        data = np.rec.fromarrays([energy, 2 * energy], names=["energy", "nu"])
+        flux = IsotropicFlux(data, ["nu"])
+        assert np.allclose(flux.integrate("nu", [1, 2], [3, 200]), [8, 9996])
+
+
+class TestCompositeFlux(TestCase):
+    def setUp(self):
+        self.honda = Honda().flux(2014, "Frejus")
+        self.powerlaw = PowerlawFlux(gamma=2.5, scale=1e-4)
+        energy = np.logspace(0, 2, 21)
+        data = np.rec.fromarrays([energy, 2 * energy], names=["energy", "nu"])
+        self.isotropic = IsotropicFlux(data, ["nu"])
+        rng = np.random.default_rng(42)
+        self.energy = 10 ** rng.uniform(0, 2, 1000)
+        self.cosz = rng.uniform(-1, 1, 1000)
+        self.phi = rng.uniform(0, 360, 1000)
+
+    def test_evaluate(self):
+        flux = CompositeFlux([self.honda, (self.powerlaw, 1.5)])
+        coords = (self.energy, self.cosz, self.phi)
+        expected = self.honda.numu(*coords) + 1.5 * self.powerlaw(self.energy)
+        assert np.allclose(flux["numu"](*coords), expected, rtol=1e-12)
+        # in chunks, into a given buffer
+        out = np.empty(1000)
+        flux.evaluate("numu", *coords, out=out, chunksize=64)
+        assert np.allclose(out, expected, rtol=1e-12)
+        values = flux.evaluate("numu", *coords, chunksize=64, workers=2)
+        assert np.allclose(values, expected, rtol=1e-12)
+
+    def test_components_are_not_modified(self):
+        class IdentityFlux(BaseFlux):
+            def _averaged(self, energy, interpolate=True):
+                return energy
+
+        energy = np.array([1.0, 2.0, 3.0])
+        flux = CompositeFlux([(IdentityFlux(), 2.0), (IdentityFlux(), 3.0)])
+        assert np.array_equal(flux["numu"](energy), [5.0, 10.0, 15.0])
+        assert np.array_equal(energy, [1.0, 2.0, 3.0])
+
+    def test_flavors(self):
+        flux = CompositeFlux()
+        flux.add(self.honda).add(self.isotropic, 2.0)
+        flux.add(self.powerlaw, flavors=["nu", "numu"])
+        assert flux.flavors == ["numu", "anumu", "nue", "anue", "nu"]
+        assert np.allclose(
+            flux["nue"](self.energy, self.cosz, self.phi),
+            self.honda.nue(self.energy, self.cosz, self.phi),
+        )
+        assert np.allclose(
+            flux["nu"](self.energy),
+            2 * self.isotropic.nu(self.energy) + self.powerlaw(self.energy),
+        )
+        with self.assertRaises(KeyError):
+            flux["nutau"]
+        with self.assertRaises(ValueError):
+            flux["numu"](self.energy)
+        with self.assertRaises(TypeError):
+            flux.add(object())
+
+    def test_zenith_dependent_component(self):
+        zenith_flux = ZenithPowerlawFlux(gamma=2, scale=1e-4)
+        flux = CompositeFlux([(zenith_flux, 2.0), self.powerlaw])
+        expected = 2 * zenith_flux(self.energy, np.arccos(self.cosz))
+        expected += self.powerlaw(self.energy)
+        assert np.allclose(flux["numu"](self.energy, self.cosz), expected)
+        assert np.allclose(
+            flux["numu"](self.energy),
+            2 * zenith_flux(self.energy) + self.powerlaw(self.energy),
+        )
+
+    def test_integrate(self):
+        flux = CompositeFlux([self.honda, (self.powerlaw, 1.5)])
+        emin = np.array([1.0, 2.0, 10.0])
+        emax = np.array([10.0, 20.0, 100.0])
+        cosz, phi = self.cosz[:3], self.phi[:3]
+        expected = self.honda.integrate("numu", emin, emax, cosz, phi)
+        expected += 1.5 * self.powerlaw.integrate(emin=emin, emax=emax)
+        assert np.allclose(flux.integrate("numu", emin, emax, cosz, phi), expected)
+
+        flux = CompositeFlux([(self.isotropic, 3.0), ZenithPowerlawFlux(gamma=2)])
+        expected = 3 * self.isotropic.integrate("nu", 1.0, 10.0)
+        expected += ZenithPowerlawFlux(gamma=2).integrate(np.arccos(0.5), 1.0, 10.0)
+        assert np.isclose(flux.integrate("nu", 1.0, 10.0, 0.5), expected)
+
+    def test_integrate_array_cosz(self):
+        honda = Honda().flux(2014, "Frejus", averaged="azimuth")
+        zenith_flux = NumericZenithPowerlawFlux(gamma=2, scale=1e-4)
+        flux = CompositeFlux([honda, (zenith_flux, 2.0), self.powerlaw])
+        cosz = np.array([-0.5, 0.0, 0.5])
+        result = flux.integrate("numu", 1.0, 100.0, cosz)
+        assert result.shape == (3,)
+        expected = honda.integrate("numu", 1.0, 100.0, cosz)
+        expected += 2 * 1e-4 * 0.99 * (1 + np.arccos(cosz))
+        expected += self.powerlaw.integrate(emin=1.0, emax=100.0)
+        assert np.allclose(result, expected)
+
+    def test_integrate_int_bounds(self):
+        honda = Honda().flux(2014, "Frejus", averaged="all")
+        flux = CompositeFlux([honda, PowerlawFlux()])
+        expected = honda.integrate("numu", 1.0, 100.0)
+        expected += PowerlawFlux().integrate(emin=1.0, emax=100.0)
+        assert np.isclose(flux.integrate("numu", 1, 100), expected)
+        assert np.allclose(
+            PowerlawFlux(gamma=2, scale=1).integrate(emin=[1, 10], emax=100),
+            [0.99, 0.09],
+        )
+
+    def test_powerlaw_integrate_gamma_one(self):
+        flux = PowerlawFlux(gamma=1, scale=1e-4)
+        assert np.isclose(flux.integrate(emin=1, emax=np.e), 1e-4)
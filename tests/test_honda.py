@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
 
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+from pathlib import Path
+import pickle
+import shutil
+import tempfile
 import unittest
+import warnings
+
+import numpy as np
 
 import km3flux
 
@@ -58,6 +67,229 @@ class TestHonda(unittest.TestCase):
                             averaged=ave,
                         )
 
+    def test_flux_is_memoized(self):
+        km3flux.flux.Honda.flux_cache.clear()
+        f1 = km3flux.flux.Honda().flux(2014, "Frejus", averaged="all")
+        f2 = km3flux.flux.Honda().flux(2014, "Frejus", averaged="all")
+        f3 = km3flux.flux.Honda().flux(2014, "Frejus", solar="max", averaged="all")
+        assert f1 is f2
+        assert f1 is not f3
+        stats = km3flux.flux.Honda.flux_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_nbytes_grows(self):
+        for averaged, coords in (("azimuth", (0.5,)), (None, (0.5, 90.0))):
+            f = km3flux.flux.Honda().flux(2014, "Frejus", averaged=averaged)
+            f = km3flux.flux.HondaFlux(f._data.copy(), f._flavors)
+            nbytes = f.nbytes
+            f.evaluate_all(np.array([10.0]), *[np.array([c]) for c in coords])
+            assert f.nbytes > nbytes
+            nbytes = f.nbytes
+            f.integrate("numu", 1.0, 10.0, *coords)
+            assert f.nbytes > nbytes
+            nbytes = f.nbytes
+            f.integrate_binned("numu", np.logspace(0, 2, 5))
+            assert f.nbytes == nbytes + 4 * 8
+
+    def test_parse_categories_is_deprecated(self):
+        honda = km3flux.flux.Honda()
+        filepath = honda._filepath_for(2014, "Frejus", "min", False, None, "azimuth")
+        f = honda.flux(2014, "Frejus", averaged="azimuth")
+        with gzip.open(filepath) as fobj:
+            with self.assertWarns(DeprecationWarning):
+                categories = f.parse_categories(fobj)
+        assert len(categories) == 20
+        assert all("average flux in" in header for header, _ in categories)
+
+    def test_lazy_interpolators(self):
+        filepath = km3flux.flux.Honda()._filepath_for(
+            2014, "Frejus", "min", False, None, "azimuth"
+        )
+        f = km3flux.flux.HondaFlux.from_hondafile(filepath)
+        assert not f._coefficients
+        assert "numu" not in f.__dict__
+        value = f["numu"](10, 0.5)
+        assert "numu" in f.__dict__
+        assert list(f._coefficients) == ["numu"]
+        assert f.numu(10, 0.5) == value
+        f.anue(10, 0.5)
+        assert sorted(f._coefficients) == ["anue", "numu"]
+        with self.assertRaises(AttributeError):
+            f.nutau
+        with self.assertRaises(KeyError):
+            f["nutau"]
+
+    def test_loglog_interpolation(self):
+        honda = km3flux.flux.Honda()
+        for averaged in [None, "azimuth", "all"]:
+            spline = honda.flux(2014, "Frejus", averaged=averaged)
+            loglog = honda.flux(
+                2014, "Frejus", averaged=averaged, interpolation="loglog"
+            )
+            assert spline is not loglog
+            data = loglog._data
+            nodes = [data.energy, data.cosz_mean, data.phi_az_mean][: loglog._n_dim]
+            for flavor in loglog._flavors:
+                assert np.allclose(loglog[flavor](*nodes), data[flavor])
+            # between the nodes, both engines agree within a few percent
+            args = [np.array([0.3, 3.0, 30.0, 300.0]), np.array([-0.8, 0.0, 0.5, 0.7])]
+            args.append(np.array([20.0, 90.0, 200.0, 300.0]))
+            args = args[: loglog._n_dim]
+            assert np.allclose(loglog.numu(*args), spline.numu(*args), rtol=0.05)
+
+        with self.assertRaises(ValueError):
+            honda.flux(2014, "Frejus", interpolation="foo")
+
+    def test_evaluate_all(self):
+        honda = km3flux.flux.Honda()
+        energy = np.array([0.05, 0.3, 3.0, 30.0, 300.0, 2e4])
+        cosz = np.array([-1.0, -0.8, 0.0, 0.5, 0.7, 0.99])
+        phi = np.array([0.0, 20.0, 90.0, 200.0, 300.0, 359.0])
+        for interpolation in ["spline", "loglog"]:
+            for averaged, args in [
+                ("all", (energy,)),
+                ("azimuth", (energy, cosz)),
+                (None, (energy, cosz, phi)),
+            ]:
+                f = honda.flux(
+                    2014, "Frejus", averaged=averaged, interpolation=interpolation
+                )
+                values = f.evaluate_all(*args)
+                assert values.shape == (6, 4)
+                for i, flavor in enumerate(f._flavors):
+                    assert np.allclose(values[:, i], f[flavor](*args), rtol=1e-12)
+                values = f.evaluate_all(*args, flavors=["nue", "numu"])
+                assert np.allclose(values[:, 1], f.numu(*args), rtol=1e-12)
+
+        f = honda.flux(2014, "Frejus", averaged="all")
+        with self.assertRaises(KeyError):
+            f.evaluate_all(energy, flavors=["nutau"])
+        with self.assertRaises(ValueError):
+            f.evaluate_all(energy, cosz)
+
+    def test_evaluate_pdg(self):
+        f = km3flux.flux.Honda().flux(2014, "Frejus", averaged="azimuth")
+        pdgid = np.array([14, -12, 16, 12, -14, 14, -16])
+        energy = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+        cosz = np.array([-0.9, -0.5, 0.0, 0.2, 0.4, 0.6, 0.8])
+        values = f.evaluate_pdg(pdgid, energy, cosz)
+        for i, flavor in enumerate(
+            ["numu", "anue", None, "nue", "anumu", "numu", None]
+        ):
+            if flavor is None:
+                assert values[i] == 0
+            else:
+                assert np.isclose(values[i], f[flavor](energy[i], cosz[i]))
+        values = f.evaluate_pdg(pdgid, energy, cosz, fill_value=np.nan)
+        assert np.all(np.isnan(values[[2, 6]]))
+        assert f.evaluate_pdg(14, energy, cosz).shape == (7,)
+        with self.assertRaises(ValueError):
+            f.evaluate_pdg([13], [1.0], [0.0])
+        with self.assertRaises(ValueError):
+            f.evaluate_pdg([14], [1.0])
+
+    def test_evaluate_chunked(self):
+        f = km3flux.flux.Honda().flux(2014, "Frejus")
+        energy = np.logspace(-1, 4, 1000)
+        cosz = np.linspace(-1, 1, 1000)
+        phi = np.linspace(0, 360, 1000)
+        expected = f.numu(energy, cosz, phi)
+        out = np.empty(1000)
+        assert f.evaluate("numu", energy, cosz, phi, out=out, chunksize=64) is out
+        assert np.allclose(out, expected)
+        assert np.allclose(
+            f.evaluate("numu", energy, 0.5, 120, chunksize=7),
+            f.numu(energy, np.full(1000, 0.5), np.full(1000, 120)),
+        )
+        out = f.evaluate(
+            "numu", energy, cosz, phi, workers=3, chunksize=100, parallel_threshold=0
+        )
+        assert np.allclose(out, expected)
+        chunks = (
+            (energy[i : i + 300], cosz[i : i + 300], phi[i : i + 300])
+            for i in range(0, 1000, 300)
+        )
+        results = list(f.stream("numu", chunks))
+        assert [len(r) for r in results] == [300, 300, 300, 100]
+        assert np.allclose(np.concatenate(results), expected)
+
+    def test_integrate(self):
+        honda = km3flux.flux.Honda()
+        emin = np.array([0.2, 1.0, 3.3, 0.01])
+        emax = np.array([0.7, 100.0, 9000.0, 1e5])
+        energy = np.logspace(-1, 4, 100001)
+        for interpolation in ["spline", "loglog"]:
+            for averaged, coords in [
+                ("all", ()),
+                ("azimuth", (0.33,)),
+                (None, (0.33, 77.0)),
+            ]:
+                f = honda.flux(
+                    2014, "Frejus", averaged=averaged, interpolation=interpolation
+                )
+                result = f.integrate("numu", emin, emax, *coords)
+                assert result.shape == (4,)
+                values = f.numu(energy, *[np.full(len(energy), c) for c in coords])
+                for i, (a, b) in enumerate(zip(emin, emax)):
+                    mask = (energy >= a) & (energy <= b)
+                    x, y = energy[mask], values[mask]
+                    expected = np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2)
+                    assert np.isclose(result[i], expected, rtol=2e-3)
+
+        f = honda.flux(2014, "Frejus", averaged="azimuth")
+        with self.assertRaises(ValueError):
+            f.integrate("numu", 1, 10)
+
+    def test_integrate_loglog_between_nodes(self):
+        # the log-interpolated flux is integrated consistently, also between
+        # the angular nodes
+        honda = km3flux.flux.Honda()
+        for averaged, coords in [("azimuth", (0.1,)), (None, (0.1, 75.0))]:
+            f = honda.flux(2014, "Frejus", averaged=averaged, interpolation="loglog")
+            for emin, emax in [(145.9, 430.5), (0.15, 0.9), (2.0, 9000.0)]:
+                energy = np.geomspace(emin, emax, 20001)
+                values = f.nue(energy, *[np.full(len(energy), c) for c in coords])
+                expected = np.sum(np.diff(energy) * (values[1:] + values[:-1]) / 2)
+                result = f.integrate("nue", emin, emax, *coords)
+                assert np.isclose(result, expected, rtol=1e-5)
+
+    def test_integrate_binned(self):
+        honda = km3flux.flux.Honda()
+        energy_edges = np.logspace(0, 2, 5)
+        cosz_edges = np.linspace(-1, 1, 5)
+        phi_edges = np.linspace(0, 360, 4)
+        for averaged in ["all", "azimuth", None]:
+            f = honda.flux(2014, "Frejus", averaged=averaged)
+            result = f.integrate_binned("numu", energy_edges, cosz_edges, phi_edges)
+            assert result.shape == (4, 4, 3)
+            assert f.integrate_binned("numu", energy_edges).shape == (4,)
+            assert np.allclose(
+                result.sum(axis=(1, 2)), f.integrate_binned("numu", energy_edges)
+            )
+            hits = f._binned_integrals.hits
+            cached = f.integrate_binned("numu", energy_edges, cosz_edges, phi_edges)
+            assert f._binned_integrals.hits == hits + 1
+            assert np.array_equal(cached, result)
+
+            # brute force integration of a single bin
+            energy = np.logspace(0, np.log10(energy_edges[1]), 501)
+            cosz = np.linspace(cosz_edges[1], cosz_edges[2], 51)
+            phi = np.linspace(phi_edges[1], phi_edges[2], 51)
+            grid = np.meshgrid(energy, cosz, phi, indexing="ij")
+            values = f.numu(*[g.ravel() for g in grid][: f._n_dim])
+            values = values.reshape(grid[0].shape)
+            expected = np.trapz(values, np.radians(phi), axis=2)
+            expected = np.trapz(np.trapz(expected, cosz, axis=1), energy)
+            assert np.isclose(result[0, 1, 1], expected, rtol=1e-3)
+
+        with self.assertRaises(ValueError):
+            f.integrate_binned("numu", energy_edges, cosz_edges[::-1])
+        with self.assertRaises(ValueError):
+            f.integrate_binned("numu", energy_edges[::-1])
+        with self.assertRaises(ValueError):
+            f.integrate_binned("numu", [10.0])
+
     def test_isotropic_honda(self):
         honda = km3flux.flux.Honda()
         f = honda.flux(2014, "Frejus", averaged="all")
@@ -105,3 +337,333 @@ class TestHonda(unittest.TestCase):
         assert f._data.anumu[-1] == 2.5984e-11
         assert f._data.nue[-1] == 1.3208e-12
         assert f._data.anue[-1] == 9.9251e-13
+
+    def test_pickle(self):
+        honda = km3flux.flux.Honda()
+        coords = [
+            np.array([0.3, 3.0, 30.0, 300.0]),
+            np.array([-0.8, 0.0, 0.5, 0.7]),
+            np.array([20.0, 90.0, 200.0, 300.0]),
+        ]
+        for interpolation in ("spline", "loglog"):
+            for averaged, n_dim in (("all", 1), ("azimuth", 2), (None, 3)):
+                f = honda.flux(
+                    2014, "Frejus", averaged=averaged, interpolation=interpolation
+                )
+                expected = f.evaluate_all(*coords[:n_dim])
+                f.integrate("numu", 1.0, 10.0, *coords[1:n_dim])
+                state = pickle.dumps(f)
+                # the flux values on the grid and the spline coefficients, no
+                # derived columns, interpolators or caches
+                nbytes = sum(f._data[flavor].nbytes for flavor in f._flavors)
+                for c in f._coefficients.values():
+                    if "grid" not in c and "log_grid" not in c:
+                        nbytes += sum(v.nbytes for v in c.values())
+                assert len(state) < nbytes + 10_000
+                restored = pickle.loads(state)
+                assert restored._n_dim == n_dim
+                assert restored._interpolation == interpolation
+                assert np.array_equal(restored.evaluate_all(*coords[:n_dim]), expected)
+                if n_dim < 3 and interpolation == "spline":
+                    # the fitted splines are shipped
+                    assert set(restored._coefficients) == set(f._flavors)
+
+    def test_evaluate_broadcast(self):
+        f = km3flux.flux.Honda().flux(2014, "Frejus", averaged="azimuth")
+        energy = np.logspace(0, 3, 37)[:, np.newaxis]
+        cosz = np.linspace(-1, 1, 11)
+        expected = f.numu(*[c.ravel() for c in np.broadcast_arrays(energy, cosz)])
+        for parallel in ({}, {"workers": 4, "parallel_threshold": 0}):
+            values = f.evaluate("numu", energy, cosz, chunksize=50, **parallel)
+            assert values.shape == (37, 11)
+            assert np.array_equal(values.ravel(), expected)
+            values = f.evaluate("numu", cosz[::-1] + 2, cosz, chunksize=4, **parallel)
+            assert np.array_equal(values, f.numu(cosz[::-1] + 2, cosz))
+            # contiguous N-D energies against a broadcast cos(zenith) row
+            grid = energy * np.ones((1, 11))
+            values = f.evaluate("numu", grid, cosz, chunksize=50, **parallel)
+            assert np.array_equal(values.ravel(), expected)
+
+    def test_process_pool(self):
+        f = km3flux.flux.Honda().flux(2014, "Frejus")
+        coords = (np.array([1.0, 10.0]), np.array([0.1, -0.5]), np.array([0.0, 90.0]))
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(f.evaluate_all, *coords).result()
+        assert np.array_equal(result, f.evaluate_all(*coords))
+
+    def test_nan_coordinates(self):
+        coords = (
+            np.array([np.nan, 10.0, 10.0]),
+            np.array([0.5, np.nan, 0.5]),
+            np.array([90.0, 90.0, np.nan]),
+        )
+        for interpolation in ("spline", "loglog"):
+            f = km3flux.flux.Honda().flux(2014, "Frejus", interpolation=interpolation)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                values = f.evaluate_all(*coords)
+            assert np.all(np.isnan(values))
+
+    def test_periodic_azimuth(self):
+        from scipy.interpolate import RegularGridInterpolator
+
+        honda = km3flux.flux.Honda()
+        for interpolation in ("spline", "loglog"):
+            f = honda.flux(2014, "Frejus", averaged=None, interpolation=interpolation)
+            energy = np.array([1.0, 10.0, 100.0])
+            cosz = np.array([-0.3, 0.12, 0.8])
+            phi = np.array([0.0, 7.0, 350.0])
+            values = f["numu"](energy, cosz, phi)
+            assert np.allclose(values, f["numu"](energy, cosz, phi + 360))
+            assert np.allclose(values, f["numu"](energy, cosz, phi - 720))
+            # continuous across 0/360 degrees
+            assert np.allclose(
+                f["numu"](energy, cosz, np.full(3, 1e-9)),
+                f["numu"](energy, cosz, np.full(3, 360 - 1e-9)),
+            )
+
+        # identical to the multilinear interpolation within the azimuth nodes
+        coefficients = f.coefficients("numu")
+        axes = [coefficients["axis0"], coefficients["axis1"], coefficients["axis2"]]
+        rgi = RegularGridInterpolator(
+            [axes[0], axes[1], axes[2][:-1]],
+            coefficients["log_grid"][:, :, :-1],
+            bounds_error=False,
+            fill_value=None,
+        )
+        rng = np.random.default_rng(42)
+        energy = 10 ** rng.uniform(-1, 4, 1000)
+        cosz = rng.uniform(-1, 1, 1000)
+        phi = rng.uniform(15, 345, 1000)
+        expected = 10 ** rgi(np.stack([np.log10(energy), cosz, phi], axis=-1))
+        assert np.allclose(f["numu"](energy, cosz, phi), expected, rtol=1e-12)
+
+
+def monthly_fluxes(averaged=None, interpolation="spline"):
+    """The fluxes of twelve fake months, the table scaled by the month number."""
+    data = km3flux.flux.read_honda_table(
+        km3flux.flux.Honda()._filepath_for(2014, "Frejus", "min", False, None, averaged)
+    )
+    fluxes = []
+    for month in range(1, 13):
+        scaled = data.copy()
+        for flavor in km3flux.flux.HONDA_FLAVORS:
+            scaled[flavor] *= month
+        fluxes.append(
+            km3flux.flux.HondaFlux(
+                scaled, km3flux.flux.HONDA_FLAVORS, interpolation=interpolation
+            )
+        )
+    reference = km3flux.flux.HondaFlux(
+        data, km3flux.flux.HONDA_FLAVORS, interpolation=interpolation
+    )
+    return fluxes, reference
+
+
+class TestSeasonalHondaFlux(unittest.TestCase):
+    def test_monthly(self):
+        time = np.array(
+            ["2021-01-10", "2021-07-16T12", "2022-12-31", "2019-02-28"],
+            dtype="datetime64",
+        )
+        coords = [
+            np.array([1.0, 10.0, 100.0, 0.5]),
+            np.array([0.1, -0.5, 0.9, 0.0]),
+            np.array([10.0, 100.0, 300.0, 359.0]),
+        ]
+        for interpolation in ("spline", "loglog"):
+            for averaged, n_dim in (("all", 1), ("azimuth", 2), (None, 3)):
+                fluxes, reference = monthly_fluxes(averaged, interpolation)
+                seasonal = km3flux.flux.SeasonalHondaFlux(fluxes)
+                args = coords[:n_dim]
+                expected = reference["numu"](*args)
+
+                values = seasonal["numu"](time, *args)
+                assert np.allclose(values, [1, 7, 12, 2] * expected, rtol=1e-12)
+
+                # linear between the middle of the months, across the years
+                values = seasonal["numu"](time, *args, smooth=True)
+                factors = [
+                    12 * (0.5 - 9 / 31) + 1 * (0.5 + 9 / 31),
+                    7,
+                    12 * (1.5 - 30 / 31) + 1 * (30 / 31 - 0.5),
+                    2 * (1.5 - 27 / 28) + 3 * (27 / 28 - 0.5),
+                ]
+                assert np.allclose(values, factors * expected, rtol=1e-12)
+
+                values = seasonal.evaluate_all(time, *args)
+                assert values.shape == (4, 4)
+                for i, flavor in enumerate(seasonal._flavors):
+                    assert np.allclose(
+                        values[:, i], [1, 7, 12, 2] * reference[flavor](*args)
+                    )
+
+    def test_times(self):
+        fluxes, reference = monthly_fluxes("all")
+        seasonal = km3flux.flux.SeasonalHondaFlux(fluxes)
+        energy = np.array([1.0, 10.0])
+        # UNIX times (2021-03-01 and 2021-11-30) and broadcasting
+        values = seasonal["nue"]([1614556800, 1638230400], energy)
+        assert np.allclose(values, [3, 11] * reference["nue"](energy))
+        values = seasonal["nue"]("2021-05-15", energy)
+        assert np.allclose(values, 5 * reference["nue"](energy))
+        values = seasonal["nue"](np.array(["2021-05-15"] * 3, "datetime64[D]"), 10.0)
+        assert values.shape == (3,)
+
+    def test_invalid(self):
+        fluxes, _ = monthly_fluxes("all")
+        with self.assertRaises(ValueError):
+            km3flux.flux.SeasonalHondaFlux(fluxes[:11])
+        seasonal = km3flux.flux.SeasonalHondaFlux(fluxes)
+        with self.assertRaises(KeyError):
+            seasonal["nutau"]
+        with self.assertRaises(ValueError):
+            seasonal["numu"]("2021-01-01", 1.0, 0.0)
+
+    def test_honda_seasonal_flux(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = km3flux.flux.Honda._datapath / "2014/frj-ally-01-01-solmin.d.gz"
+            (Path(tmpdir) / "2014").mkdir()
+            for month in range(1, 13):
+                shutil.copy(
+                    source,
+                    Path(tmpdir) / f"2014/frj-{month:02d}{month:02d}-01-01-solmin.d.gz",
+                )
+
+            class Archive(km3flux.flux.Honda):
+                _datapath = Path(tmpdir)
+                _packpath = Path(tmpdir) / "honda.pack"
+                flux_cache = km3flux.cache.LRUCache(maxsize=8)
+
+            honda = Archive()
+            seasonal = honda.seasonal_flux(2014, "Frejus", averaged="all")
+            assert honda.seasonal_flux(2014, "Frejus", averaged="all") is seasonal
+            assert len(Archive.flux_cache) == 1
+            reference = km3flux.flux.Honda().flux(2014, "Frejus", averaged="all")
+            energy = np.logspace(-1, 4, 7)
+            assert np.allclose(
+                seasonal["numu"]("2021-08-01", energy, smooth=True),
+                reference["numu"](energy),
+            )
+            with self.assertRaises(FileNotFoundError):
+                honda.seasonal_flux(2014, "Frejus")
+
+
+class TestSolarModulatedHondaFlux(unittest.TestCase):
+    def test_blend(self):
+        honda = km3flux.flux.Honda()
+        coords = [
+            np.array([0.5, 1.0, 10.0, 100.0]),
+            np.array([0.1, -0.5, 0.9, 0.0]),
+            np.array([10.0, 100.0, 300.0, 359.0]),
+        ]
+        weight = np.array([0.0, 0.3, 1.0, 0.75])
+        for interpolation in ("spline", "loglog"):
+            for averaged, n_dim in (("all", 1), ("azimuth", 2), (None, 3)):
+                args = coords[:n_dim]
+                kwargs = dict(averaged=averaged, interpolation=interpolation)
+                flux = honda.solar_modulated_flux(2014, "Frejus", **kwargs)
+                solmin = honda.flux(2014, "Frejus", solar="min", **kwargs)
+                solmax = honda.flux(2014, "Frejus", solar="max", **kwargs)
+                for flavor in flux._flavors:
+                    expected = (1 - weight) * solmin[flavor](*args)
+                    expected += weight * solmax[flavor](*args)
+                    values = flux[flavor](*args, weight=weight)
+                    assert np.allclose(values, expected, rtol=1e-12)
+                values = flux.evaluate_all(*args, weight=0.0)
+                assert values.shape == (4, 4)
+                assert np.allclose(values[:, 0], solmin.numu(*args), rtol=1e-12)
+
+        flux = honda.solar_modulated_flux(2014, "Frejus")
+        assert honda.solar_modulated_flux(2014, "Frejus") is flux
+
+    def test_time(self):
+        honda = km3flux.flux.Honda()
+        flux = honda.solar_modulated_flux(2014, "Frejus", averaged="all")
+        solmin = honda.flux(2014, "Frejus", solar="min", averaged="all")
+        solmax = honda.flux(2014, "Frejus", solar="max", averaged="all")
+        energy = np.array([1.0, 10.0])
+        time = np.array(["2019-12-15", "2025-06-15"], dtype="datetime64")
+        assert np.allclose(km3flux.flux.solar_activity(time), [0, 1])
+        assert np.allclose(
+            flux["nue"](energy, time=time), [solmin.nue(1.0), solmax.nue(10.0)]
+        )
+        # a custom mapping
+        modulated = km3flux.flux.SolarModulatedHondaFlux(
+            solmin, solmax, activity=lambda time: np.full(np.shape(time), 0.5)
+        )
+        assert np.allclose(
+            modulated["nue"](energy, time=time),
+            (solmin.nue(energy) + solmax.nue(energy)) / 2,
+        )
+
+    def test_invalid(self):
+        flux = km3flux.flux.Honda().solar_modulated_flux(2014, "Frejus", averaged="all")
+        with self.assertRaises(ValueError):
+            flux["numu"](1.0)
+        with self.assertRaises(ValueError):
+            flux["numu"](1.0, weight=0.5, time="2021-01-01")
+        with self.assertRaises(ValueError):
+            flux["numu"](1.0, 0.0, weight=0.5)
+        with self.assertRaises(KeyError):
+            flux["nutau"]
+
+
+class TestReadHondaTable(unittest.TestCase):
+    def test_full_table(self):
+        filepath = km3flux.flux.Honda()._filepath_for(
+            2014, "Frejus", "min", False, None, None
+        )
+        data = km3flux.flux.read_honda_table(filepath)
+        assert data.shape == (24240,)
+        assert data.cosz_min[0] == 0.9
+        assert data.cosz_max[0] == 1.0
+        assert data.phi_az_min[0] == 0
+        assert data.phi_az_max[0] == 30
+        assert data.energy[0] == 0.1
+        assert data.numu[0] == 8161.0
+        assert data.cosz_mean[0] == 0.95
+        assert data.phi_az_mean[0] == 15
+        # second block starts after 101 energy nodes
+        assert data.phi_az_min[101] == 30
+        assert data.energy[101] == 0.1
+        assert data.cosz_min[-1] == -1.0
+        assert data.phi_az_max[-1] == 360
+
+    def test_2006_table(self):
+        filepath = km3flux.flux.Honda()._filepath_for(
+            2006, "Gran Sasso", "max", False, None, "azimuth"
+        )
+        data = km3flux.flux.read_honda_table(filepath)
+        assert data.shape == (2020,)
+        assert len(set(data.cosz_mean)) == 20
+        assert set(data.phi_az_mean) == {180}
+
+
+class TestLogLogInterpolator(unittest.TestCase):
+    def test_powerlaw(self):
+        energy = np.logspace(0, 3, 31)
+        cosz = np.linspace(-1, 1, 5)
+        flux = np.outer(energy**-2.7, 1 + cosz**2)
+        interpolator = km3flux.flux.LogLogInterpolator.from_grid([energy, cosz], flux)
+        e = np.array([1.5, 17.0, 999.0, 2000.0])
+        c = np.array([-1.0, -0.25, 0.5, 1.0])
+        # exact for power laws in energy, also when extrapolating
+        assert np.allclose(interpolator(e, np.ones(4)), 2 * e**-2.7)
+        assert np.allclose(interpolator(e, c)[[0, 3]], 2 * e[[0, 3]] ** -2.7)
+        assert interpolator(10.0, 0.0).shape == ()
+
+    def test_irregular_axis(self):
+        energy = np.array([1.0, 2.0, 10.0, 100.0])
+        interpolator = km3flux.flux.LogLogInterpolator.from_grid([energy], energy**-1)
+        assert interpolator._steps == [None]
+        assert np.allclose(
+            interpolator(np.array([1.5, 5.0, 50.0])), [1 / 1.5, 0.2, 0.02]
+        )
+
+    def test_number_of_coordinates(self):
+        interpolator = km3flux.flux.LogLogInterpolator.from_grid(
+            [np.logspace(0, 2, 3)], np.ones(3)
+        )
+        with self.assertRaises(ValueError):
+            interpolator(1, 2)
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+
+
+def imported_modules(statement):
+    """Return the modules imported by a statement in a fresh interpreter."""
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {statement}; print(' '.join(sorted(sys.modules)))",
+        ],
+        stderr=subprocess.DEVNULL,
+    )
+    return set(output.decode().split())
+
+
+@skipIf(sys.version_info < (3, 7), "the submodules are imported eagerly")
+class TestImport(TestCase):
+    def test_import_is_lazy(self):
+        modules = imported_modules("import km3flux")
+        for name in [
+            "km3flux.flux",
+            "km3flux.logger",
+            "numpy",
+            "scipy",
+            "pkg_resources",
+            "importlib.metadata",
+        ]:
+            assert name not in modules, f"'{name}' is imported by 'import km3flux'"
+
+    def test_flux_does_not_import_scipy(self):
+        modules = imported_modules("import km3flux.flux")
+        assert "scipy" not in modules
+        assert "km3flux.logger" not in modules
+
+    def test_submodules_and_version(self):
+        modules = imported_modules(
+            "import km3flux; km3flux.flux.Honda; assert km3flux.version"
+        )
+        assert "km3flux.flux" in modules
+        assert "scipy" not in modules
+        with self.assertRaises(subprocess.CalledProcessError):
+            imported_modules("import km3flux; km3flux.nonexistent")
+
+    def test_import_time(self):
+        output = subprocess.check_output(
+            [sys.executable, "-X", "importtime", "-c", "import km3flux"],
+            stderr=subprocess.STDOUT,
+        )
+        # the last line is the cumulative import time (in us) of km3flux
+        cumulative = int(output.decode().strip().splitlines()[-1].split("|")[1])
+        assert cumulative < 100000
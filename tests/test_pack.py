@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+import numpy as np
+
+from km3flux.flux import Honda, read_honda_table
+from km3flux.pack import Pack, pack
+
+
+class TestPack(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.filepath = Path(cls.tmpdir.name) / "honda.pack"
+        cls.n_tables = pack(Honda._datapath, cls.filepath)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        Honda.flux_cache.clear()
+
+    def test_pack(self):
+        packed = Pack(self.filepath)
+        assert len(packed) == self.n_tables
+        assert len(packed) == len(list(Honda._datapath.glob("*/*.d.gz")))
+        assert "2014/frj-ally-20-12-solmin.d.gz" in packed
+        data = packed.read("2014/frj-ally-20-12-solmin.d.gz")
+        assert not data.flags.writeable
+        expected = read_honda_table(
+            Honda._datapath / "2014" / "frj-ally-20-12-solmin.d.gz"
+        )
+        assert data.dtype == expected.dtype
+        assert np.array_equal(np.sort(data), np.sort(expected))
+
+    def test_honda_reads_from_pack(self):
+        honda = Honda(pack=self.filepath)
+        energy = np.logspace(0, 3, 50)
+        cosz = np.linspace(-1, 1, 50)
+        phi = np.linspace(0, 360, 50)
+        for year, averaged, coords in [
+            (2014, "all", (energy,)),
+            (2006, "azimuth", (energy, cosz)),
+            (2014, None, (energy, cosz, phi)),
+        ]:
+            flux = honda.flux(year, "Gran Sasso", averaged=averaged)
+            assert not flux._data.flags.writeable
+            expected = Honda().flux(year, "Gran Sasso", averaged=averaged)
+            # memoized per source
+            assert expected is not flux
+            assert honda.flux(year, "Gran Sasso", averaged=averaged) is flux
+            assert np.array_equal(flux["anue"](*coords), expected["anue"](*coords))
+
+    def test_invalid_pack(self):
+        with self.assertRaises(FileNotFoundError):
+            Honda(pack=Path(self.tmpdir.name) / "nonexistent.pack")
+        invalid = Path(self.tmpdir.name) / "invalid.pack"
+        invalid.write_bytes(b"\0" * 100)
+        with self.assertRaises(ValueError):
+            Pack(invalid)
+
+    def test_invalid_default_pack(self):
+        invalid = Path(self.tmpdir.name) / "default.pack"
+        invalid.write_bytes(b"\0" * 4)
+        with mock.patch.object(Honda, "_packpath", invalid):
+            with self.assertLogs("km3flux.flux", level="WARNING"):
+                honda = Honda()
+        assert honda.pack is None
+        assert honda.flux(2014, "Frejus", averaged="all") is not None
+
+    def test_stale_table(self):
+        name = "2014/frj-ally-01-01-solmin.d.gz"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            datapath = Path(tmpdir) / "honda"
+            source = datapath / name
+            source.parent.mkdir(parents=True)
+            shutil.copy2(Honda._datapath / name, source)
+            pack(datapath, Path(tmpdir) / "honda.pack")
+            packed = Pack(Path(tmpdir) / "honda.pack")
+            assert packed.is_current(name, source)
+            stat = os.stat(source)
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            assert not packed.is_current(name, source)
+            with mock.patch.object(Honda, "_datapath", datapath):
+                honda = Honda(pack=Path(tmpdir) / "honda.pack")
+                # read from the changed file
+                flux = honda.flux(2014, "Frejus", averaged="all")
+                assert flux._data.flags.writeable
+            source.unlink()
+            assert packed.is_current(name, source)
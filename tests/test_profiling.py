@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+
+import numpy as np
+
+from km3flux import profiling
+from km3flux.flux import Honda
+
+
+class TestProfiling(TestCase):
+    def setUp(self):
+        Honda.flux_cache.clear()
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled_by_default(self):
+        assert not profiling.is_enabled()
+        Honda().flux(2014, "Frejus", averaged="all")
+        assert profiling.stats() == {}
+
+    def test_profile(self):
+        with profiling.profile() as stats:
+            flux = Honda().flux(2014, "Frejus", averaged="azimuth")
+            flux.evaluate("numu", np.ones(10), np.zeros(10))
+            flux.evaluate_all(np.ones(10), np.zeros(10))
+        assert not profiling.is_enabled()
+        for name in [
+            "Honda.flux",
+            "HondaFlux.from_hondafile",
+            "read_honda_table",
+            "read_honda_table.decompress",
+            "HondaFlux.grid",
+            "HondaFlux.fit_coefficients",
+            "HondaFlux.evaluate",
+            "HondaFlux.evaluate_all",
+        ]:
+            assert stats[name]["calls"] >= 1
+            assert stats[name]["total"] >= stats[name]["max"] > 0
+        assert stats["Honda.flux"]["calls"] == 1
+        assert profiling.stats() == stats
+
+    def test_process_pool(self):
+        flux = Honda().flux(2014, "Frejus", averaged="azimuth")
+        coords = (np.logspace(0, 3, 100), np.linspace(-1, 1, 100))
+        expected = flux.evaluate("numu", *coords)
+        with profiling.profile() as stats:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                values = flux.evaluate(
+                    "numu",
+                    *coords,
+                    chunksize=30,
+                    executor=executor,
+                    parallel_threshold=0
+                )
+        assert np.array_equal(values, expected)
+        assert stats["HondaFlux.evaluate"]["calls"] == 1
+
+    def test_nested_profiles(self):
+        profiling.enable()
+        Honda().flux(2014, "Frejus", averaged="all")
+        with profiling.profile() as stats:
+            Honda().flux(2014, "Frejus", averaged="all")
+        assert profiling.is_enabled()
+        assert stats["Honda.flux"]["calls"] == 1
+        assert "read_honda_table" not in stats
+        assert profiling.stats()["Honda.flux"]["calls"] == 2
+
+    def test_stage(self):
+        with profiling.stage("noop"):
+            pass
+        assert profiling.stats() == {}
+        profiling.enable()
+        for _ in range(3):
+            with profiling.stage("noop"):
+                pass
+        assert profiling.stats()["noop"]["calls"] == 3
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import unittest
+
+import numpy as np
+
+from km3flux.flux import Honda
+from km3flux import shared
+
+ENERGY = np.array([0.5, 5.0, 50.0, 500.0])
+COSZ = np.array([-0.9, -0.1, 0.3, 0.8])
+PHI = np.array([15.0, 100.0, 200.0, 350.0])
+
+
+def evaluate_shared(name):
+    flux = shared.attach(name)
+    return flux["numu"](ENERGY, COSZ, PHI)
+
+
+@unittest.skipIf(sys.version_info < (3, 8), "requires multiprocessing.shared_memory")
+class TestShared(unittest.TestCase):
+    def test_attach(self):
+        for averaged, args in [
+            ("all", (ENERGY,)),
+            ("azimuth", (ENERGY, COSZ)),
+            (None, (ENERGY, COSZ, PHI)),
+        ]:
+            flux = Honda().flux(2014, "Frejus", averaged=averaged)
+            with shared.publish(flux) as published:
+                attached = shared.attach(published.name)
+            assert not attached._data.flags.writeable
+            assert np.array_equal(flux._data, attached._data)
+            for flavor in flux._flavors:
+                assert np.allclose(flux[flavor](*args), attached[flavor](*args))
+
+    def test_workers(self):
+        flux = Honda().flux(2014, "Frejus")
+        expected = flux["numu"](ENERGY, COSZ, PHI)
+        with shared.publish(flux) as published:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(evaluate_shared, [published.name] * 2))
+        for result in results:
+            assert np.allclose(expected, result)
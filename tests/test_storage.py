@@ -0,0 +1,57 @@
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from km3flux import storage
+
+
+class TestLayout(TestCase):
+    def test_layout_and_view(self):
+        arrays = [np.arange(3, dtype=np.int8), np.ones((2, 5)), np.zeros(0)]
+        infos, size = storage.layout(arrays)
+        assert [info["offset"] for info in infos] == [0, 64, 192]
+        assert size == 192
+        start = storage.aligned(10)
+        assert start == 64
+        buffer = bytearray(start + size)
+        for values, info in zip(arrays, infos):
+            storage.view(buffer, info, start)[...] = values
+        for values, info in zip(arrays, infos):
+            stored = storage.view(buffer, info, start)
+            assert stored.dtype == values.dtype
+            assert np.array_equal(stored, values)
+
+
+class TestAtomicPath(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "sub" / "target"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_file(self):
+        with storage.atomic_path(self.path) as tmp_path:
+            assert tmp_path.parent == self.path.parent
+            tmp_path.write_bytes(b"content")
+            assert not self.path.exists()
+        assert self.path.read_bytes() == b"content"
+        with self.assertRaises(RuntimeError):
+            with storage.atomic_path(self.path) as tmp_path:
+                tmp_path.write_bytes(b"partial")
+                raise RuntimeError
+        assert self.path.read_bytes() == b"content"
+        assert list(self.path.parent.iterdir()) == [self.path]
+
+    def test_directory(self):
+        with storage.atomic_path(self.path, directory=True) as tmp_path:
+            (tmp_path / "file").write_bytes(b"content")
+        assert (self.path / "file").read_bytes() == b"content"
+        # an existing entry is not replaced
+        with self.assertRaises(OSError):
+            with storage.atomic_path(self.path, directory=True) as tmp_path:
+                (tmp_path / "file").write_bytes(b"other")
+        assert (self.path / "file").read_bytes() == b"content"
+        assert list(self.path.parent.iterdir()) == [self.path]
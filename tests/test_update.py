@@ -0,0 +1,173 @@
+import collections
+import functools
+import gzip
+import hashlib
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+import socketserver
+import tempfile
+import threading
+from unittest import TestCase, skipIf
+
+try:
+    import bs4, docopt, requests, tqdm  # noqa: F401
+except ImportError:
+    km3flux_cli = None
+else:
+    from km3flux.utils import km3flux as km3flux_cli
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer requires Python 3.7
+    daemon_threads = True
+
+
+class RequestHandler(SimpleHTTPRequestHandler):
+    """Serves a directory with ETags, counts the requests and fails some of them"""
+
+    def do_GET(self):
+        self.server.requests[self.path] += 1
+        if self.path in self.server.flaky and self.server.requests[self.path] == 1:
+            self.send_error(503)
+            return
+        if self.path in self.server.truncated:
+            self.send_response(200)
+            self.send_header("Content-Length", "1000")
+            self.end_headers()
+            self.wfile.write(b"truncated")
+            return
+        etag = self.etag()
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            self.server.not_modified[self.path] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def etag(self):
+        path = Path(self.translate_path(self.path))
+        if path.suffix == ".gz" and path.exists():
+            return '"{}"'.format(hashlib.md5(path.read_bytes()).hexdigest())
+
+    def end_headers(self):
+        etag = self.etag()
+        if etag is not None:
+            self.send_header("ETag", etag)
+        super().end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def write_site(root):
+    """Creates a minimal stand-in for the Honda website"""
+    root = Path(root)
+    (root / "nflx2014").mkdir()
+    (root / "index.html").write_text(
+        '<a href="nflx2014/index.html">2014</a><a href="other.html">other</a>'
+    )
+    (root / "nflx2014" / "index.html").write_text(
+        '<a href="a.d.gz">a</a><a href="b.d.gz">b</a>'
+        '<a href="index-0102.html">Jan-Feb</a><a href="index-height.html">height</a>'
+    )
+    (root / "nflx2014" / "index-0102.html").write_text(
+        '<a href="c.d.gz">c</a><a href="a.d.gz">a</a>'
+    )
+    (root / "nflx2014" / "index-height.html").write_text('<a href="d.d.gz">d</a>')
+    for name in "abcd":
+        with gzip.open(root / "nflx2014" / f"{name}.d.gz", "wb") as fobj:
+            fobj.write(f"flux table {name}\n".encode())
+
+
+@skipIf(km3flux_cli is None, "the optional dependencies are not installed")
+class TestUpdate(TestCase):
+    def setUp(self):
+        self.site = tempfile.TemporaryDirectory()
+        self.target = tempfile.TemporaryDirectory()
+        write_site(self.site.name)
+        handler = functools.partial(RequestHandler, directory=self.site.name)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.requests = collections.Counter()
+        self.server.flaky = {"/nflx2014/b.d.gz"}
+        self.server.truncated = set()
+        self.server.not_modified = collections.Counter()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.site.cleanup()
+        self.target.cleanup()
+
+    def update(self, **kwargs):
+        km3flux_cli.get_honda(url=self.url, target=self.target.name, **kwargs)
+
+    def test_update(self):
+        self.update(include_seasonal=True, include_production_height=True)
+        target = Path(self.target.name) / "2014"
+        assert sorted(p.name for p in target.iterdir()) == [
+            "a.d.gz",
+            "b.d.gz",
+            "c.d.gz",
+            "d.d.gz",
+        ]
+        with gzip.open(target / "b.d.gz") as fobj:
+            assert fobj.read() == b"flux table b\n"
+        requests = self.server.requests
+        # each index page and data file is fetched once, the flaky one retried
+        assert all(n == 1 for path, n in requests.items() if path != "/nflx2014/b.d.gz")
+        assert requests["/nflx2014/b.d.gz"] == 2
+        assert requests["/nflx2014/index.html"] == 1
+
+    def test_unchanged_files_are_not_transferred(self):
+        self.update()
+        manifest = km3flux_cli.load_manifest(self.target.name)
+        assert sorted(manifest) == ["2014/a.d.gz", "2014/b.d.gz"]
+        path = Path(self.target.name) / "2014" / "a.d.gz"
+        assert manifest["2014/a.d.gz"]["size"] == path.stat().st_size
+        assert manifest["2014/a.d.gz"]["etag"] is not None
+        mtime = path.stat().st_mtime_ns
+
+        self.server.requests.clear()
+        self.update()
+        assert self.server.not_modified["/nflx2014/a.d.gz"] == 1
+        assert self.server.not_modified["/nflx2014/b.d.gz"] == 1
+        assert path.stat().st_mtime_ns == mtime
+
+        # changed upstream
+        with gzip.open(Path(self.site.name) / "nflx2014" / "a.d.gz", "wb") as fobj:
+            fobj.write(b"new flux table a\n")
+        self.update()
+        with gzip.open(path) as fobj:
+            assert fobj.read() == b"new flux table a\n"
+        assert self.server.not_modified["/nflx2014/b.d.gz"] == 2
+
+        # modified locally
+        path.write_bytes(b"garbage")
+        self.update()
+        with gzip.open(path) as fobj:
+            assert fobj.read() == b"new flux table a\n"
+
+        assert self.server.not_modified["/nflx2014/b.d.gz"] == 3
+
+        # forced
+        self.update(overwrite=True)
+        assert self.server.not_modified["/nflx2014/b.d.gz"] == 3
+
+    def test_interrupted_transfer(self):
+        self.update()
+        path = Path(self.target.name) / "2014" / "a.d.gz"
+        content = path.read_bytes()
+        self.server.truncated.add("/nflx2014/a.d.gz")
+        self.update(overwrite=True)
+        assert path.read_bytes() == content
+        assert sorted(p.name for p in path.parent.iterdir()) == ["a.d.gz", "b.d.gz"]
+
+    def test_missing_files(self):
+        (Path(self.site.name) / "nflx2014" / "a.d.gz").unlink()
+        self.update(workers=2)
+        target = Path(self.target.name) / "2014"
+        assert [p.name for p in target.iterdir()] == ["b.d.gz"]